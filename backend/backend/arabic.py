@@ -0,0 +1,23 @@
+"""
+توحيد كتابة النص العربي للبحث.
+
+الموظف ممكن يكتب "احمد" والاسم متسجل "أحمد"، أو "هدي" والاسم "هدى"، أو
+"فاطمه" والاسم "فاطمة". normalize_arabic بترجع الصيغتين لنفس المفتاح:
+  - أ إ آ ٱ -> ا   ى -> ي   ة -> ه   ؤ -> و   ئ -> ي
+  - حذف التشكيل والتطويل
+  - الأرقام الهندية -> 0-9، حروف صغيرة، ومسافة واحدة بين الكلمات
+"""
+import re
+
+ARABIC_DIGITS = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+LETTERS = str.maketrans({
+    "أ": "ا", "إ": "ا", "آ": "ا", "ٱ": "ا",
+    "ى": "ي", "ة": "ه", "ؤ": "و", "ئ": "ي",
+})
+# التشكيل (فتحة، ضمة، كسرة، تنوين، شدة، سكون) والألف الخنجرية والتطويل
+DIACRITICS_RE = re.compile("[\u064b-\u0652\u0670\u0640]")
+
+
+def normalize_arabic(text):
+    text = DIACRITICS_RE.sub("", (text or "").translate(ARABIC_DIGITS).translate(LETTERS))
+    return " ".join(text.lower().split())
@@ -3,6 +3,9 @@ ASGI config for backend project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The live seat stream (/api/groups/stream/) is only served here, e.g.
+``uvicorn backend.asgi:application`` or gunicorn with a uvicorn worker.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 """
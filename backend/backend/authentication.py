@@ -0,0 +1,99 @@
+"""
+JWTAuthentication من غير استعلامات في كل طلب.
+
+JWTAuthentication العادي بيجيب User من قاعدة البيانات في كل طلب، وبعده أغلب
+views الحجز بتعمل request.user.student (استعلام تاني)، والـ access token
+عمره دقيقة واحدة فده أغلب الاستعلامات عندنا.
+
+هنا المستخدم بيتحمل مرة واحدة مع الطالب المرتبط بيه (select_related) وبيتخزن
+في الـ cache لمدة AUTH_PRINCIPAL_CACHE_TTL ثانية، فالطلبات اللي بعده مفيهاش
+أي استعلام للمصادقة ولا لـ request.user.student. أي حفظ أو حذف للمستخدم أو
+لطالبه بيمسح المفتاح (users/signals.py)، والـ TTL بيغطي التعديلات الجماعية
+اللي مش بتبعت إشارات.
+
+التوكنات بتحمل claim اسمه student_id (token_for_user /
+StudentTokenObtainPairSerializer)؛ لو اختلف عن الطالب اللي في الـ cache
+(الحساب اتربط بطالب تاني) المستخدم بيتحمل من جديد.
+"""
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ObjectDoesNotExist
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+STUDENT_CLAIM = "student_id"
+# رقم في المفتاح: لو شكل الكائن المتخزن اتغير نغيره بدل ما نقرا قديم
+PRINCIPAL_KEY = "auth:principal:v1:{}"
+MISSING = object()
+
+
+def principal_key(user_id):
+    return PRINCIPAL_KEY.format(user_id)
+
+
+def invalidate_principal(user_id):
+    if user_id is not None:
+        cache.delete(principal_key(user_id))
+
+
+def student_id_of(user):
+    """id الطالب المرتبط من غير استعلام لو الطالب متحمل مع المستخدم"""
+    try:
+        return user.student.pk
+    except ObjectDoesNotExist:
+        return None
+
+
+def token_for_user(user):
+    """RefreshToken.for_user + claim الطالب (الـ access token بيورثه)"""
+    refresh = RefreshToken.for_user(user)
+    refresh[STUDENT_CLAIM] = student_id_of(user)
+    return refresh
+
+
+def load_user(user_id):
+    """المستخدم وطالبه في استعلام واحد، وبيتخزن. يرفع DoesNotExist لو مش موجود"""
+    user = get_user_model().objects.select_related("student").get(
+        **{api_settings.USER_ID_FIELD: user_id}
+    )
+    # عشان student_id_of متعملش استعلام لو مفيش طالب
+    user._state.fields_cache.setdefault("student", None)
+    cache.set(principal_key(user_id), user, settings.AUTH_PRINCIPAL_CACHE_TTL)
+    return user
+
+
+def cached_user(user_id, student_id=MISSING):
+    """من الـ cache لو موجود ومتوافق مع claim الطالب، وإلا من قاعدة البيانات"""
+    user = cache.get(principal_key(user_id))
+    if user is None or (student_id is not MISSING and student_id != student_id_of(user)):
+        user = load_user(user_id)
+    return user
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        try:
+            user = cached_user(user_id, validated_token.get(STUDENT_CLAIM, MISSING))
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        if api_settings.CHECK_REVOKE_TOKEN:
+            if validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != get_md5_hash_password(user.password):
+                raise AuthenticationFailed(
+                    _("The user's password has been changed."), code="password_changed"
+                )
+        return user
@@ -0,0 +1,196 @@
+"""
+Autocomplete لأسماء الطلاب والمجموعات من فهرس في الذاكرة.
+
+كل عملية (worker) عندها لكل نوع قائمة مترتبة من (مفتاح، id)، والمفتاح هو
+الاسم بعد normalize_arabic مبتدي من كل كلمة فيه ("احمد مصطفي" و"مصطفي")،
+فالبحث bisect على أول مفتاح >= النص وقراءة اللي بعده طالما بيبدأ بيه.
+مفيش أي استعلام في البحث نفسه.
+
+الفهرس بيتبني من قاعدة البيانات أول مرة يتطلب فيها. بعد كده بيتحدث بالتغيير
+بس: إشارات save/delete (students/signals.py وgroups/signals.py) بتسجل التغيير
+في الـ cache تحت رقم تسلسلي، وكل worker بيطبق الجديد كل
+AUTOCOMPLETE_SYNC_INTERVAL ثانية (ولو فاته تغيير انتهت صلاحيته بيعيد البناء).
+"""
+import bisect
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework import status
+
+from backend.arabic import normalize_arabic
+
+SEQ_KEY = "autocomplete:seq"
+CHANGE_KEY = "autocomplete:change:{}"
+CHANGE_TTL = 10 * 60
+# لو الفرق أكبر من كده أسرع نعيد البناء من إننا نطبق التغييرات
+MAX_REPLAY = 1000
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+
+def _sources():
+    from groups.models import Group
+    from students.models import Student
+
+    # النوع -> (queryset, حقل الاسم, حقل المفتاح)
+    return {
+        "student": (Student.objects.all(), "full_name", "search_key"),
+        "group": (Group.objects.all(), "name", "name_key"),
+    }
+
+
+def _word_keys(key):
+    words = key.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class PrefixIndex:
+    def __init__(self):
+        self.entries = []  # [(key, id)] مترتبة
+        self.labels = {}
+        self.keys = {}
+
+    def load(self, rows):
+        """rows: [(id, label, key)]؛ ترتيب واحد بدل insort لكل صف"""
+        entries = []
+        for pk, label, key in rows:
+            keys = _word_keys(key)
+            self.labels[pk] = label
+            self.keys[pk] = keys
+            entries.extend((k, pk) for k in keys)
+        entries.sort()
+        self.entries = entries
+
+    def add(self, pk, label, key):
+        self.remove(pk)
+        keys = _word_keys(key)
+        for k in keys:
+            bisect.insort(self.entries, (k, pk))
+        self.labels[pk] = label
+        self.keys[pk] = keys
+
+    def remove(self, pk):
+        for k in self.keys.pop(pk, ()):
+            i = bisect.bisect_left(self.entries, (k, pk))
+            if i < len(self.entries) and self.entries[i] == (k, pk):
+                del self.entries[i]
+        self.labels.pop(pk, None)
+
+    def search(self, prefix, limit):
+        results = []
+        seen = set()
+        i = bisect.bisect_left(self.entries, (prefix,))
+        while i < len(self.entries) and len(results) < limit:
+            key, pk = self.entries[i]
+            if not key.startswith(prefix):
+                break
+            if pk not in seen:
+                seen.add(pk)
+                results.append((pk, self.labels[pk]))
+            i += 1
+        return results
+
+
+class Autocomplete:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.indexes = None
+        self.seq = 0
+        self.synced_at = 0
+
+    def _build(self):
+        cache.add(SEQ_KEY, 0, None)
+        # الرقم قبل القراءة: أي تغيير أثناء البناء بيتطبق بعده (التطبيق idempotent)
+        self.seq = cache.get(SEQ_KEY) or 0
+        indexes = {}
+        for kind, (queryset, label_field, key_field) in _sources().items():
+            index = PrefixIndex()
+            index.load(queryset.values_list("pk", label_field, key_field).iterator(chunk_size=5000))
+            indexes[kind] = index
+        self.indexes = indexes
+        self.synced_at = time.monotonic()
+
+    def _apply(self, change):
+        kind, pk, label, key = change
+        if label is None:
+            self.indexes[kind].remove(pk)
+        else:
+            self.indexes[kind].add(pk, label, key)
+
+    def _sync(self):
+        now = time.monotonic()
+        if now - self.synced_at < settings.AUTOCOMPLETE_SYNC_INTERVAL:
+            return
+        self.synced_at = now
+        seq = cache.get(SEQ_KEY)
+        if seq is None or seq < self.seq or seq - self.seq > MAX_REPLAY:
+            self._build()
+            return
+        if seq == self.seq:
+            return
+        numbers = range(self.seq + 1, seq + 1)
+        changes = cache.get_many([CHANGE_KEY.format(n) for n in numbers])
+        if len(changes) < len(numbers):
+            self._build()
+            return
+        for n in numbers:
+            self._apply(changes[CHANGE_KEY.format(n)])
+        self.seq = seq
+
+    def search(self, kind, text, limit):
+        with self.lock:
+            if self.indexes is None:
+                self._build()
+            else:
+                self._sync()
+            return self.indexes[kind].search(normalize_arabic(text), limit)
+
+    def record(self, kind, pk, label=None, key=None):
+        """label=None معناها حذف. بتتنادي بعد الـ commit."""
+        change = (kind, pk, label, key)
+        cache.add(SEQ_KEY, 0, None)
+        seq = cache.incr(SEQ_KEY)
+        cache.set(CHANGE_KEY.format(seq), change, CHANGE_TTL)
+        with self.lock:
+            if self.indexes is None:
+                return
+            # العملية اللي عملت التغيير بتشوفه فورًا من غير ما تستنى الـ sync
+            self._apply(change)
+            if seq == self.seq + 1:
+                self.seq = seq
+
+    def invalidate(self):
+        """بعد كتابة جماعية من غير إشارات (bulk_create): كل worker يعيد البناء"""
+        cache.delete(SEQ_KEY)
+        with self.lock:
+            self.indexes = None
+
+
+autocomplete = Autocomplete()
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def autocomplete_view(request):
+    """
+    GET /api/autocomplete/?q=احم&type=student|group&limit=10
+    بيرجع [{"id", "label"}] من الفهرس اللي في الذاكرة
+    """
+    kind = request.query_params.get("type", "student")
+    if kind not in ("student", "group"):
+        return Response({"error": "type لازم يكون student أو group"}, status=status.HTTP_400_BAD_REQUEST)
+    text = request.query_params.get("q", "")
+    try:
+        limit = min(int(request.query_params.get("limit", DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        limit = DEFAULT_LIMIT
+    if not normalize_arabic(text) or limit < 1:
+        return Response({"results": []})
+
+    results = autocomplete.search(kind, text, limit)
+    return Response({"results": [{"id": pk, "label": label} for pk, label in results]})
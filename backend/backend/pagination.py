@@ -0,0 +1,31 @@
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Cursor (keyset) pagination: each page is a WHERE on an indexed column
+    instead of OFFSET + COUNT(*), so deep pages cost the same as the first.
+    """
+
+    page_size_query_param = "page_size"
+    max_page_size = 100
+
+    def __init__(self, ordering="-id"):
+        self.ordering = ordering
+
+
+def cursor_requested(request):
+    """الـ list endpoints بتستخدم cursor بدل رقم الصفحة لو اتطلب ?pagination=cursor"""
+    return request.query_params.get("pagination") == "cursor"
+
+
+def keyset_ordering(ordering, allowed, default):
+    """
+    ترتيب ثابت للـ cursor: الحقل المطلوب (لو مسموح) وبعده id لكسر التعادل
+    في نفس الاتجاه، عشان المؤشر يفضل صالح مع أي ordering.
+    """
+    if ordering and ordering.lstrip("-") in allowed:
+        if ordering.lstrip("-") == "id":
+            return (ordering,)
+        return (ordering, "-id" if ordering.startswith("-") else "id")
+    return default
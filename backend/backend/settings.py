@@ -50,6 +50,7 @@ INSTALLED_APPS = [
     "students",   
     "groups",
     "bookings.apps.BookingsConfig",
+    "notifications",
 ]
 
 MIDDLEWARE = [
@@ -91,7 +92,11 @@ CORS_ALLOW_HEADERS = [
     'user-agent',
     'x-csrftoken',
     'x-requested-with',
+    'idempotency-key',
+    'admission-token',
+    'if-none-match',
 ]
+CORS_EXPOSE_HEADERS = ['idempotent-replayed', 'retry-after', 'etag']
 
 CORS_ALLOW_METHODS = [
     'DELETE',
@@ -133,6 +138,34 @@ DATABASES = {
     )
 }
 
+# Cache
+# LocMem افتراضيًا؛ للتشغيل بأكثر من worker استخدم file-based أو Redis، مثال:
+# CACHE_BACKEND=django.core.cache.backends.redis.RedisCache CACHE_LOCATION=redis://127.0.0.1:6379/1
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "e-learning"),
+    }
+}
+
+# مدة تخزين ردود كتالوج المجموعات (بالثواني)؛ أي تعديل يبطلها فورًا عبر رقم الإصدار
+GROUP_CATALOGUE_CACHE_TIMEOUT = int(os.getenv("GROUP_CATALOGUE_CACHE_TIMEOUT", 300))
+
+# بث المقاعد المتاحة (SSE): "local" لـ worker واحد، "cache" لعدة workers عبر cache مشترك
+SEAT_STREAM_PUBSUB = os.getenv("SEAT_STREAM_PUBSUB", "local")
+SEAT_STREAM_HEARTBEAT = 15
+
+# كل قد ايه (بالثواني) كل worker يطبق تغييرات أسماء الطلاب والمجموعات على فهرس الـ autocomplete
+AUTOCOMPLETE_SYNC_INTERVAL = float(os.getenv("AUTOCOMPLETE_SYNC_INTERVAL", 1))
+
+# مدة الاحتفاظ بردود طلبات الحجز اللي عليها Idempotency-Key (بالثواني)
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+
+# غرفة الانتظار للمجموعات اللي ليها opens_at: معدل دخول الطلاب لكل مجموعة،
+# والمدة (بالثواني) اللي تصريح الدخول يفضل صالح فيها بعد ما دوره ييجي
+WAITING_ROOM_ADMIT_RATE = os.getenv("WAITING_ROOM_ADMIT_RATE", "20/sec")
+WAITING_ROOM_ADMISSION_WINDOW = int(os.getenv("WAITING_ROOM_ADMISSION_WINDOW", 120))
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -181,7 +214,7 @@ from datetime import timedelta
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "backend.authentication.CachedJWTAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
@@ -190,6 +223,13 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": 10
 }
 
+# Token buckets لنقاط الضغط (backend/throttling.py): "عدد/فترة" لكل IP، للـ endpoint كله، ولكل مستخدم
+TOKEN_BUCKET_RATES = {
+    "enroll": {"ip": "60/min", "endpoint": "200/sec", "user": "10/min"},
+    "register": {"ip": "20/min", "endpoint": "20/sec"},
+    "login": {"ip": "30/min", "endpoint": "50/sec"},
+}
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=1),
     "REFRESH_TOKEN_LIFETIME": timedelta(minutes=5),
@@ -214,8 +254,18 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_EXP_CLAIM": "refresh_exp",
     "SLIDING_TOKEN_LIFETIME": timedelta(minutes=5),
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
+    # بيضيف claim student_id للتوكن (backend/authentication.py)
+    "TOKEN_OBTAIN_SERIALIZER": "users.serializers.StudentTokenObtainPairSerializer",
+    # التدوير والقائمة السودا من غير token_blacklist (users/tokens.py)
+    "TOKEN_REFRESH_SERIALIZER": "users.serializers.RotatingTokenRefreshSerializer",
 }
 
+# عدد الـ jti الملغية اللي كل worker بيفتكرها في الذاكرة قبل ما يسأل قاعدة البيانات
+REVOKED_TOKEN_LRU_SIZE = int(os.getenv("REVOKED_TOKEN_LRU_SIZE", 50000))
+
+# مدة تخزين المستخدم وطالبه بعد المصادقة (backend/authentication.py)؛ الحفظ والحذف بيمسحوه فورًا
+AUTH_PRINCIPAL_CACHE_TTL = int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", 60))
+
 # Email Configuration
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # For development
 DEFAULT_FROM_EMAIL = 'noreply@e-learning-platform.com'
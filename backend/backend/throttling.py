@@ -0,0 +1,154 @@
+"""
+Token-bucket throttling for enrollment and auth hot spots.
+
+Each throttled endpoint has a scope in settings.TOKEN_BUCKET_RATES with up
+to three buckets: per client IP, for the endpoint as a whole, and per user.
+They are checked in that order and the first empty bucket rejects the
+request with a 429 + Retry-After before the view body runs any query.
+Buckets use GCRA, which stores a single timestamp per key and updates it
+with atomic cache incr/decr.
+"""
+import math
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAdminUser
+from rest_framework.response import Response
+from rest_framework.throttling import BaseThrottle
+
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+BUCKET_KINDS = ("ip", "endpoint", "user")
+
+
+def parse_rate(rate):
+    """'20/min' -> (20 tokens, 60 seconds)"""
+    num, period = rate.split("/")
+    return int(num), PERIODS[period[0]]
+
+
+def take_token(key, rate):
+    """
+    Take one token from the bucket at `key`. Returns (allowed, wait_seconds).
+
+    The value is the bucket's theoretical arrival time (TAT) in ms. A request
+    is allowed while TAT stays within one full bucket of now; otherwise the
+    increment is rolled back and the caller waits until it would fit.
+    """
+    capacity, period = parse_rate(rate)
+    interval = period * 1000 // capacity
+    burst = interval * capacity
+    timeout = math.ceil(burst / 1000) + 1
+    now = int(time.time() * 1000)
+
+    if cache.add(key, now + interval, timeout):
+        return True, 0
+    try:
+        tat = cache.incr(key, interval)
+    except ValueError:
+        # the key expired between add() and incr()
+        cache.set(key, now + interval, timeout)
+        return True, 0
+
+    if tat - interval < now:
+        # the bucket had refilled completely; restart from now
+        cache.set(key, now + interval, timeout)
+        return True, 0
+    if tat - now <= burst:
+        cache.touch(key, timeout)
+        return True, 0
+    cache.decr(key, interval)
+    return False, (tat - now - burst) / 1000
+
+
+def refund_token(key, rate):
+    capacity, period = parse_rate(rate)
+    try:
+        cache.decr(key, period * 1000 // capacity)
+    except ValueError:
+        pass
+
+
+def shed_key(scope, kind):
+    return f"throttle:shed:{scope}:{kind}"
+
+
+def record_shed(scope, kind):
+    key = shed_key(scope, kind)
+    cache.add(key, 0, None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        pass
+
+
+class TokenBucketThrottle(BaseThrottle):
+    scope = None
+    methods = ("POST",)
+
+    def __init__(self):
+        self.wait_seconds = None
+
+    def bucket_key(self, kind, request):
+        if kind == "ip":
+            return f"throttle:{self.scope}:ip:{self.get_ident(request)}"
+        if kind == "endpoint":
+            return f"throttle:{self.scope}:endpoint"
+        if request.user and request.user.is_authenticated:
+            return f"throttle:{self.scope}:user:{request.user.pk}"
+        return None
+
+    def allow_request(self, request, view):
+        if request.method not in self.methods:
+            return True
+        rates = settings.TOKEN_BUCKET_RATES.get(self.scope, {})
+        taken = []
+        for kind in BUCKET_KINDS:
+            rate = rates.get(kind)
+            if not rate:
+                continue
+            key = self.bucket_key(kind, request)
+            if key is None:
+                continue
+            allowed, wait = take_token(key, rate)
+            if not allowed:
+                # buckets that already gave a token get it back
+                for taken_key, taken_rate in taken:
+                    refund_token(taken_key, taken_rate)
+                record_shed(self.scope, kind)
+                self.wait_seconds = wait
+                return False
+            taken.append((key, rate))
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class EnrollmentThrottle(TokenBucketThrottle):
+    scope = "enroll"
+
+
+class RegisterThrottle(TokenBucketThrottle):
+    scope = "register"
+
+
+class LoginThrottle(TokenBucketThrottle):
+    scope = "login"
+
+
+@api_view(["GET"])
+@permission_classes([IsAdminUser])
+def throttle_metrics(request):
+    """عدد الطلبات المرفوضة (429) لكل scope ولكل نوع bucket"""
+    keys = {
+        shed_key(scope, kind): (scope, kind)
+        for scope in settings.TOKEN_BUCKET_RATES
+        for kind in BUCKET_KINDS
+    }
+    counts = cache.get_many(list(keys))
+    shed = {}
+    for key, (scope, kind) in keys.items():
+        shed.setdefault(scope, {})[kind] = counts.get(key, 0)
+    return Response({"shed": shed, "rates": settings.TOKEN_BUCKET_RATES})
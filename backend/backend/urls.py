@@ -1,6 +1,9 @@
 from django.contrib import admin
 from django.urls import path, include
 from rest_framework_simplejwt.views import (TokenObtainPairView,TokenRefreshView)
+from .throttling import LoginThrottle, throttle_metrics
+from .autocomplete import autocomplete_view
+from users.views import dashboard
 
 urlpatterns = [
     path('admin/', admin.site.urls),
@@ -8,6 +11,10 @@ urlpatterns = [
     path('api/students/', include('students.urls')),
     path('api/groups/', include('groups.urls')),
     path('api/bookings/', include('bookings.urls')),
-    path('api/token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
-    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh')
+    path('api/notifications/', include('notifications.urls')),
+    path('api/token/', TokenObtainPairView.as_view(throttle_classes=[LoginThrottle]), name='token_obtain_pair'),
+    path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/metrics/throttling/', throttle_metrics, name='throttle-metrics'),
+    path('api/autocomplete/', autocomplete_view, name='autocomplete'),
+    path('api/me/dashboard/', dashboard, name='dashboard'),
 ]
@@ -1,8 +1,68 @@
-from django.contrib import admin
-from .models import Booking
+from django import forms
+from django.contrib import admin, messages
+from django.http import HttpResponseRedirect
+from .models import Booking, WaitlistEntry
+from .services import BookingError, reserve_seat
+
+
+class BookingAdminForm(forms.ModelForm):
+    class Meta:
+        model = Booking
+        fields = ('student', 'group')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        student = cleaned_data.get('student')
+        group = cleaned_data.get('group')
+        if self.instance._state.adding and group:
+            if group.is_full:
+                raise forms.ValidationError("المجموعة ممتلئة")
+            if student and Booking.objects.filter(student=student, group=group).exists():
+                raise forms.ValidationError("الطالب مسجل بالفعل في هذه المجموعة")
+        return cleaned_data
+
 
 @admin.register(Booking)
 class BookingAdmin(admin.ModelAdmin):
-    list_display = ('student', 'group', 'created_at')  
-    list_filter = ('group', 'created_at')              
+    form = BookingAdminForm
+    list_display = ('student', 'group', 'created_at')
+    list_filter = ('group', 'created_at')
+    search_fields = ('student__full_name', 'group__name')
+
+    def get_readonly_fields(self, request, obj=None):
+        # نقل الحجز لمجموعة أخرى يفسد booked_count؛ الأفضل حذفه وإنشاء حجز جديد
+        if obj:
+            return ('student', 'group')
+        return ()
+
+    def save_model(self, request, obj, form, change):
+        if change:
+            return super().save_model(request, obj, form, change)
+        try:
+            booking = reserve_seat(obj.student, obj.group_id)
+        except BookingError as e:
+            # المجموعة اتملت (أو الحجز اتعمل) بين clean() والحفظ
+            messages.error(request, e.message)
+            return
+        obj.pk, obj.created_at = booking.pk, booking.created_at
+
+    def log_addition(self, request, obj, message):
+        if obj.pk is not None:
+            return super().log_addition(request, obj, message)
+
+    def response_add(self, request, obj, post_url_continue=None):
+        if obj.pk is None:
+            # الحجز متعملش: نرجع لنفس الفورم من غير رسالة النجاح
+            return HttpResponseRedirect(request.path)
+        return super().response_add(request, obj, post_url_continue)
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_display = ('student', 'group', 'position', 'created_at')
+    list_filter = ('group',)
     search_fields = ('student__full_name', 'group__name')
+
+    def has_add_permission(self, request):
+        # الأرقام بتتوزع من join_waitlist بس
+        return False
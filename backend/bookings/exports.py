@@ -0,0 +1,74 @@
+"""
+تصدير الحجوزات كتيار (CSV / NDJSON) بذاكرة ثابتة مهما كان عدد الصفوف:
+values_list + iterator(chunk_size) بدل تحميل كل الموديلات والـ serializers.
+"""
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework.renderers import BaseRenderer
+
+from .models import Booking
+
+EXPORT_CHUNK_SIZE = 2000
+
+# (اسم العمود في الملف, الحقل في values_list)
+EXPORT_COLUMNS = (
+    ("id", "id"),
+    ("created_at", "created_at"),
+    ("student_id", "student_id"),
+    ("student_name", "student__full_name"),
+    ("student_email", "student__email"),
+    ("student_phone", "student__phone"),
+    ("student_stage", "student__stage"),
+    ("group_id", "group_id"),
+    ("group_name", "group__name"),
+    ("group_stage", "group__stage"),
+    ("group_schedule", "group__schedule"),
+    ("group_days", "group__days"),
+)
+
+
+class CSVStreamRenderer(BaseRenderer):
+    """يسمح بـ ?format=csv؛ الـ view بترجع StreamingHttpResponse بنفسها"""
+
+    media_type = "text/csv"
+    format = "csv"
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, cls=DjangoJSONEncoder).encode()
+
+
+class NDJSONStreamRenderer(CSVStreamRenderer):
+    media_type = "application/x-ndjson"
+    format = "ndjson"
+
+
+def booking_rows():
+    fields = [field for _, field in EXPORT_COLUMNS]
+    return (
+        Booking.objects.order_by("id")
+        .values_list(*fields)
+        .iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    )
+
+
+class _Echo:
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows):
+    writer = csv.writer(_Echo())
+    # BOM عشان Excel يقرأ الأسماء العربية صح
+    yield "\ufeff" + writer.writerow([name for name, _ in EXPORT_COLUMNS])
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def ndjson_lines(rows):
+    names = [name for name, _ in EXPORT_COLUMNS]
+    encoder = DjangoJSONEncoder(ensure_ascii=False)
+    for row in rows:
+        yield encoder.encode(dict(zip(names, row))) + "\n"
@@ -0,0 +1,102 @@
+"""
+دعم Idempotency-Key لطلبات إنشاء الحجز.
+
+أول رد نهائي لكل (مستخدم، مسار، مفتاح) بيتخزن في الـ cache لمدة IDEMPOTENCY_KEY_TTL،
+وأي إعادة بنفس المفتاح بترجع نفس الرد من غير ما تعيد التحقق أو الكتابة.
+الردود المؤقتة (409/429، رفض غرفة الانتظار، 5xx) ما بتتخزنش، فالإعادة بعدها بتتنفذ من جديد.
+"""
+import functools
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework.response import Response
+from rest_framework.views import exception_handler
+
+HEADER = "Idempotency-Key"
+MAX_KEY_LENGTH = 255
+# مدة حجز المفتاح أثناء تنفيذ الطلب الأول
+IN_PROGRESS_TIMEOUT = 30
+IN_PROGRESS = "in-progress"
+# أخطاء 4xx اللي نتيجتها مش هتتغير لو نفس الطلب اتعاد
+FINAL_CLIENT_ERRORS = (
+    status.HTTP_400_BAD_REQUEST,
+    status.HTTP_404_NOT_FOUND,
+    status.HTTP_422_UNPROCESSABLE_ENTITY,
+)
+# الـ headers اللي بترجع مع الرد المتخزن
+STORED_HEADERS = ("Retry-After", "Location")
+
+
+def no_store(response):
+    """الـ view بتعلّم بيها رد مؤقت عشان ما يتخزنش حتى لو الـ status نهائي"""
+    response.idempotency_store = False
+    return response
+
+
+def _is_final(response):
+    if not getattr(response, "idempotency_store", True):
+        return False
+    return status.is_success(response.status_code) or response.status_code in FINAL_CLIENT_ERRORS
+
+
+def _fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, default=str)
+    return hashlib.sha256(body.encode()).hexdigest()[:16]
+
+
+def idempotent(view):
+    """يتحط تحت @api_view و@permission_classes عشان request.user يكون جاهز"""
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if request.method != "POST" or not key:
+            return view(request, *args, **kwargs)
+        if len(key) > MAX_KEY_LENGTH:
+            return Response({"error": "Idempotency-Key طويل جدًا"}, status=status.HTTP_400_BAD_REQUEST)
+
+        scope = f"{request.user.pk}:{request.path}:{key}"
+        cache_key = "idempotency:" + hashlib.sha256(scope.encode()).hexdigest()
+        fingerprint = _fingerprint(request)
+
+        stored = cache.get(cache_key)
+        if stored is None and cache.add(cache_key, IN_PROGRESS, IN_PROGRESS_TIMEOUT):
+            try:
+                response = view(request, *args, **kwargs)
+            except APIException as exc:
+                # أخطاء التحقق اللي بتطلع كاستثناء بتتعامل زي أي رد 4xx
+                response = exception_handler(exc, {"request": request})
+            except Exception:
+                cache.delete(cache_key)
+                raise
+            if not _is_final(response):
+                cache.delete(cache_key)
+            else:
+                headers = {name: response[name] for name in STORED_HEADERS if response.has_header(name)}
+                cache.set(
+                    cache_key,
+                    (fingerprint, response.status_code, response.data, headers),
+                    settings.IDEMPOTENCY_KEY_TTL,
+                )
+            return response
+
+        if stored is None or stored == IN_PROGRESS:
+            return Response(
+                {"error": "طلب بنفس Idempotency-Key قيد التنفيذ، أعد المحاولة بعد قليل"},
+                status=status.HTTP_409_CONFLICT,
+            )
+        stored_fingerprint, status_code, data, headers = stored
+        if stored_fingerprint != fingerprint:
+            return Response(
+                {"error": "Idempotency-Key مستخدم من قبل مع بيانات مختلفة"},
+                status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            )
+        response = Response(data, status=status_code, headers=headers)
+        response["Idempotent-Replayed"] = "true"
+        return response
+
+    return wrapper
@@ -0,0 +1,79 @@
+import csv
+import json
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from bookings.placement import auto_place
+from bookings.serializers import AutoPlacementSerializer
+
+
+def read_preferences(path):
+    """
+    JSON: [{"student": 1, "groups": [4, 2], "days": ["السبت"]}, ...]
+    CSV:  student,groups,days  مع فصل القيم المتعددة بـ ;  (مثال: 1,4;2,السبت;الاثنين)
+    """
+    with open(path, encoding="utf-8-sig", newline="") as f:
+        if path.endswith(".json"):
+            data = json.load(f)
+            return data["preferences"] if isinstance(data, dict) else data
+        return [
+            {
+                "student": row["student"],
+                "groups": [g for g in (row.get("groups") or "").split(";") if g.strip()],
+                "days": [d for d in (row.get("days") or "").split(";") if d.strip()],
+            }
+            for row in csv.DictReader(f)
+        ]
+
+
+class Command(BaseCommand):
+    help = "Place students into groups of their stage from ranked preferences (JSON or CSV file)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Preferences file; its row order is the priority order")
+        parser.add_argument(
+            "--no-fill", action="store_true",
+            help="Do not place students whose choices are full into other groups",
+        )
+        parser.add_argument("--dry-run", action="store_true", help="Compute only, do not book")
+
+    def handle(self, *args, **options):
+        try:
+            preferences = read_preferences(options["path"])
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Cannot read preferences: {e}")
+
+        serializer = AutoPlacementSerializer(data={"preferences": preferences})
+        if not serializer.is_valid():
+            raise CommandError(json.dumps(serializer.errors, ensure_ascii=False)[:2000])
+
+        started = time.perf_counter()
+        result = auto_place(
+            [(item["student"], item["groups"], item["days"])
+             for item in serializer.validated_data["preferences"]],
+            fill=not options["no_fill"],
+            dry_run=options["dry_run"],
+        )
+        elapsed = time.perf_counter() - started
+
+        choices = Counter(item["choice"] for item in result["placed"])
+        self.stdout.write(
+            f"Placed {len(result['placed'])} student(s) in {elapsed:.2f}s"
+            + (" (dry run)" if options["dry_run"] else "")
+        )
+        for choice in sorted(choices, key=lambda c: (c is None, c)):
+            label = f"choice #{choice}" if choice else "fill"
+            self.stdout.write(f"  {label}: {choices[choice]}")
+
+        if result["unplaced"]:
+            reasons = Counter(item["reason"] for item in result["unplaced"])
+            self.stdout.write(self.style.WARNING(
+                f"Unplaced {len(result['unplaced'])} student(s): "
+                + ", ".join(f"{reason}={n}" for reason, n in reasons.items())
+            ))
+            for item in result["unplaced"]:
+                self.stdout.write(f"  student #{item['student']}: {item['reason']}")
+        else:
+            self.stdout.write(self.style.SUCCESS("Every student was placed"))
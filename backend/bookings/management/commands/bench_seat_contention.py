@@ -0,0 +1,75 @@
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, OperationalError
+
+from bookings.services import reserve_seat, BookingError
+from groups.models import Group
+from students.models import Student
+
+
+class Command(BaseCommand):
+    help = "Benchmark concurrent joins on one group and verify it is never overbooked."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--capacity", type=int, default=50)
+        parser.add_argument("--students", type=int, default=500)
+        parser.add_argument("--threads", type=int, default=32)
+        parser.add_argument("--keep", action="store_true", help="Keep the benchmark rows")
+
+    def handle(self, *args, **options):
+        if connection.vendor == "sqlite" and options["threads"] > 1:
+            self.stderr.write("SQLite serializes writers; numbers are not representative of PostgreSQL.")
+
+        tag = uuid.uuid4().hex[:8]
+        group = Group.objects.create(
+            name=f"bench-{tag}", stage="PREP", capacity=options["capacity"], schedule="bench"
+        )
+        students = Student.objects.bulk_create(
+            Student(
+                full_name=f"bench {i}",
+                email=f"bench-{tag}-{i}@example.com",
+                phone=f"b{tag}{i:06d}",
+                stage="PREP",
+            )
+            for i in range(options["students"])
+        )
+
+        outcomes = {"booked": 0, "rejected": 0, "errors": 0}
+
+        def join(student):
+            try:
+                reserve_seat(student, group.pk)
+                return "booked"
+            except BookingError:
+                return "rejected"
+            except OperationalError:
+                return "errors"
+            finally:
+                connection.close()
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options["threads"]) as pool:
+            for outcome in pool.map(join, students):
+                outcomes[outcome] += 1
+        elapsed = time.perf_counter() - started
+
+        booked = group.bookings.count()
+        self.stdout.write(
+            f"{len(students)} joins in {elapsed:.2f}s "
+            f"({len(students) / elapsed:.0f} joins/s, {options['threads']} threads)"
+        )
+        self.stdout.write(
+            f"booked={outcomes['booked']} rejected={outcomes['rejected']} "
+            f"errors={outcomes['errors']} rows={booked} capacity={group.capacity}"
+        )
+
+        if not options["keep"]:
+            group.delete()
+            Student.objects.filter(pk__in=[s.pk for s in students]).delete()
+
+        if booked > group.capacity or booked != outcomes["booked"]:
+            raise CommandError("Group was overbooked")
+        self.stdout.write(self.style.SUCCESS("No overbooking detected"))
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:34
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0003_initial'),
+        ('groups', '0004_group_waitlist_tail'),
+        ('students', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='groups.group')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='waitlist_entries', to='students.student')),
+            ],
+            options={
+                'ordering': ['group', 'position'],
+                'constraints': [models.UniqueConstraint(fields=('student', 'group'), name='unique_waitlist_student_group'), models.UniqueConstraint(fields=('group', 'position'), name='unique_waitlist_group_position')],
+            },
+        ),
+    ]
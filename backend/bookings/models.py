@@ -11,3 +11,22 @@ class Booking(models.Model):
 
     def __str__(self):
         return f"{self.student.full_name} -> {self.group.name}"
+
+
+class WaitlistEntry(models.Model):
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="waitlist_entries")
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name="waitlist_entries")
+    # رقم ثابت داخل المجموعة من Group.waitlist_tail؛ الأصغر يترقى الأول
+    position = models.PositiveIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["group", "position"]
+        constraints = [
+            models.UniqueConstraint(fields=["student", "group"], name="unique_waitlist_student_group"),
+            # نفس الفهرس بيخدم جلب رأس القائمة لكل مجموعة
+            models.UniqueConstraint(fields=["group", "position"], name="unique_waitlist_group_position"),
+        ]
+
+    def __str__(self):
+        return f"{self.student.full_name} -> {self.group.name} (#{self.position})"
@@ -0,0 +1,192 @@
+"""
+توزيع الطلاب الجدد على المجموعات مرة واحدة في بداية الترم.
+
+كل طالب بيقدم ترتيب المجموعات اللي يفضلها و/أو الأيام اللي تناسبه. التوزيع:
+1. deferred acceptance (الطالب هو اللي بيتقدم): كل طالب بيتقدم لأول اختيار
+   متاح له، والمجموعة بتحتفظ بأعلى الطلاب أولوية لحد سعتها وترفض الباقي اللي
+   بيتقدم لاختياره اللي بعده. الأولوية = ترتيب الطالب في المدخلات.
+2. تكملة: اللي ملوش مكان بعد اختياراته بيتحط في مجموعة من نفس المرحلة فيها
+   أكبر عدد مقاعد فاضية ومواعيدها مش بتتعارض مع حجوزاته.
+الكتابة عن طريق bulk_reserve في نفس المعاملة اللي قفلت المجموعات.
+"""
+import heapq
+from collections import defaultdict
+
+from django.db import transaction
+
+from groups.models import Group, GroupTimeslot
+from students.models import Student
+from .models import Booking
+from .services import BULK_CREATED, IN_QUERY_CHUNK, _chunks, bulk_reserve
+
+# أسباب عدم التوزيع
+UNKNOWN_STUDENT = "unknown_student"
+ALREADY_PLACED = "already_placed"
+NO_SEAT = "no_seat"
+
+
+def _overlaps(slots, busy):
+    return any(
+        day == busy_day and start < busy_end and busy_start < end
+        for day, start, end in slots
+        for busy_day, busy_start, busy_end in busy
+    )
+
+
+def _deferred_acceptance(ranked, priority, seats):
+    """ranked: {student: [group, ...]} -> {student: group}"""
+    held = defaultdict(list)  # group -> heap of (-priority, student): الأضعف فوق
+    next_choice = dict.fromkeys(ranked, 0)
+    free = list(reversed(list(ranked)))
+    while free:
+        student = free.pop()
+        choices = ranked[student]
+        if next_choice[student] >= len(choices):
+            continue
+        group = choices[next_choice[student]]
+        next_choice[student] += 1
+        heap = held[group]
+        heapq.heappush(heap, (-priority[student], student))
+        if len(heap) > seats[group]:
+            _, rejected = heapq.heappop(heap)
+            free.append(rejected)
+    return {student: group for group, heap in held.items() for _, student in heap}
+
+
+def auto_place(preferences, fill=True, dry_run=False):
+    """
+    preferences: [(student_id, [group_id, ...], [weekday, ...]), ...] بترتيب الأولوية.
+    Returns {"placed": [{student, group, choice}], "unplaced": [{student, reason}]}
+    choice هو ترتيب المجموعة في اختيارات الطالب (يبدأ من 1)، وNone لو اتحط في التكملة.
+    """
+    priority = {}
+    wishes = {}
+    for student_id, group_ids, weekdays in preferences:
+        if student_id not in priority:
+            priority[student_id] = len(priority)
+            wishes[student_id] = (list(group_ids), set(weekdays))
+
+    with transaction.atomic():
+        stages = {}
+        for chunk in _chunks(priority, IN_QUERY_CHUNK):
+            stages.update(Student.objects.filter(pk__in=chunk).values_list("pk", "stage"))
+
+        # القفل بترتيب pk زي bulk_reserve
+        seats = {}
+        group_stage = {}
+        for pk, stage, capacity, booked_count in (
+            Group.objects.select_for_update()
+            .filter(stage__in=set(stages.values()))
+            .order_by("pk")
+            .values_list("pk", "stage", "capacity", "booked_count")
+        ):
+            seats[pk] = max(capacity - booked_count, 0)
+            group_stage[pk] = stage
+
+        booked = defaultdict(set)
+        for chunk in _chunks(stages, IN_QUERY_CHUNK):
+            for student_id, group_id in Booking.objects.filter(student_id__in=chunk).values_list(
+                "student_id", "group_id"
+            ):
+                booked[student_id].add(group_id)
+
+        slots = defaultdict(list)
+        busy_groups = set().union(*booked.values()) if booked else set()
+        for chunk in _chunks(set(seats) | busy_groups, IN_QUERY_CHUNK):
+            for group_id, day, start, end in GroupTimeslot.objects.filter(
+                group_id__in=chunk
+            ).values_list("group_id", "weekday", "start", "end"):
+                slots[group_id].append((day, start, end))
+
+        stage_groups = defaultdict(list)
+        for pk, stage in group_stage.items():
+            stage_groups[stage].append(pk)
+
+        group_days = {g: {day for day, _, _ in slots[g]} for g in group_stage}
+        by_days = {}
+
+        unplaced = []
+        busy = {}
+        ranked = {}
+        for student_id in priority:
+            stage = stages.get(student_id)
+            if stage is None:
+                unplaced.append({"student": student_id, "reason": UNKNOWN_STUDENT})
+                continue
+            if any(group_stage.get(g) == stage for g in booked[student_id]):
+                unplaced.append({"student": student_id, "reason": ALREADY_PLACED})
+                continue
+            busy[student_id] = [slot for g in booked[student_id] for slot in slots[g]]
+
+            group_ids, weekdays = wishes[student_id]
+            choices = [g for g in group_ids if group_stage.get(g) == stage]
+            if weekdays:
+                # المجموعات اللي كل مواعيدها في الأيام المطلوبة، الأوسع الأول
+                key = (stage, frozenset(weekdays))
+                if key not in by_days:
+                    by_days[key] = sorted(
+                        (
+                            g for g in stage_groups[stage]
+                            if group_days[g] and group_days[g] <= weekdays
+                        ),
+                        key=lambda g: -seats[g],
+                    )
+                choices += by_days[key]
+            ranked[student_id] = [
+                g for g in dict.fromkeys(choices) if not _overlaps(slots[g], busy[student_id])
+            ]
+
+        assignment = _deferred_acceptance(ranked, priority, seats)
+        remaining = dict(seats)
+        for group_id in assignment.values():
+            remaining[group_id] -= 1
+
+        if fill:
+            heaps = {
+                stage: [(-remaining[g], g) for g in groups if remaining[g] > 0]
+                for stage, groups in stage_groups.items()
+            }
+            for heap in heaps.values():
+                heapq.heapify(heap)
+            for student_id in ranked:
+                if student_id in assignment:
+                    continue
+                heap = heaps.get(stages[student_id], [])
+                skipped = []
+                while heap:
+                    _, group_id = heapq.heappop(heap)
+                    if _overlaps(slots[group_id], busy[student_id]):
+                        skipped.append((-remaining[group_id], group_id))
+                        continue
+                    assignment[student_id] = group_id
+                    remaining[group_id] -= 1
+                    if remaining[group_id] > 0:
+                        heapq.heappush(heap, (-remaining[group_id], group_id))
+                    break
+                for item in skipped:
+                    heapq.heappush(heap, item)
+
+        pairs = [
+            (student_id, assignment[student_id]) for student_id in ranked if student_id in assignment
+        ]
+        if dry_run:
+            outcomes = [BULK_CREATED] * len(pairs)
+        else:
+            outcomes = [result["status"] for result in bulk_reserve(pairs)]
+
+    placed = []
+    for (student_id, group_id), outcome in zip(pairs, outcomes):
+        if outcome != BULK_CREATED:
+            unplaced.append({"student": student_id, "reason": outcome})
+            continue
+        choices = ranked[student_id]
+        placed.append({
+            "student": student_id,
+            "group": group_id,
+            "choice": choices.index(group_id) + 1 if group_id in choices else None,
+        })
+    unplaced.extend(
+        {"student": student_id, "reason": NO_SEAT}
+        for student_id in ranked if student_id not in assignment
+    )
+    return {"placed": placed, "unplaced": unplaced}
@@ -1,7 +1,12 @@
 from rest_framework import serializers
-from .models import Booking
+from .models import Booking, WaitlistEntry
+from .services import (
+    reserve_seat, check_schedule_conflict, AlreadyBookedError, GroupFullError, ScheduleConflictError
+)
+from . import waiting_room
 from students.models import Student
 from groups.models import Group
+from groups.timeslots import parse_day
 
 class StudentDetailsSerializer(serializers.ModelSerializer):
     class Meta:
@@ -28,6 +33,17 @@ class BookingSerializer(serializers.ModelSerializer):
         fields = ["id", "student", "group", "created_at"]
         read_only_fields = ["id", "created_at"]
 
+    def validate_group(self, group):
+        request = self.context.get("request")
+        if group.opens_at and request is not None:
+            try:
+                waiting_room.check_admission(
+                    request.headers.get(waiting_room.HEADER), group, request.user
+                )
+            except waiting_room.AdmissionError as e:
+                raise serializers.ValidationError(e.message, code=waiting_room.ADMISSION_CODE)
+        return group
+
     def create(self, validated_data):
         request = self.context.get("request")
         
@@ -36,13 +52,50 @@ class BookingSerializer(serializers.ModelSerializer):
         except Student.DoesNotExist:
             raise serializers.ValidationError("لا يوجد طالب مرتبط بهذا المستخدم")
         
-        validated_data["student"] = student
-        
-        if Booking.objects.filter(student=student, group=validated_data["group"]).exists():
+        try:
+            check_schedule_conflict(student, validated_data["group"])
+            return reserve_seat(student, validated_data["group"].pk)
+        except ScheduleConflictError as e:
+            raise serializers.ValidationError(e.message)
+        except AlreadyBookedError:
             raise serializers.ValidationError("لديك حجز مسبق في هذه المجموعة")
-        
-        group = validated_data["group"]
-        if group.is_full:
+        except GroupFullError:
             raise serializers.ValidationError("المجموعة ممتلئة")
-        
-        return super().create(validated_data)
\ No newline at end of file
+
+class WaitlistEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = WaitlistEntry
+        fields = ["id", "student", "group", "position", "created_at"]
+        read_only_fields = fields
+
+
+class BulkBookingItemSerializer(serializers.Serializer):
+    student = serializers.IntegerField(min_value=1)
+    group = serializers.IntegerField(min_value=1)
+
+
+class BulkBookingSerializer(serializers.Serializer):
+    bookings = BulkBookingItemSerializer(many=True, allow_empty=False, max_length=20000)
+
+
+class PlacementPreferenceSerializer(serializers.Serializer):
+    student = serializers.IntegerField(min_value=1)
+    # المجموعات بالترتيب المفضل
+    groups = serializers.ListField(child=serializers.IntegerField(min_value=1), default=list)
+    # أيام مناسبة: "السبت" أو "sat" أو 0-6
+    days = serializers.ListField(child=serializers.CharField(), default=list)
+
+    def validate_days(self, days):
+        weekdays = []
+        for day in days:
+            weekday = parse_day(day)
+            if weekday is None:
+                raise serializers.ValidationError(f"يوم غير معروف: {day}")
+            weekdays.append(weekday)
+        return weekdays
+
+
+class AutoPlacementSerializer(serializers.Serializer):
+    preferences = PlacementPreferenceSerializer(many=True, allow_empty=False, max_length=20000)
+    fill = serializers.BooleanField(default=True)
+    dry_run = serializers.BooleanField(default=False)
@@ -0,0 +1,217 @@
+from collections import Counter
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from groups.cache import bump_catalogue_version
+from groups.models import Group
+from groups.stream import publish_seats
+from groups.timeslots import find_conflict
+from students.models import Student
+from .models import Booking, WaitlistEntry
+
+# نتائج الحجز الجماعي لكل عنصر
+BULK_CREATED = "created"
+BULK_DUPLICATE = "duplicate"
+BULK_GROUP_FULL = "group_full"
+BULK_UNKNOWN_STUDENT = "unknown_student"
+BULK_UNKNOWN_GROUP = "unknown_group"
+
+# عدد المعرفات في كل استعلام IN (حد SQLite القديم 999 متغير)
+IN_QUERY_CHUNK = 500
+
+
+class BookingError(Exception):
+    """خطأ في الحجز يحمل رسالة جاهزة للعرض للمستخدم"""
+
+    message = "تعذر إتمام الحجز"
+
+    def __init__(self, message=None):
+        super().__init__(message or self.message)
+        self.message = message or self.message
+
+
+class GroupFullError(BookingError):
+    message = "هذه المجموعة مكتملة"
+
+
+class AlreadyBookedError(BookingError):
+    message = "أنت بالفعل عضو في هذه المجموعة"
+
+
+class ScheduleConflictError(BookingError):
+    message = "مواعيد هذه المجموعة تتعارض مع مجموعة أخرى محجوزة لك"
+
+
+def check_schedule_conflict(student, group):
+    """يرفع ScheduleConflictError لو مواعيد المجموعة بتتقاطع مع مجموعة محجوزة للطالب"""
+    clash = find_conflict(student, group)
+    if clash is not None:
+        raise ScheduleConflictError(
+            f"مواعيد هذه المجموعة تتعارض مع مجموعة {clash.group.name} ({clash})"
+        )
+
+
+def _take_seat(group_id):
+    """زيادة booked_count لو فيه مقعد فاضي؛ ترجع False لو المجموعة مكتملة"""
+    return bool(
+        Group.objects.filter(pk=group_id, booked_count__lt=F("capacity"))
+        .update(booked_count=F("booked_count") + 1)
+    )
+
+
+def reserve_seat(student, group_id):
+    """
+    حجز مقعد للطالب في المجموعة بدون سباق بين الطلبات المتزامنة.
+
+    الحجز كتابة شرطية واحدة: نزود booked_count فقط لو لسه أقل من السعة،
+    فلو رجع التحديث بصفر صفوف تكون المجموعة مكتملة. الحجز المكرر يُكتشف من
+    قيد unique_together، وفي الحالتين تُلغى الزيادة مع المعاملة.
+    """
+    with transaction.atomic():
+        if not _take_seat(group_id):
+            raise GroupFullError()
+        try:
+            with transaction.atomic():
+                return Booking.objects.create(student=student, group_id=group_id)
+        except IntegrityError:
+            raise AlreadyBookedError()
+
+
+def release_seat(booking):
+    """
+    إلغاء الحجز وترقية أول المنتظرين في نفس المعاملة.
+    booked_count ينقص من إشارة post_delete.
+    """
+    with transaction.atomic():
+        group_id = booking.group_id
+        booking.delete()
+        promote_waitlist(group_id)
+
+
+def promote_waitlist(group_id):
+    """
+    تحويل رأس قائمة الانتظار لحجوزات طالما فيه مقاعد فاضية.
+
+    قفل صف المجموعة الأول بيسلسل الترقية لكل مجموعة، فالرأس بيتقري من غير
+    LIMIT 1 FOR UPDATE (اللي على PostgreSQL بيرجع None لو صف الرأس المقفول
+    اتحذف من معاملة تانية، فالمقعد مكانش بيتوزع). كل ترقية بعد كده عمليات
+    على صف واحد بالفهرس (group, position): قراءة الرأس، زيادة العداد
+    المشروطة، إنشاء الحجز، وحذف عنصر الانتظار.
+    """
+    promoted = []
+    with transaction.atomic():
+        try:
+            Group.objects.select_for_update().only("id").get(pk=group_id)
+        except Group.DoesNotExist:
+            return promoted
+        while True:
+            head = WaitlistEntry.objects.filter(group_id=group_id).order_by("position").first()
+            if head is None:
+                break
+            try:
+                with transaction.atomic():
+                    if not _take_seat(group_id):
+                        break
+                    promoted.append(
+                        Booking.objects.create(student_id=head.student_id, group_id=group_id)
+                    )
+            except IntegrityError:
+                # الطالب حجز مباشرة بعد ما دخل قائمة الانتظار؛ الـ savepoint لغى الزيادة
+                pass
+            head.delete()
+    return promoted
+
+
+def join_waitlist(student, group_id):
+    """
+    إضافة الطالب لقائمة انتظار مجموعة مكتملة برقم ثابت.
+    لو اتفضى مقعد قبل ما ندخل القائمة الطالب بيترقى فورًا وترجع الدالة الحجز
+    بدل عنصر الانتظار.
+    """
+    with transaction.atomic():
+        if Booking.objects.filter(student=student, group_id=group_id).exists():
+            raise AlreadyBookedError()
+        entry = WaitlistEntry.objects.filter(student=student, group_id=group_id).first()
+        if entry:
+            return entry
+
+        # الزيادة بتقفل صف المجموعة لحد آخر المعاملة، فالرقم ميتكررش
+        Group.objects.filter(pk=group_id).update(waitlist_tail=F("waitlist_tail") + 1)
+        position = Group.objects.values_list("waitlist_tail", flat=True).get(pk=group_id)
+        entry = WaitlistEntry.objects.create(student=student, group_id=group_id, position=position)
+
+        for booking in promote_waitlist(group_id):
+            if booking.student_id == student.pk:
+                return booking
+        return entry
+
+
+def _chunks(items, size=IN_QUERY_CHUNK):
+    items = list(items)
+    for i in range(0, len(items), size):
+        yield items[i:i + size]
+
+
+def bulk_reserve(pairs, batch_size=1000):
+    """
+    حجز مجموعة كبيرة من أزواج (student_id, group_id) في معاملة واحدة.
+
+    بدل استعلامات لكل حجز: نقفل المجموعات المطلوبة مرة واحدة، ونجيب الطلاب
+    الموجودين والحجوزات السابقة باستعلامات IN، ونوزع المقاعد في الذاكرة بترتيب
+    الطلب، ثم bulk_create للحجوزات وbulk_update لـ booked_count.
+    ترجع قائمة بنتيجة كل زوج بنفس الترتيب.
+    """
+    group_ids = {group_id for _, group_id in pairs}
+    student_ids = {student_id for student_id, _ in pairs}
+
+    with transaction.atomic():
+        # القفل بترتيب pk يمنع deadlock مع طلبات جماعية متزامنة
+        groups = {
+            group.pk: group
+            for group in Group.objects.select_for_update()
+            .filter(pk__in=group_ids)
+            .order_by("pk")
+            .only("id", "capacity", "booked_count")
+        }
+        known_students = set()
+        existing = set()
+        for chunk in _chunks(student_ids):
+            known_students.update(
+                Student.objects.filter(pk__in=chunk).values_list("pk", flat=True)
+            )
+            existing.update(
+                Booking.objects.filter(student_id__in=chunk, group_id__in=groups)
+                .values_list("student_id", "group_id")
+            )
+
+        seats_left = {pk: group.capacity - group.booked_count for pk, group in groups.items()}
+        new_bookings = []
+        results = []
+        for student_id, group_id in pairs:
+            if group_id not in groups:
+                outcome = BULK_UNKNOWN_GROUP
+            elif student_id not in known_students:
+                outcome = BULK_UNKNOWN_STUDENT
+            elif (student_id, group_id) in existing:
+                outcome = BULK_DUPLICATE
+            elif seats_left[group_id] <= 0:
+                outcome = BULK_GROUP_FULL
+            else:
+                outcome = BULK_CREATED
+                seats_left[group_id] -= 1
+                existing.add((student_id, group_id))
+                new_bookings.append(Booking(student_id=student_id, group_id=group_id))
+            results.append({"student": student_id, "group": group_id, "status": outcome})
+
+        if new_bookings:
+            # bulk_create مش بيبعت post_save، فالعداد والكاش بيتحدثوا هنا
+            Booking.objects.bulk_create(new_bookings, batch_size=batch_size)
+            added = Counter(booking.group_id for booking in new_bookings)
+            for group_id, count in added.items():
+                groups[group_id].booked_count += count
+            Group.objects.bulk_update(
+                [groups[group_id] for group_id in added], ["booked_count"], batch_size=batch_size
+            )
+            transaction.on_commit(bump_catalogue_version)
+            transaction.on_commit(lambda: publish_seats(list(added)))
+
+    return results
@@ -1,10 +1,12 @@
-from django.db.models.signals import post_save
+from django.db.models import F
+from django.db.models.signals import post_delete
 from django.dispatch import receiver
+from groups.models import Group
 from .models import Booking
 
-@receiver(post_save, sender=Booking)
-def add_student_to_group(sender, instance, created, **kwargs):
-    if created:
-        # إضافة الطالب للجروب تلقائيًا
-        instance.group.students.add(instance.student)
-
+@receiver(post_delete, sender=Booking)
+def release_booked_seat(sender, instance, **kwargs):
+    # يغطي leave_group وbooking_detail DELETE والحذف المتسلسل للطالب أو المجموعة
+    Group.objects.filter(pk=instance.group_id, booked_count__gt=0).update(
+        booked_count=F("booked_count") - 1
+    )
@@ -0,0 +1,541 @@
+import csv
+import hashlib
+import io
+import json
+from datetime import timedelta
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from groups.models import Group
+from students.models import Student
+from . import idempotency, waiting_room
+from .models import Booking, WaitlistEntry
+from .placement import ALREADY_PLACED, NO_SEAT, UNKNOWN_STUDENT, auto_place
+from .services import (
+    BULK_CREATED, BULK_DUPLICATE, BULK_GROUP_FULL, BULK_UNKNOWN_GROUP, BULK_UNKNOWN_STUDENT,
+    AlreadyBookedError, GroupFullError, bulk_reserve, join_waitlist, release_seat, reserve_seat
+)
+
+
+def make_students(count, start=0):
+    return Student.objects.bulk_create(
+        Student(
+            full_name=f"طالب {i}",
+            email=f"student{i}@example.com",
+            phone=f"0101{i:07d}",
+            stage="PREP",
+        )
+        for i in range(start, start + count)
+    )
+
+
+class ReserveSeatTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="مجموعة", stage="PREP", capacity=2, schedule="4-6")
+        cls.students = make_students(3)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_fills_up_to_capacity(self):
+        reserve_seat(self.students[0], self.group.pk)
+        reserve_seat(self.students[1], self.group.pk)
+        with self.assertRaises(GroupFullError):
+            reserve_seat(self.students[2], self.group.pk)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.booked_count, 2)
+        self.assertEqual(Booking.objects.filter(group=self.group).count(), 2)
+
+    def test_duplicate_booking_is_rejected_without_taking_a_seat(self):
+        reserve_seat(self.students[0], self.group.pk)
+        with self.assertRaises(AlreadyBookedError):
+            reserve_seat(self.students[0], self.group.pk)
+        self.group.refresh_from_db()
+        # الزيادة اترجعت مع الـ savepoint
+        self.assertEqual(self.group.booked_count, 1)
+        self.assertEqual(Booking.objects.filter(group=self.group).count(), 1)
+
+
+class BookedCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="مجموعة", stage="PREP", capacity=1, schedule="4-6")
+        cls.students = make_students(2)
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.admin)
+
+    def test_release_frees_the_seat(self):
+        booking = reserve_seat(self.students[0], self.group.pk)
+        release_seat(booking)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.booked_count, 0)
+        reserve_seat(self.students[1], self.group.pk)
+
+    def test_admin_add_to_full_group_shows_form_error(self):
+        reserve_seat(self.students[0], self.group.pk)
+        response = self.client.post(
+            reverse("admin:bookings_booking_add"), {"student": self.students[1].pk, "group": self.group.pk}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "المجموعة ممتلئة")
+        self.assertEqual(Booking.objects.count(), 1)
+
+    def test_admin_add_duplicate_shows_form_error(self):
+        Group.objects.filter(pk=self.group.pk).update(capacity=5)
+        reserve_seat(self.students[0], self.group.pk)
+        response = self.client.post(
+            reverse("admin:bookings_booking_add"), {"student": self.students[0].pk, "group": self.group.pk}
+        )
+        self.assertContains(response, "الطالب مسجل بالفعل في هذه المجموعة")
+
+    def test_admin_reports_reserve_seat_failure(self):
+        # المجموعة اتملت بين clean() والحفظ
+        with mock.patch("bookings.admin.reserve_seat", side_effect=GroupFullError()):
+            response = self.client.post(
+                reverse("admin:bookings_booking_add"),
+                {"student": self.students[1].pk, "group": self.group.pk},
+                follow=True,
+            )
+        self.assertEqual(response.redirect_chain, [(reverse("admin:bookings_booking_add"), 302)])
+        self.assertContains(response, GroupFullError.message)
+        self.assertEqual(Booking.objects.count(), 0)
+
+
+class BulkReserveTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="مجموعة", stage="PREP", capacity=3, schedule="4-6")
+        cls.small = Group.objects.create(name="صغيرة", stage="PREP", capacity=1, schedule="6-8")
+        cls.students = make_students(4)
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_each_item_gets_its_own_status(self):
+        s = [student.pk for student in self.students]
+        reserve_seat(self.students[0], self.group.pk)
+        results = bulk_reserve([
+            (s[1], self.group.pk),
+            (s[0], self.group.pk),      # محجوز من قبل
+            (s[1], self.group.pk),      # متكرر في نفس الطلب
+            (s[2], self.small.pk),
+            (s[3], self.small.pk),      # المجموعة اتملت
+            (999999, self.group.pk),
+            (s[2], 999999),
+        ])
+        self.assertEqual([result["status"] for result in results], [
+            BULK_CREATED, BULK_DUPLICATE, BULK_DUPLICATE, BULK_CREATED,
+            BULK_GROUP_FULL, BULK_UNKNOWN_STUDENT, BULK_UNKNOWN_GROUP,
+        ])
+        for group in Group.objects.all():
+            self.assertEqual(group.booked_count, group.bookings.count(), group.name)
+        self.assertEqual(Group.objects.get(pk=self.group.pk).booked_count, 2)
+
+    def test_endpoint_returns_results_and_summary(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.post(reverse("bookings:bulk-booking-create"), {
+            "bookings": [{"student": student.pk, "group": self.small.pk} for student in self.students[:2]],
+        }, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["summary"], {BULK_CREATED: 1, BULK_GROUP_FULL: 1})
+        self.assertEqual(Booking.objects.filter(group=self.small).count(), 1)
+
+
+class WaitlistPromotionTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="مجموعة", stage="PREP", capacity=1, schedule="4-6")
+        cls.students = make_students(4)
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.booking = reserve_seat(self.students[0], self.group.pk)
+        self.entries = [join_waitlist(student, self.group.pk) for student in self.students[1:]]
+
+    def test_positions_follow_join_order(self):
+        self.assertEqual([entry.position for entry in self.entries], [1, 2, 3])
+
+    def test_release_promotes_head(self):
+        release_seat(self.booking)
+        self.assertTrue(Booking.objects.filter(student=self.students[1], group=self.group).exists())
+        self.assertEqual(
+            list(WaitlistEntry.objects.filter(group=self.group).values_list("student_id", flat=True)),
+            [self.students[2].pk, self.students[3].pk],
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.booked_count, 1)
+
+    def test_head_that_left_the_waitlist_is_skipped(self):
+        self.entries[0].delete()
+        release_seat(self.booking)
+        self.assertTrue(Booking.objects.filter(student=self.students[2], group=self.group).exists())
+
+    def test_capacity_increase_promotes_waiting_students(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.put(
+            reverse("groups:group-detail", args=[self.group.pk]), {"capacity": 3}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            set(Booking.objects.filter(group=self.group).values_list("student_id", flat=True)),
+            {self.students[0].pk, self.students[1].pk, self.students[2].pk},
+        )
+        self.assertEqual(WaitlistEntry.objects.get(group=self.group).student, self.students[3])
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.booked_count, 3)
+
+
+class IdempotencyKeyTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.groups = Group.objects.bulk_create(
+            Group(name=f"مجموعة {i}", stage="PREP", capacity=5, schedule="4-6") for i in range(2)
+        )
+        cls.user = get_user_model().objects.create_user(
+            username="student", email="student@example.com", password="pass"
+        )
+        cls.student = Student.objects.create(
+            user=cls.user, full_name="طالب", email="s@example.com", phone="01012345678", stage="PREP"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+        self.url = reverse("bookings:booking-list-create")
+
+    def post(self, group, key="key-1"):
+        return self.client.post(
+            self.url, {"student": self.student.pk, "group": group.pk}, format="json",
+            HTTP_IDEMPOTENCY_KEY=key,
+        )
+
+    def test_replay_returns_the_first_response(self):
+        first = self.post(self.groups[0])
+        replay = self.post(self.groups[0])
+        self.assertEqual(first.status_code, 201)
+        self.assertEqual(replay.status_code, 201)
+        self.assertEqual(replay.data, first.data)
+        self.assertEqual(replay["Idempotent-Replayed"], "true")
+        self.assertEqual(Booking.objects.filter(student=self.student).count(), 1)
+
+    def test_same_key_with_different_body_is_422(self):
+        self.post(self.groups[0])
+        response = self.post(self.groups[1])
+        self.assertEqual(response.status_code, 422)
+        self.assertFalse(Booking.objects.filter(group=self.groups[1]).exists())
+
+    def test_key_in_progress_is_409(self):
+        scope = f"{self.user.pk}:{self.url}:key-1"
+        cache.set("idempotency:" + hashlib.sha256(scope.encode()).hexdigest(), idempotency.IN_PROGRESS)
+        response = self.post(self.groups[0])
+        self.assertEqual(response.status_code, 409)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_waiting_room_429_is_not_replayed_after_admit_time(self):
+        group = Group.objects.create(
+            name="بموعد", stage="PREP", capacity=5, schedule="8-9",
+            opens_at=timezone.now() + timedelta(minutes=5),
+        )
+        token, _, admit_ms = waiting_room.issue_ticket(group, self.user)
+        url = reverse("bookings:join-group", args=[group.pk])
+        headers = {"HTTP_IDEMPOTENCY_KEY": "key-1", "HTTP_ADMISSION_TOKEN": token}
+        early = self.client.post(url, **headers)
+        self.assertEqual(early.status_code, 429)
+        self.assertIn("Retry-After", early)
+        with mock.patch("bookings.waiting_room._now_ms", return_value=admit_ms + 1):
+            response = self.client.post(url, **headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertFalse(response.has_header("Idempotent-Replayed"))
+        self.assertTrue(Booking.objects.filter(student=self.student, group=group).exists())
+
+    def test_without_key_every_request_runs(self):
+        data = {"student": self.student.pk, "group": self.groups[0].pk}
+        self.client.post(self.url, data, format="json")
+        response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, 400)
+
+
+class AdminBookingsListTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        groups = Group.objects.bulk_create(
+            Group(name=f"مجموعة {i}", stage="PREP", capacity=5, schedule="4-6") for i in range(2)
+        )
+        students = make_students(5)
+        Booking.objects.bulk_create(
+            Booking(student=student, group=groups[i % 2]) for i, student in enumerate(students)
+        )
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+        self.url = reverse("bookings:admin-bookings-list")
+
+    def test_pages_cover_every_booking_once(self):
+        response = self.client.get(self.url, {"page_size": 2})
+        self.assertEqual(len(response.data["results"]), 2)
+        ids = []
+        while True:
+            ids += [booking["id"] for booking in response.data["results"]]
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+        self.assertEqual(ids, list(Booking.objects.order_by("-id").values_list("id", flat=True)))
+        self.assertEqual(response.data["results"][0]["student_details"]["full_name"], "طالب 0")
+
+    def test_csv_export_streams_every_row(self):
+        response = self.client.get(self.url, {"format": "csv"})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b"".join(response.streaming_content).decode("utf-8")
+        self.assertTrue(content.startswith("\ufeffid,created_at,student_id"))
+        rows = list(csv.reader(io.StringIO(content.lstrip("\ufeff"))))
+        self.assertEqual(len(rows), 6)
+        self.assertEqual(rows[1][3], "طالب 0")
+
+    def test_ndjson_export_streams_one_object_per_line(self):
+        response = self.client.get(self.url, {"format": "ndjson"})
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        self.assertEqual(len(lines), 5)
+        first = json.loads(lines[0])
+        self.assertEqual((first["student_name"], first["group_name"]), ("طالب 0", "مجموعة 0"))
+
+
+@override_settings(TOKEN_BUCKET_RATES={"enroll": {"user": "2/min"}})
+class EnrollmentThrottleTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="مجموعة", stage="PREP", capacity=5, schedule="4-6")
+        cls.users = [
+            get_user_model().objects.create_user(
+                username=f"student{i}", email=f"student{i}@example.com", password="pass"
+            )
+            for i in range(2)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.url = reverse("bookings:join-group", args=[self.group.pk])
+
+    def test_empty_bucket_returns_429_with_retry_after(self):
+        self.client.force_authenticate(self.users[0])
+        for _ in range(2):
+            self.assertNotEqual(self.client.post(self.url).status_code, 429)
+        response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 1)
+
+    def test_buckets_are_per_user(self):
+        self.client.force_authenticate(self.users[0])
+        for _ in range(3):
+            self.client.post(self.url)
+        self.client.force_authenticate(self.users[1])
+        self.assertNotEqual(self.client.post(self.url).status_code, 429)
+
+
+@override_settings(WAITING_ROOM_ADMIT_RATE="2/sec", WAITING_ROOM_ADMISSION_WINDOW=60)
+class WaitingRoomTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        opens_at = timezone.now() + timedelta(minutes=5)
+        cls.group = Group.objects.create(
+            name="بموعد", stage="PREP", capacity=5, schedule="4-6", opens_at=opens_at
+        )
+        cls.other_group = Group.objects.create(
+            name="بموعد تاني", stage="PREP", capacity=5, schedule="6-8", opens_at=opens_at
+        )
+        cls.users = [
+            get_user_model().objects.create_user(
+                username=f"student{i}", email=f"student{i}@example.com", password="pass"
+            )
+            for i in range(3)
+        ]
+        cls.students = [
+            Student.objects.create(
+                user=user, full_name=f"طالب {i}", email=f"s{i}@example.com",
+                phone=f"0101000000{i}", stage="PREP",
+            )
+            for i, user in enumerate(cls.users)
+        ]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.users[0])
+
+    def join(self, token, group=None, **extra):
+        url = reverse("bookings:join-group", args=[(group or self.group).pk])
+        return self.client.post(url, HTTP_ADMISSION_TOKEN=token, **extra)
+
+    def test_tickets_are_ordered_and_paced(self):
+        tickets = [waiting_room.issue_ticket(self.group, user) for user in self.users]
+        self.assertEqual([position for _, position, _ in tickets], [1, 2, 3])
+        opens_ms = int(self.group.opens_at.timestamp() * 1000)
+        self.assertEqual([admit_ms for _, _, admit_ms in tickets], [opens_ms, opens_ms + 500, opens_ms + 1000])
+
+    def test_asking_again_keeps_the_same_ticket(self):
+        first = self.client.post(reverse("bookings:waiting-room", args=[self.group.pk]))
+        again = self.client.post(reverse("bookings:waiting-room", args=[self.group.pk]))
+        self.assertEqual(first.data["position"], 1)
+        self.assertEqual(again.data["admission_token"], first.data["admission_token"])
+        self.assertEqual(waiting_room.issue_ticket(self.group, self.users[1])[1], 2)
+
+    def test_early_token_is_429_with_retry_after(self):
+        token, _, _ = waiting_room.issue_ticket(self.group, self.users[0])
+        response = self.join(token)
+        self.assertEqual(response.status_code, 429)
+        self.assertGreaterEqual(int(response["Retry-After"]), 299)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_token_works_after_admit_time(self):
+        token, _, admit_ms = waiting_room.issue_ticket(self.group, self.users[0])
+        with mock.patch("bookings.waiting_room._now_ms", return_value=admit_ms + 1):
+            self.assertEqual(self.join(token).status_code, 201)
+
+    def test_expired_token_is_rejected(self):
+        token, _, admit_ms = waiting_room.issue_ticket(self.group, self.users[0])
+        with mock.patch("bookings.waiting_room._now_ms", return_value=admit_ms + 61 * 1000):
+            self.assertEqual(self.join(token).status_code, 403)
+
+    def test_token_of_another_user_or_group_is_rejected(self):
+        token, _, admit_ms = waiting_room.issue_ticket(self.group, self.users[1])
+        with mock.patch("bookings.waiting_room._now_ms", return_value=admit_ms + 1):
+            self.assertEqual(self.join(token).status_code, 403)
+            self.client.force_authenticate(self.users[1])
+            self.assertEqual(self.join(token, group=self.other_group).status_code, 403)
+            self.assertEqual(self.join("").status_code, 403)
+        self.assertFalse(Booking.objects.exists())
+
+    def test_booking_serializer_checks_the_token(self):
+        url = reverse("bookings:booking-list-create")
+        data = {"student": self.students[0].pk, "group": self.group.pk}
+        token, _, admit_ms = waiting_room.issue_ticket(self.group, self.users[0])
+        headers = {"HTTP_ADMISSION_TOKEN": token, "HTTP_IDEMPOTENCY_KEY": "key-1"}
+        early = self.client.post(url, data, format="json", **headers)
+        self.assertEqual(early.status_code, 400)
+        self.assertIn("group", early.data)
+        # الرفض المؤقت ما اتخزنش مع المفتاح
+        with mock.patch("bookings.waiting_room._now_ms", return_value=admit_ms + 1):
+            response = self.client.post(url, data, format="json", **headers)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Booking.objects.filter(student=self.students[0], group=self.group).exists())
+
+    def test_expired_token_403_is_not_replayed(self):
+        token, _, admit_ms = waiting_room.issue_ticket(self.group, self.users[0])
+        with mock.patch("bookings.waiting_room._now_ms", return_value=admit_ms + 61 * 1000):
+            self.assertEqual(self.join(token, HTTP_IDEMPOTENCY_KEY="key-1").status_code, 403)
+        cache.delete(waiting_room._queue_key(self.group, f"user:{self.users[0].pk}"))
+        fresh, _, admit_ms = waiting_room.issue_ticket(self.group, self.users[0])
+        with mock.patch("bookings.waiting_room._now_ms", return_value=admit_ms + 1):
+            self.assertEqual(self.join(fresh, HTTP_IDEMPOTENCY_KEY="key-1").status_code, 201)
+
+
+class AutoPlacementTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.saturday = Group.objects.create(
+            name="سبت", stage="PREP", capacity=1, schedule="4-6", days="السبت"
+        )
+        cls.monday = Group.objects.create(
+            name="اثنين", stage="PREP", capacity=2, schedule="4-6", days="الاثنين"
+        )
+        cls.saturday_late = Group.objects.create(
+            name="سبت متأخر", stage="PREP", capacity=1, schedule="6-8", days="السبت"
+        )
+        cls.grade6 = Group.objects.create(
+            name="سادس", stage="GRADE6", capacity=5, schedule="4-6", days="السبت"
+        )
+        cls.students = make_students(4)
+
+    def placed(self, result):
+        return {item["student"]: (item["group"], item["choice"]) for item in result["placed"]}
+
+    def assert_counts_match_bookings(self):
+        for group in Group.objects.all():
+            self.assertEqual(group.booked_count, group.bookings.count(), group.name)
+
+    def test_priority_order_decides_who_gets_a_full_group(self):
+        s = [student.pk for student in self.students]
+        result = auto_place([
+            (s[0], [self.saturday.pk, self.monday.pk], []),
+            (s[1], [self.saturday.pk, self.monday.pk], []),
+            (s[2], [self.saturday.pk], []),
+        ], fill=False)
+        self.assertEqual(self.placed(result), {
+            s[0]: (self.saturday.pk, 1),
+            s[1]: (self.monday.pk, 2),
+        })
+        self.assertEqual(result["unplaced"], [{"student": s[2], "reason": NO_SEAT}])
+        self.assert_counts_match_bookings()
+
+    def test_days_pick_groups_that_meet_only_on_those_days(self):
+        s = [student.pk for student in self.students]
+        result = auto_place([(s[0], [], [0]), (s[1], [], [5]), (s[2], [], [5]), (s[3], [], [5])], fill=False)
+        placed = self.placed(result)
+        self.assertEqual(placed[s[0]][0], self.monday.pk)
+        self.assertEqual(
+            sorted(placed[pk][0] for pk in (s[1], s[2])), sorted([self.saturday.pk, self.saturday_late.pk])
+        )
+        self.assertEqual(result["unplaced"], [{"student": s[3], "reason": NO_SEAT}])
+
+    def test_fill_places_leftovers_in_the_emptiest_group(self):
+        s = [student.pk for student in self.students]
+        result = auto_place([(s[0], [self.saturday.pk], []), (s[1], [self.saturday.pk], [])])
+        self.assertEqual(self.placed(result)[s[1]], (self.monday.pk, None))
+        self.assertEqual(result["unplaced"], [])
+        self.assert_counts_match_bookings()
+
+    def test_fill_skips_groups_that_clash_with_existing_bookings(self):
+        # حجز في مرحلة تانية يوم الاثنين 4-6، فمجموعة الاثنين (الأفضى) بتتعارض
+        other = Group.objects.create(name="سادس اثنين", stage="GRADE6", capacity=5, schedule="4-6", days="الاثنين")
+        reserve_seat(self.students[0], other.pk)
+        result = auto_place([(self.students[0].pk, [], [])])
+        group, choice = self.placed(result)[self.students[0].pk]
+        self.assertIn(group, {self.saturday.pk, self.saturday_late.pk})
+        self.assertIsNone(choice)
+
+    def test_report_lists_unknown_and_already_placed_students(self):
+        reserve_seat(self.students[0], self.monday.pk)
+        result = auto_place([(self.students[0].pk, [self.saturday.pk], []), (999999, [self.saturday.pk], [])])
+        self.assertEqual(result["placed"], [])
+        self.assertEqual(result["unplaced"], [
+            {"student": self.students[0].pk, "reason": ALREADY_PLACED},
+            {"student": 999999, "reason": UNKNOWN_STUDENT},
+        ])
+
+    def test_dry_run_writes_nothing(self):
+        s = [student.pk for student in self.students]
+        result = auto_place([(pk, [self.saturday.pk], []) for pk in s], dry_run=True)
+        self.assertEqual(len(result["placed"]), 4)
+        self.assertFalse(Booking.objects.exists())
+        self.assertEqual(sum(Group.objects.values_list("booked_count", flat=True)), 0)
+
+    def test_endpoint_returns_a_summary(self):
+        admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+        self.client.force_authenticate(admin)
+        response = self.client.post(reverse("bookings:auto-placement"), {
+            "preferences": [{"student": student.pk, "groups": [self.saturday.pk]} for student in self.students],
+            "fill": False,
+        }, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["summary"]["placed"], 1)
+        self.assertEqual(response.data["summary"]["unplaced"], {NO_SEAT: 3})
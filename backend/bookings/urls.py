@@ -6,7 +6,11 @@ app_name = "bookings"
 urlpatterns = [
     path("", views.booking_list_create, name="booking-list-create"),
     path("<int:pk>/", views.booking_detail, name="booking-detail"),
+    path("bulk/", views.bulk_booking_create, name="bulk-booking-create"),
+    path("auto-place/", views.auto_placement, name="auto-placement"),
     path("group/<int:group_id>/join/", views.join_group, name="join-group"),
+    path("group/<int:group_id>/waiting-room/", views.waiting_room_ticket, name="waiting-room"),
     path("group/<int:group_id>/leave/", views.leave_group, name="leave-group"),
+    path("group/<int:group_id>/waitlist/", views.waitlist_detail, name="waitlist-detail"),
     path("admin/", views.admin_bookings_list, name="admin-bookings-list")
 ]
\ No newline at end of file
@@ -1,15 +1,43 @@
+from collections import Counter
+import math
+import time
+from datetime import datetime, timezone as dt_timezone
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, renderer_classes, throttle_classes
+from rest_framework.settings import api_settings
 from rest_framework.permissions import IsAuthenticated, IsAdminUser
 from rest_framework.response import Response
 from rest_framework import status
-from .models import Booking
-from .serializers import BookingSerializer, BookingDetailSerializer
+from .models import Booking, WaitlistEntry
+from .serializers import (
+    BookingSerializer, BookingDetailSerializer, BulkBookingSerializer, WaitlistEntrySerializer,
+    AutoPlacementSerializer
+)
+from .services import (
+    reserve_seat, release_seat, bulk_reserve, join_waitlist, check_schedule_conflict,
+    BookingError, GroupFullError
+)
+from .idempotency import idempotent, no_store
+from .placement import auto_place
+from . import waiting_room
+from .exports import booking_rows, csv_lines, ndjson_lines, CSVStreamRenderer, NDJSONStreamRenderer
+from backend.pagination import KeysetPagination
+from backend.throttling import EnrollmentThrottle
 from groups.models import Group
 from students.models import Student
 
+def _invalid_booking(serializer):
+    response = Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    if waiting_room.rejected(serializer.errors):
+        # دوره لسه ماجاش أو التصريح خلص: نفس الطلب ممكن ينجح بعدين
+        no_store(response)
+    return response
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([EnrollmentThrottle])
+@idempotent
 def booking_list_create(request):
     """
     GET: قائمة بحجوزات المستخدم
@@ -53,7 +81,7 @@ def booking_list_create(request):
         if serializer.is_valid():
             serializer.save()
             return Response(serializer.data, status=status.HTTP_201_CREATED)
-        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        return _invalid_booking(serializer)
 
 @api_view(['GET', 'DELETE'])
 @permission_classes([IsAuthenticated])
@@ -80,7 +108,7 @@ def booking_detail(request, pk):
         return Response(serializer.data)
     
     elif request.method == 'DELETE':
-        booking.delete()
+        release_seat(booking)
         return Response(
             {"message": "تم إلغاء الحجز بنجاح"}, 
             status=status.HTTP_200_OK
@@ -88,9 +116,12 @@ def booking_detail(request, pk):
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@throttle_classes([EnrollmentThrottle])
+@idempotent
 def join_group(request, group_id):
     """
     الانضمام إلى مجموعة (إنشاء حجز)
+    ?waitlist=true: لو المجموعة مكتملة يدخل الطالب قائمة الانتظار بدل رفض الطلب
     """
     group = get_object_or_404(Group, id=group_id)
 
@@ -102,13 +133,39 @@ def join_group(request, group_id):
             status=status.HTTP_400_BAD_REQUEST
         )
 
-    if group.is_full:
-        return Response({"error": "هذه المجموعة مكتملة"}, status=status.HTTP_400_BAD_REQUEST)
+    if group.opens_at:
+        try:
+            waiting_room.check_admission(
+                request.headers.get(waiting_room.HEADER), group, request.user
+            )
+        except waiting_room.AdmissionError as e:
+            # رفض غرفة الانتظار مؤقت، فما يتخزنش مع الـ Idempotency-Key
+            if e.retry_after is None:
+                return no_store(Response({"error": e.message}, status=status.HTTP_403_FORBIDDEN))
+            return no_store(Response(
+                {"error": e.message, "retry_after": e.retry_after},
+                status=status.HTTP_429_TOO_MANY_REQUESTS,
+                headers={"Retry-After": str(math.ceil(e.retry_after))}
+            ))
 
-    if Booking.objects.filter(student=student, group=group).exists():
-        return Response({"error": "أنت بالفعل عضو في هذه المجموعة"}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        check_schedule_conflict(student, group)
+        booking = reserve_seat(student, group.pk)
+    except GroupFullError as e:
+        if request.query_params.get("waitlist", "").lower() not in ("1", "true", "yes"):
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            booking = join_waitlist(student, group.pk)
+        except BookingError as e:
+            return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+        if isinstance(booking, WaitlistEntry):
+            return Response({
+                "message": "المجموعة مكتملة، تمت إضافتك إلى قائمة الانتظار",
+                "waitlist": WaitlistEntrySerializer(booking).data
+            }, status=status.HTTP_202_ACCEPTED)
+    except BookingError as e:
+        return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
 
-    booking = Booking.objects.create(student=student, group=group)
     serializer = BookingSerializer(booking)
     
     return Response({
@@ -116,6 +173,30 @@ def join_group(request, group_id):
         "booking": serializer.data
     }, status=status.HTTP_201_CREATED)
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def waiting_room_ticket(request, group_id):
+    """
+    غرفة الانتظار لمجموعة ليها opens_at
+    بترجع admission_token يتبعت في Header "Admission-Token" مع join/ بعد retry_after ثانية.
+    إعادة الطلب بترجع نفس الترتيب.
+    """
+    group = get_object_or_404(Group.objects.only("id", "opens_at"), id=group_id)
+    if not group.opens_at:
+        return Response(
+            {"error": "المجموعة دي مفيهاش موعد فتح، احجز مباشرة"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    token, position, admit_ms = waiting_room.issue_ticket(group, request.user)
+    retry_after = max(0, admit_ms / 1000 - time.time())
+    return Response({
+        "admission_token": token,
+        "position": position,
+        "admit_at": datetime.fromtimestamp(admit_ms / 1000, tz=dt_timezone.utc),
+        "retry_after": retry_after,
+    }, headers={"Retry-After": str(math.ceil(retry_after))})
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def leave_group(request, group_id):
@@ -134,19 +215,48 @@ def leave_group(request, group_id):
     
     booking = Booking.objects.filter(student=student, group=group).first()
     if booking:
-        booking.delete()
+        release_seat(booking)
         return Response({"message": "تم مغادرة المجموعة بنجاح"}, status=status.HTTP_200_OK)
     return Response({"error": "أنت لست عضوًا في هذه المجموعة"}, status=status.HTTP_400_BAD_REQUEST)
 
+@api_view(['GET', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def waitlist_detail(request, group_id):
+    """
+    GET: رقم الطالب في قائمة انتظار المجموعة
+    DELETE: الخروج من قائمة الانتظار
+    """
+    try:
+        student = request.user.student
+    except Student.DoesNotExist:
+        return Response(
+            {"error": "لا يوجد طالب مرتبط بحسابك"}, 
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    entry = WaitlistEntry.objects.filter(student=student, group_id=group_id).first()
+    if entry is None:
+        return Response(
+            {"error": "أنت لست في قائمة انتظار هذه المجموعة"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    if request.method == 'GET':
+        return Response(WaitlistEntrySerializer(entry).data)
+
+    entry.delete()
+    return Response({"message": "تم الخروج من قائمة الانتظار"}, status=status.HTTP_200_OK)
+
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+@idempotent
 def create_booking(request):
     """دالة قديمة لإنشاء حجز - يمكن استخدام booking_list_create بدلاً منها"""
     serializer = BookingSerializer(data=request.data, context={'request': request})
     if serializer.is_valid():
         serializer.save()
         return Response(serializer.data, status=status.HTTP_201_CREATED)
-    return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    return _invalid_booking(serializer)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -165,16 +275,70 @@ def list_bookings(request):
 
 @api_view(['GET'])
 @permission_classes([IsAdminUser])
+@renderer_classes(api_settings.DEFAULT_RENDERER_CLASSES + [CSVStreamRenderer, NDJSONStreamRenderer])
 def admin_bookings_list(request):
     """
     Admin endpoint to get all bookings with student and group details
+    ?format=csv | ?format=ndjson: export every booking as a stream
+    default: keyset (cursor) pagination؛ الفرونت بيمشي على next لحد آخر صفحة
     """
-    try:
-        bookings = Booking.objects.all().select_related('student', 'group')
-        serializer = BookingDetailSerializer(bookings, many=True)
-        return Response(serializer.data)
-    except Exception as e:
-        return Response(
-            {"error": str(e)}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
-        )
\ No newline at end of file
+    export_format = request.query_params.get("format")
+    if export_format == "csv":
+        response = StreamingHttpResponse(csv_lines(booking_rows()), content_type="text/csv; charset=utf-8")
+        response["Content-Disposition"] = 'attachment; filename="bookings.csv"'
+        return response
+    if export_format == "ndjson":
+        return StreamingHttpResponse(ndjson_lines(booking_rows()), content_type="application/x-ndjson")
+
+    bookings = Booking.objects.select_related('student', 'group')
+    paginator = KeysetPagination(ordering="-id")
+    page = paginator.paginate_queryset(bookings, request)
+    serializer = BookingDetailSerializer(page, many=True)
+    return paginator.get_paginated_response(serializer.data)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+@idempotent
+def bulk_booking_create(request):
+    """
+    تسجيل عدد كبير من الطلاب في المجموعات مرة واحدة (للأدمن)
+    body: {"bookings": [{"student": 1, "group": 2}, ...]}
+    """
+    serializer = BulkBookingSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    pairs = [(item["student"], item["group"]) for item in serializer.validated_data["bookings"]]
+    results = bulk_reserve(pairs)
+    return Response({
+        "summary": Counter(result["status"] for result in results),
+        "results": results,
+    }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsAdminUser])
+@idempotent
+def auto_placement(request):
+    """
+    توزيع الطلاب الجدد على المجموعات حسب اختياراتهم (للأدمن)
+    body: {"preferences": [{"student": 1, "groups": [4, 2], "days": ["السبت"]}, ...],
+           "fill": true, "dry_run": false}
+    ترتيب preferences هو الأولوية لما مجموعة تتملي.
+    """
+    serializer = AutoPlacementSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    data = serializer.validated_data
+    result = auto_place(
+        [(item["student"], item["groups"], item["days"]) for item in data["preferences"]],
+        fill=data["fill"],
+        dry_run=data["dry_run"],
+    )
+    return Response({
+        "summary": {
+            "placed": len(result["placed"]),
+            "unplaced": Counter(item["reason"] for item in result["unplaced"]),
+        },
+        **result,
+    }, status=status.HTTP_200_OK)
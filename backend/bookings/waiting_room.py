@@ -0,0 +1,103 @@
+"""
+غرفة انتظار للمجموعات اللي ليها موعد فتح (Group.opens_at).
+
+بدل ما كل الطلاب يضربوا join_group في نفس اللحظة، كل طالب بياخد من
+غرفة الانتظار تصريح دخول موقّع فيه ترتيبه والوقت اللي دوره بييجي فيه.
+المواعيد بتتوزع بمعدل WAITING_ROOM_ADMIT_RATE لكل مجموعة، فقاعدة البيانات
+بتستقبل طابور منتظم بدل موجة واحدة. التصريح بيتحقق منه بالتوقيع بس،
+من غير أي استعلام.
+"""
+import time
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+
+from backend.throttling import parse_rate
+
+HEADER = "Admission-Token"
+SALT = "bookings.waiting-room"
+# عمر عدادات الطابور في الـ cache
+QUEUE_TIMEOUT = 24 * 60 * 60
+# code الـ ValidationError لما BookingSerializer يرفض التصريح
+ADMISSION_CODE = "admission"
+
+
+class AdmissionError(Exception):
+    def __init__(self, message, retry_after=None):
+        self.message = message
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+def rejected(errors):
+    """هل أخطاء الـ serializer سببها رفض غرفة الانتظار (رفض مؤقت مش نهائي)"""
+    return any(getattr(error, "code", None) == ADMISSION_CODE for error in errors.get("group", []))
+
+
+def _queue_key(group, name):
+    # تغيير opens_at بيبدأ طابور جديد
+    return f"waiting_room:{group.pk}:{int(group.opens_at.timestamp())}:{name}"
+
+
+def _now_ms():
+    return int(time.time() * 1000)
+
+
+def issue_ticket(group, user):
+    """
+    ترتيب الطالب وموعد دخوله. نفس الطالب بياخد نفس التصريح لحد ما
+    صلاحيته تخلص، فإعادة الطلب ما بتأخرهوش ولا بتزود الطابور.
+    Returns (token, position, admit_at_ms)
+    """
+    user_key = _queue_key(group, f"user:{user.pk}")
+    ticket = cache.get(user_key)
+    if ticket is not None:
+        return ticket
+
+    capacity, period = parse_rate(settings.WAITING_ROOM_ADMIT_RATE)
+    interval = period * 1000 // capacity
+    opens_ms = int(group.opens_at.timestamp() * 1000)
+    now = _now_ms()
+
+    seq_key = _queue_key(group, "seq")
+    cache.add(seq_key, 0, QUEUE_TIMEOUT)
+    position = cache.incr(seq_key)
+
+    # آخر موعد اتوزع؛ كل تصريح جديد بياخد الموعد اللي بعده بـ interval
+    slot_key = _queue_key(group, "slot")
+    cache.add(slot_key, opens_ms - interval, QUEUE_TIMEOUT)
+    admit_ms = cache.incr(slot_key, interval)
+    if admit_ms < now:
+        # الطابور فضي: اللي جاي دلوقتي يدخل على طول
+        cache.set(slot_key, now, QUEUE_TIMEOUT)
+        admit_ms = now
+
+    token = signing.dumps(
+        {"g": group.pk, "u": user.pk, "n": position, "t": admit_ms}, salt=SALT, compress=True
+    )
+    ticket = (token, position, admit_ms)
+    timeout = (admit_ms - now) // 1000 + settings.WAITING_ROOM_ADMISSION_WINDOW
+    if not cache.add(user_key, ticket, timeout):
+        # طلبين متزامنين لنفس الطالب: الأول هو اللي بيتحسب
+        ticket = cache.get(user_key, ticket)
+    return ticket
+
+
+def check_admission(token, group, user):
+    """يرفع AdmissionError لو التصريح ناقص أو مش بتاع الطالب ده أو لسه دوره ماجاش"""
+    if not token:
+        raise AdmissionError("الحجز في المجموعة دي بيتم عن طريق غرفة الانتظار فقط")
+    try:
+        data = signing.loads(token, salt=SALT)
+    except signing.BadSignature:
+        raise AdmissionError("تصريح الدخول غير صالح")
+    if data.get("g") != group.pk or data.get("u") != user.pk:
+        raise AdmissionError("تصريح الدخول غير صالح")
+
+    now = _now_ms()
+    admit_ms = data["t"]
+    if now < admit_ms:
+        raise AdmissionError("لم يحن دورك بعد", retry_after=(admit_ms - now) / 1000)
+    if now > admit_ms + settings.WAITING_ROOM_ADMISSION_WINDOW * 1000:
+        raise AdmissionError("انتهت صلاحية تصريح الدخول، ادخل غرفة الانتظار من جديد")
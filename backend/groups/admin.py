@@ -1,9 +1,21 @@
 from django.contrib import admin
-from .models import Group
+from .models import Group, GroupTimeslot
+
+
+class GroupTimeslotInline(admin.TabularInline):
+    # بتتولد من schedule وdays عند الحفظ
+    model = GroupTimeslot
+    extra = 0
+    can_delete = False
+    readonly_fields = ('weekday', 'start', 'end')
+
+    def has_add_permission(self, request, obj=None):
+        return False
 
 # Register your models here.
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ('name', 'stage', 'capacity', 'seats_left' ,'schedule', 'days', 'created_at', 'updated_at')
+    list_display = ('name', 'stage', 'capacity', 'seats_left' ,'schedule', 'days', 'opens_at', 'created_at', 'updated_at')
     list_filter = ('stage', 'created_at', 'updated_at')
-    search_fields = ('name', 'stage', 'schedule', 'days')
\ No newline at end of file
+    search_fields = ('name', 'stage', 'schedule', 'days')
+    inlines = [GroupTimeslotInline]
\ No newline at end of file
@@ -0,0 +1,61 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+from backend.arabic import normalize_arabic
+
+VERSION_KEY = "groups:catalogue:version"
+
+# البارامترات اللي بتأثر فعلًا على رد الكتالوج؛ أي بارامتر تاني ميعملش مفتاح جديد
+LIST_PARAMS = (
+    "search", "stage", "ordering", "page", "include_students", "pagination", "cursor", "page_size",
+    "day", "at",
+)
+
+
+def catalogue_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        # لو المفتاح اتمسح نبدأ من الوقت الحالي عشان منرجعش لإصدار قديم لسه متخزن
+        cache.add(VERSION_KEY, int(time.time() * 1000), None)
+        version = cache.get(VERSION_KEY)
+    return version
+
+
+def bump_catalogue_version():
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        catalogue_version()
+
+
+def normalized_params(request):
+    params = request.query_params
+    normalized = {
+        "search": normalize_arabic(params.get("search")),
+        "stage": params.get("stage") or "",
+        "ordering": params.get("ordering") or "",
+        "page": params.get("page") or "1",
+        "include_students": params.get("include_students", "true").lower(),
+        "pagination": params.get("pagination") or "",
+        "cursor": params.get("cursor") or "",
+        "page_size": params.get("page_size") or "",
+        "day": (params.get("day") or "").strip().lower(),
+        "at": (params.get("at") or "").strip(),
+    }
+    return [(name, normalized[name]) for name in LIST_PARAMS]
+
+
+def catalogue_key(kind, request, *parts):
+    # روابط next/previous مطلقة، فالـ host جزء من المفتاح
+    raw = repr((request.scheme, request.get_host(), parts, normalized_params(request)))
+    digest = hashlib.sha1(raw.encode()).hexdigest()
+    return f"groups:catalogue:{catalogue_version()}:{kind}:{digest}"
+
+
+def get_cached(key):
+    return cache.get(key)
+
+
+def set_cached(key, data):
+    cache.set(key, data, settings.GROUP_CATALOGUE_CACHE_TIMEOUT)
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from groups.models import Group
+
+
+class Command(BaseCommand):
+    help = "Compare Group.booked_count with the real number of bookings and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--check", action="store_true", help="Only report drift, do not write"
+        )
+
+    def handle(self, *args, **options):
+        drifted = 0
+        rows = Group.objects.annotate(actual=Count("bookings")).values_list(
+            "pk", "name", "booked_count", "actual"
+        )
+        for pk, name, stored, actual in rows.iterator(chunk_size=500):
+            if stored == actual:
+                continue
+            drifted += 1
+            self.stdout.write(f"{name} (#{pk}): booked_count={stored} actual={actual}")
+            if not options["check"]:
+                with transaction.atomic():
+                    # نعيد العد تحت القفل عشان حجز متزامن ميضيعش
+                    group = Group.objects.select_for_update().get(pk=pk)
+                    Group.objects.filter(pk=pk).update(booked_count=group.bookings.count())
+
+        if not drifted:
+            self.stdout.write(self.style.SUCCESS("All booked counts are in sync"))
+        elif options["check"]:
+            self.stdout.write(self.style.WARNING(f"{drifted} group(s) drifted"))
+        else:
+            self.stdout.write(self.style.SUCCESS(f"Repaired {drifted} group(s)"))
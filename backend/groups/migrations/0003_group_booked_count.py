@@ -0,0 +1,37 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:30
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_booked_count(apps, schema_editor):
+    Group = apps.get_model('groups', 'Group')
+    Booking = apps.get_model('bookings', 'Booking')
+    counts = (
+        Booking.objects.filter(group=OuterRef('pk'))
+        .order_by()
+        .values('group')
+        .annotate(n=Count('pk'))
+        .values('n')
+    )
+    Group.objects.update(
+        booked_count=Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0002_initial'),
+        ('bookings', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='booked_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_booked_count, migrations.RunPython.noop),
+    ]
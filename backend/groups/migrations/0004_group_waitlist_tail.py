@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0003_group_booked_count'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='waitlist_tail',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+    ]
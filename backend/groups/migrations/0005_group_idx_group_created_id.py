@@ -0,0 +1,19 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_waitlistentry'),
+        ('groups', '0004_group_waitlist_tail'),
+        ('students', '0003_student_idx_student_created_id'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['created_at', 'id'], name='idx_group_created_id'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0005_group_idx_group_created_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='opens_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
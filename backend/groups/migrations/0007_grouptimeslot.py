@@ -0,0 +1,154 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:43
+
+import re
+from datetime import time
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# نسخة ثابتة من groups.timeslots وbackend.arabic وقت الـ migration دي؛
+# الكود الحي ممكن يتغير فالـ backfill لازم يفضل زي ما اتشحن
+
+ARABIC_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ة': 'ه', 'ؤ': 'و', 'ئ': 'ي',
+})
+DIACRITICS_RE = re.compile('[\u064b-\u0652\u0670\u0640]')
+
+DAY_NAMES = {
+    'ثلاثاء': 1, 'تلاتاء': 1,
+    'اربعاء': 2,
+    'خميس': 3,
+    'جمعه': 4,
+    'سبت': 5,
+}
+DEFINITE_DAY_NAMES = {
+    'اثنين': 0, 'اتنين': 0,
+    'ثلاثا': 1, 'تلات': 1,
+    'احد': 6,
+}
+ENGLISH_DAY_NAMES = {
+    'mon': 0, 'tue': 1, 'wed': 2, 'thu': 3, 'fri': 4, 'sat': 5, 'sun': 6,
+    'monday': 0, 'tuesday': 1, 'wednesday': 2, 'thursday': 3,
+    'friday': 4, 'saturday': 5, 'sunday': 6,
+}
+AM = {'ص', 'صباحا', 'am', 'a.m'}
+PM = {'م', 'مساء', 'مساءا', 'ظهرا', 'عصرا', 'ليلا', 'pm', 'p.m'}
+TIME_RE = re.compile(
+    r'(?<!\d)(\d{1,2})(?:[:.](\d{2}))?(?!\d)\s*'
+    r'(صباحا|ص|مساءا|مساء|ظهرا|عصرا|ليلا|م|a\.m|p\.m|am|pm)?(?![\w])'
+)
+
+
+def normalize_arabic(text):
+    text = DIACRITICS_RE.sub('', (text or '').translate(ARABIC_DIGITS).translate(LETTERS))
+    return ' '.join(text.lower().split())
+
+
+def parse_day(word):
+    word = normalize_arabic(word).strip()
+    if word.isdigit():
+        return int(word) if 0 <= int(word) <= 6 else None
+    if word in ENGLISH_DAY_NAMES:
+        return ENGLISH_DAY_NAMES[word]
+    for candidate in (word, word[1:] if word.startswith('و') else None):
+        if not candidate:
+            continue
+        if candidate in DAY_NAMES:
+            return DAY_NAMES[candidate]
+        if candidate.startswith('ال'):
+            name = candidate[2:]
+            if name in DAY_NAMES:
+                return DAY_NAMES[name]
+            if name in DEFINITE_DAY_NAMES:
+                return DEFINITE_DAY_NAMES[name]
+    return None
+
+
+def parse_days(text):
+    days = []
+    for word in re.findall(r'[^\W\d_]+', normalize_arabic(text)):
+        day = parse_day(word)
+        if day is not None and day not in days:
+            days.append(day)
+    return days
+
+
+def _to_24h(hour, period):
+    if period in PM and hour < 12:
+        return hour + 12
+    if period in AM and hour == 12:
+        return 0
+    return hour
+
+
+def parse_hours(text):
+    matches = TIME_RE.findall(normalize_arabic(text))
+    if len(matches) < 2:
+        return None
+    (h1, m1, p1), (h2, m2, p2) = matches[:2]
+    h1, h2, m1, m2 = int(h1), int(h2), int(m1 or 0), int(m2 or 0)
+    if not p1 and not p2:
+        start_h = h1 + 12 if 1 <= h1 <= 7 else h1
+        end_h = h2 + 12 if 1 <= h2 <= 7 else h2
+        if end_h <= start_h and end_h < 12:
+            end_h += 12
+    else:
+        end_h = _to_24h(h2, p2 or p1)
+        if not p2 and h2 == 12:
+            end_h = 12
+        start_h = _to_24h(h1, p1 or p2)
+        if not p1 and start_h >= end_h:
+            start_h = h1
+    if start_h > 23 or end_h > 23 or m1 > 59 or m2 > 59:
+        return None
+    start, end = time(start_h, m1), time(end_h, m2)
+    if start >= end:
+        return None
+    return start, end
+
+
+def parse_timeslots(schedule, days):
+    hours = parse_hours(schedule)
+    if hours is None:
+        return []
+    weekdays = parse_days(days) or parse_days(schedule)
+    return [(weekday, *hours) for weekday in weekdays]
+
+
+def backfill_timeslots(apps, schema_editor):
+    Group = apps.get_model('groups', 'Group')
+    GroupTimeslot = apps.get_model('groups', 'GroupTimeslot')
+    slots = []
+    for pk, schedule, days in Group.objects.values_list('pk', 'schedule', 'days').iterator():
+        slots.extend(
+            GroupTimeslot(group_id=pk, weekday=weekday, start=start, end=end)
+            for weekday, start, end in parse_timeslots(schedule, days)
+        )
+    GroupTimeslot.objects.bulk_create(slots, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0006_group_opens_at'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupTimeslot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('weekday', models.PositiveSmallIntegerField(choices=[(0, 'الاثنين'), (1, 'الثلاثاء'), (2, 'الأربعاء'), (3, 'الخميس'), (4, 'الجمعة'), (5, 'السبت'), (6, 'الأحد')])),
+                ('start', models.TimeField()),
+                ('end', models.TimeField()),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='timeslots', to='groups.group')),
+            ],
+            options={
+                'ordering': ['weekday', 'start'],
+                'indexes': [models.Index(fields=['weekday', 'start', 'end'], name='idx_timeslot_day_start_end')],
+            },
+        ),
+        migrations.RunPython(backfill_timeslots, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,55 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:48
+
+import re
+
+from django.db import migrations, models
+
+# نسخة ثابتة من backend.arabic وقت الـ migration دي
+BATCH_SIZE = 2000
+
+ARABIC_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ة': 'ه', 'ؤ': 'و', 'ئ': 'ي',
+})
+DIACRITICS_RE = re.compile('[\u064b-\u0652\u0670\u0640]')
+
+
+def normalize_arabic(text):
+    text = DIACRITICS_RE.sub('', (text or '').translate(ARABIC_DIGITS).translate(LETTERS))
+    return ' '.join(text.lower().split())
+
+
+def backfill_name_key(apps, schema_editor):
+    Group = apps.get_model('groups', 'Group')
+    batch = []
+    for group in Group.objects.only('id', 'name').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        group.name_key = normalize_arabic(group.name)[:100]
+        batch.append(group)
+        if len(batch) >= BATCH_SIZE:
+            Group.objects.bulk_update(batch, ['name_key'])
+            batch = []
+    if batch:
+        Group.objects.bulk_update(batch, ['name_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bookings', '0004_waitlistentry'),
+        ('groups', '0007_grouptimeslot'),
+        ('students', '0005_student_search_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='name_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['name_key'], name='idx_group_name_key', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(backfill_name_key, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 5.2.5 on 2026-10-17 22:16
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+
+def backfill_name_words(apps, schema_editor):
+    """name_key من كل بداية كلمة لآخره (نسخة ثابتة من groups.models.name_suffixes)"""
+    Group = apps.get_model('groups', 'Group')
+    GroupNameWord = apps.get_model('groups', 'GroupNameWord')
+    words = []
+    for pk, name_key in Group.objects.values_list('pk', 'name_key').order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        parts = name_key.split()
+        words.extend(
+            GroupNameWord(group_id=pk, key=' '.join(parts[i:])) for i in range(len(parts))
+        )
+        if len(words) >= BATCH_SIZE:
+            GroupNameWord.objects.bulk_create(words, batch_size=BATCH_SIZE)
+            words = []
+    if words:
+        GroupNameWord.objects.bulk_create(words, batch_size=BATCH_SIZE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('groups', '0008_group_name_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupNameWord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=100)),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='name_words', to='groups.group')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key'], name='idx_group_name_word_key', opclasses=['varchar_pattern_ops'])],
+            },
+        ),
+        migrations.RunPython(backfill_name_words, migrations.RunPython.noop),
+    ]
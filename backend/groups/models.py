@@ -1,23 +1,55 @@
 from django.db import models
+from backend.arabic import normalize_arabic
 from students.models import Student
 
 class Group(models.Model):
+    COUNTER_FIELDS = ("booked_count", "waitlist_tail")
+
     name = models.CharField(max_length=100, unique=True)
+    # الاسم بعد normalize_arabic للبحث؛ بيتحسب في save()
+    name_key = models.CharField(max_length=100, blank=True, default="", editable=False)
     stage = models.CharField(max_length=10, choices=(("GRADE6", "سادس ابتدائي"), ("PREP", "إعدادي")))
     capacity = models.PositiveIntegerField(default=10)
     schedule = models.CharField(max_length=100)
     days = models.CharField(max_length=100, blank=True)
+    # موعد فتح الحجز؛ لو محدد لازم الطالب يعدي على غرفة الانتظار (bookings.waiting_room)
+    opens_at = models.DateTimeField(null=True, blank=True)
     students = models.ManyToManyField(Student, through='bookings.Booking', related_name="groups", blank=True)
+    # عدد الحجوزات الحالية، يتحدث في نفس معاملة إنشاء/حذف الحجز (انظر bookings.services)
+    booked_count = models.PositiveIntegerField(default=0, editable=False)
+    # آخر رقم اتوزع في قائمة الانتظار
+    waitlist_tail = models.PositiveIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            # ترتيب الـ cursor الافتراضي (-created_at, -id)
+            models.Index(fields=["created_at", "id"], name="idx_group_created_id"),
+            models.Index(
+                fields=["name_key"], name="idx_group_name_key", opclasses=["varchar_pattern_ops"]
+            ),
+        ]
+
+    def save(self, *args, **kwargs):
+        self.name_key = normalize_arabic(self.name)[:100]
+        # العدادات بتتحدث بتحديثات ذرية فقط، فلا نكتب فوقها قيمة قديمة من الذاكرة
+        if not self._state.adding and kwargs.get("update_fields") is None:
+            kwargs["update_fields"] = [
+                f.name for f in self._meta.concrete_fields
+                if not f.primary_key and f.name not in self.COUNTER_FIELDS
+            ]
+        elif kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "name_key"}
+        super().save(*args, **kwargs)
+
     @property
     def seats_left(self):
-        return self.capacity - self.bookings.count()
+        return self.capacity - self.booked_count
 
     @property
     def is_full(self):
-        return self.bookings.count() >= self.capacity
+        return self.booked_count >= self.capacity
     
     def can_join(self, student):
         """تحقق إذا كان الطالب يمكنه الانضمام للمجموعة"""
@@ -28,4 +60,52 @@ class Group(models.Model):
         return True, "يمكن الانضمام"
     
     def __str__(self):
-        return f"{self.name} - {self.schedule} - {self.days}"
\ No newline at end of file
+        return f"{self.name} - {self.schedule} - {self.days}"
+
+
+def name_suffixes(name_key):
+    """الاسم من بداية كل كلمة لآخره: "مجموعه السبت ب" -> [الاسم كله، "السبت ب"، "ب"]"""
+    words = name_key.split()
+    return [" ".join(words[i:]) for i in range(len(words))]
+
+
+class GroupNameWord(models.Model):
+    """
+    name_key مقصوص من بداية كل كلمة فيه، عشان البحث ببداية أي كلمة في الاسم
+    يبقى startswith على فهرس بدل LIKE '% x%' على جدول المجموعات كله.
+    بيتبني من جديد مع كل حفظ للمجموعة (groups.signals).
+    """
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name="name_words")
+    key = models.CharField(max_length=100)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["key"], name="idx_group_name_word_key", opclasses=["varchar_pattern_ops"]),
+        ]
+
+    def __str__(self):
+        return self.key
+
+
+class GroupTimeslot(models.Model):
+    """ميعاد واحد للمجموعة، متولد من schedule وdays (groups.timeslots.sync_timeslots)"""
+    # نفس ترقيم date.weekday()
+    WEEKDAYS = (
+        (0, "الاثنين"), (1, "الثلاثاء"), (2, "الأربعاء"), (3, "الخميس"),
+        (4, "الجمعة"), (5, "السبت"), (6, "الأحد"),
+    )
+
+    group = models.ForeignKey(Group, on_delete=models.CASCADE, related_name="timeslots")
+    weekday = models.PositiveSmallIntegerField(choices=WEEKDAYS)
+    start = models.TimeField()
+    end = models.TimeField()
+
+    class Meta:
+        ordering = ["weekday", "start"]
+        indexes = [
+            # التقاطع: نفس اليوم و start < end التاني و end > start التاني
+            models.Index(fields=["weekday", "start", "end"], name="idx_timeslot_day_start_end"),
+        ]
+
+    def __str__(self):
+        return f"{self.get_weekday_display()} {self.start:%H:%M}-{self.end:%H:%M}"
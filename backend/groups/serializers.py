@@ -16,11 +16,17 @@ class GroupSerializer(serializers.ModelSerializer):
     class Meta:
         model = Group
         fields = [
-            "id", "name", "stage", "capacity", "schedule", "days",
+            "id", "name", "stage", "capacity", "schedule", "days", "opens_at",
             "students", "seats_left", "is_full", "created_at", "updated_at"
         ]
         read_only_fields = ["seats_left", "is_full", "created_at", "updated_at"]
 
+    def __init__(self, *args, include_students=True, **kwargs):
+        super().__init__(*args, **kwargs)
+        # القوائم تقدر تستغنى عن قائمة الطلاب المتداخلة (?include_students=false)
+        if not include_students:
+            self.fields.pop("students")
+
     def get_seats_left(self, obj):
         return obj.seats_left  
 
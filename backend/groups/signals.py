@@ -0,0 +1,64 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from backend.autocomplete import autocomplete
+from bookings.models import Booking
+from students.models import Student
+from .cache import bump_catalogue_version
+from .models import Group, GroupNameWord, name_suffixes
+from .stream import publish_seats
+from .timeslots import sync_timeslots
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_catalogue(sender, **kwargs):
+    # بعد الـ commit عشان طلب متزامن ميخزنش البيانات القديمة تحت الإصدار الجديد
+    transaction.on_commit(bump_catalogue_version)
+
+
+@receiver(post_save, sender=Booking)
+@receiver(post_delete, sender=Booking)
+def broadcast_booking_seats(sender, instance, **kwargs):
+    # post_delete مفيهاش created؛ وتعديل حجز موجود مش بيغير المقاعد
+    if kwargs.get("created", True):
+        transaction.on_commit(lambda: publish_seats([instance.group_id]))
+
+
+@receiver(post_save, sender=Group)
+def broadcast_capacity_change(sender, instance, created, **kwargs):
+    if not created:
+        transaction.on_commit(lambda: publish_seats([instance.pk]))
+
+
+@receiver(post_save, sender=Group)
+def rebuild_timeslots(sender, instance, raw=False, **kwargs):
+    # schedule وdays نص حر؛ GroupTimeslot هي النسخة اللي بنستعلم عليها
+    if not raw:
+        sync_timeslots(instance)
+
+
+@receiver(post_save, sender=Group)
+def rebuild_name_words(sender, instance, raw=False, **kwargs):
+    if not raw:
+        GroupNameWord.objects.filter(group=instance).delete()
+        GroupNameWord.objects.bulk_create(
+            GroupNameWord(group=instance, key=key) for key in name_suffixes(instance.name_key)
+        )
+
+
+@receiver(post_save, sender=Group)
+def index_group_name(sender, instance, raw=False, **kwargs):
+    if not raw:
+        change = ("group", instance.pk, instance.name, instance.name_key)
+        transaction.on_commit(lambda: autocomplete.record(*change))
+
+
+@receiver(post_delete, sender=Group)
+def unindex_group_name(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.record("group", pk))
@@ -0,0 +1,194 @@
+"""
+بث المقاعد المتاحة مباشرة (Server-Sent Events).
+
+كل worker فيه SeatBroadcaster واحد بيوزع التغييرات على كل العملاء المتصلين
+بيه، فمفيش استعلام قاعدة بيانات لكل عميل. كل عميل عبارة عن dict صغير للتغييرات
+المعلقة + asyncio.Event، فالـ worker الواحد يقدر يمسك آلاف الاتصالات الخاملة
+من غير thread لكل اتصال. يشتغل تحت ASGI فقط (backend/asgi.py).
+"""
+import asyncio
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+
+from .models import Group
+
+
+class _Subscriber:
+    def __init__(self):
+        # آخر قيمة لكل مجموعة بس؛ لو العميل بطيء التغييرات بتتدمج بدل ما تتراكم
+        self.pending = {}
+        self.event = asyncio.Event()
+
+    def push(self, deltas):
+        self.pending.update(deltas)
+        self.event.set()
+
+    async def drain(self, timeout):
+        try:
+            await asyncio.wait_for(self.event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return {}
+        self.event.clear()
+        pending, self.pending = self.pending, {}
+        return pending
+
+
+class LocalPubSub:
+    """داخل نفس العملية فقط: مناسب لـ worker واحد وللاختبارات"""
+
+    def attach(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    def has_listeners(self):
+        return bool(self.broadcaster.subscribers)
+
+    def publish(self, deltas):
+        self.broadcaster.deliver(deltas)
+
+    def start(self):
+        pass
+
+
+class CachePubSub:
+    """
+    بديل محلي لـ pub/sub بين عدة workers عبر الـ cache المشترك (file-based أو Redis):
+    الناشر بيكتب التغييرات تحت رقم تسلسلي، وكل worker عنده مهمة واحدة بتقرأ الجديد.
+    """
+
+    SEQ_KEY = "groups:seats:seq"
+    EVENT_KEY = "groups:seats:event:{}"
+    EVENT_TTL = 60
+
+    def __init__(self, poll_interval=0.5):
+        self.poll_interval = poll_interval
+        self.task = None
+
+    def attach(self, broadcaster):
+        self.broadcaster = broadcaster
+
+    def has_listeners(self):
+        # workers تانية ممكن يكون عندها عملاء
+        return True
+
+    def publish(self, deltas):
+        cache.add(self.SEQ_KEY, 0, None)
+        seq = cache.incr(self.SEQ_KEY)
+        cache.set(self.EVENT_KEY.format(seq), deltas, self.EVENT_TTL)
+
+    def start(self):
+        if self.task is None or self.task.done():
+            self.task = asyncio.get_running_loop().create_task(self._poll())
+
+    async def _poll(self):
+        last = await cache.aget(self.SEQ_KEY) or 0
+        while self.broadcaster.subscribers:
+            await asyncio.sleep(self.poll_interval)
+            seq = await cache.aget(self.SEQ_KEY) or 0
+            if seq < last:
+                # الـ cache اتمسح؛ نبدأ العد من جديد
+                last = seq
+            if seq == last:
+                continue
+            events = await cache.aget_many(
+                [self.EVENT_KEY.format(n) for n in range(last + 1, seq + 1)]
+            )
+            merged = {}
+            for n in range(last + 1, seq + 1):
+                merged.update(events.get(self.EVENT_KEY.format(n), {}))
+            last = seq
+            if merged:
+                self.broadcaster.deliver(merged)
+
+
+class SeatBroadcaster:
+    def __init__(self, pubsub):
+        self.subscribers = set()
+        self.loop = None
+        self.pubsub = pubsub
+        pubsub.attach(self)
+
+    def subscribe(self):
+        self.loop = asyncio.get_running_loop()
+        subscriber = _Subscriber()
+        self.subscribers.add(subscriber)
+        self.pubsub.start()
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        self.subscribers.discard(subscriber)
+
+    def publish(self, deltas):
+        self.pubsub.publish(deltas)
+
+    def deliver(self, deltas):
+        """ممكن تتنادي من أي thread (الـ views المتزامنة بتشتغل في thread منفصل)"""
+        if self.loop is None or not self.subscribers:
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._fanout, deltas)
+        except RuntimeError:
+            # الـ event loop اتقفل
+            pass
+
+    def _fanout(self, deltas):
+        for subscriber in list(self.subscribers):
+            subscriber.push(deltas)
+
+
+PUBSUB_BACKENDS = {
+    "local": LocalPubSub,
+    "cache": CachePubSub,
+}
+
+broadcaster = SeatBroadcaster(PUBSUB_BACKENDS[settings.SEAT_STREAM_PUBSUB]())
+
+
+def publish_seats(group_ids):
+    """نشر المقاعد المتبقية للمجموعات دي؛ استعلام واحد مهما كان عدد العملاء"""
+    if not broadcaster.pubsub.has_listeners():
+        return
+    deltas = {
+        pk: capacity - booked_count
+        for pk, capacity, booked_count in Group.objects.filter(pk__in=group_ids)
+        .values_list("pk", "capacity", "booked_count")
+    }
+    if deltas:
+        broadcaster.publish(deltas)
+
+
+async def seat_stream(request):
+    """
+    GET /api/groups/stream/
+    كل رسالة: {"group_id": 3, "seats_left": 7}
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "البث المباشر يحتاج تشغيل السيرفر عبر ASGI (backend.asgi)"},
+            status=501,
+        )
+
+    subscriber = broadcaster.subscribe()
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                deltas = await subscriber.drain(settings.SEAT_STREAM_HEARTBEAT)
+                if not deltas:
+                    # تعليق SSE يحافظ على الاتصال من البروكسيات
+                    yield ": ping\n\n"
+                    continue
+                for group_id, seats_left in deltas.items():
+                    payload = json.dumps({"group_id": group_id, "seats_left": seats_left})
+                    yield f"data: {payload}\n\n"
+        finally:
+            broadcaster.unsubscribe(subscriber)
+
+    response = StreamingHttpResponse(events(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"
+    return response
@@ -1,3 +1,325 @@
-from django.test import TestCase
+import asyncio
+from datetime import time
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import AsyncRequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from bookings.models import Booking
+from bookings.services import reserve_seat
+from students.models import Student
+from .models import Group
+from .stream import CachePubSub, LocalPubSub, SeatBroadcaster, publish_seats, seat_stream
+from .timeslots import parse_day, parse_days, parse_hours, parse_timeslots
 
-# Create your tests here.
+# أقصى عدد استعلامات مسموح لصفحة المجموعات مهما كان عدد المجموعات أو الطلاب:
+# COUNT للـ pagination + الصفحة نفسها + prefetch واحد للطلاب
+LIST_QUERY_BUDGET = 3
+DETAIL_QUERY_BUDGET = 2
+
+
+class GroupQueryBudgetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        students = Student.objects.bulk_create(
+            Student(
+                full_name=f"طالب {i}",
+                email=f"student{i}@example.com",
+                phone=f"010{i:08d}",
+                stage="PREP",
+            )
+            for i in range(30)
+        )
+        cls.groups = Group.objects.bulk_create(
+            Group(name=f"مجموعة {i}", stage="PREP", capacity=10, schedule="4-6", booked_count=3)
+            for i in range(12)
+        )
+        Booking.objects.bulk_create(
+            Booking(student=students[(g * 3 + k) % 30], group=group)
+            for g, group in enumerate(cls.groups)
+            for k in range(3)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_list_page_stays_within_budget(self):
+        with self.assertNumQueries(LIST_QUERY_BUDGET):
+            response = self.client.get(reverse("groups:group-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data["results"]), 10)
+        for group in response.data["results"]:
+            self.assertEqual(len(group["students"]), 3)
+            self.assertEqual(group["seats_left"], 7)
+
+    def test_list_without_students_skips_prefetch(self):
+        with self.assertNumQueries(LIST_QUERY_BUDGET - 1):
+            response = self.client.get(reverse("groups:group-list"), {"include_students": "false"})
+        self.assertNotIn("students", response.data["results"][0])
+
+    def test_detail_stays_within_budget(self):
+        url = reverse("groups:group-detail", args=[self.groups[0].pk])
+        with self.assertNumQueries(DETAIL_QUERY_BUDGET):
+            response = self.client.get(url)
+        self.assertEqual(len(response.data["students"]), 3)
+
+
+class GroupCatalogueCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="مجموعة", stage="PREP", capacity=5, schedule="4-6")
+        cls.student = Student.objects.create(
+            full_name="طالب", email="cached@example.com", phone="01000000001", stage="PREP"
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def test_warm_page_skips_orm(self):
+        url = reverse("groups:group-list")
+        self.client.get(url, {"stage": "PREP"})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"stage": "PREP"})
+        self.assertEqual(response.data["count"], 1)
+
+    def test_booking_invalidates_cached_pages(self):
+        url = reverse("groups:group-detail", args=[self.group.pk])
+        self.assertEqual(self.client.get(url).data["seats_left"], 5)
+        with self.captureOnCommitCallbacks(execute=True):
+            reserve_seat(self.student, self.group.pk)
+        self.assertEqual(self.client.get(url).data["seats_left"], 4)
+
+
+class GroupNameSearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.saturday = Group.objects.create(name="مجموعة السبت أ", stage="PREP", capacity=5, schedule="4-6")
+        cls.sunday = Group.objects.create(name="الأحد المسائية", stage="PREP", capacity=5, schedule="6-8")
+
+    def setUp(self):
+        cache.clear()
+
+    def search(self, text):
+        response = self.client.get(reverse("groups:group-list"), {"search": text})
+        return {group["id"] for group in response.data["results"]}
+
+    def test_matches_the_start_of_any_word(self):
+        self.assertEqual(self.search("السبت"), {self.saturday.pk})
+        self.assertEqual(self.search("المسائ"), {self.sunday.pk})
+        self.assertEqual(self.search("مجموعه الس"), {self.saturday.pk})
+
+    def test_spelling_variants_match(self):
+        self.assertEqual(self.search("مجموعه"), {self.saturday.pk})
+        self.assertEqual(self.search("الاحد"), {self.sunday.pk})
+
+    def test_middle_of_a_word_does_not_match(self):
+        self.assertEqual(self.search("سبت"), set())
+
+    def test_rename_rebuilds_the_words(self):
+        self.saturday.name = "مجموعة الاثنين"
+        self.saturday.save()
+        self.assertEqual(self.search("السبت"), set())
+        self.assertEqual(self.search("الاثنين"), {self.saturday.pk})
+
+
+class GroupCursorPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # create() عشان name_key وفهرس الكلمات يتبنوا
+        for i in range(13):
+            Group.objects.create(
+                name=f"مجموعة {i}", stage="PREP" if i % 3 else "GRADE6", capacity=5, schedule="4-6"
+            )
+        Group.objects.update(created_at=timezone.now())
+
+    def setUp(self):
+        cache.clear()
+
+    def walk(self, **params):
+        response = self.client.get(
+            reverse("groups:group-list"),
+            {"pagination": "cursor", "page_size": 4, "include_students": "false", **params},
+        )
+        ids = []
+        while True:
+            ids += [group["id"] for group in response.data["results"]]
+            if not response.data["next"]:
+                return ids
+            response = self.client.get(response.data["next"])
+
+    def test_stage_filter_with_equal_created_at(self):
+        expected = Group.objects.filter(stage="PREP").order_by("-id").values_list("id", flat=True)
+        self.assertEqual(self.walk(stage="PREP"), list(expected))
+
+    def test_ordering_by_name_with_search(self):
+        groups = Group.objects.values_list("id", flat=True)
+        self.assertEqual(self.walk(ordering="name"), list(groups.order_by("name")))
+        # "مجموعة 1" و"مجموعة 10"-"مجموعة 12"
+        expected = groups.filter(name__startswith="مجموعة 1").order_by("-name")
+        self.assertEqual(self.walk(ordering="-name", search="مجموعة 1"), list(expected))
+
+
+class TimeslotParsingTests(SimpleTestCase):
+    def test_arabic_days_and_pm_hours(self):
+        self.assertEqual(
+            parse_timeslots("من 4:00 إلى 6:00 مساءً", "السبت والاثنين"),
+            [(5, time(16), time(18)), (0, time(16), time(18))],
+        )
+
+    def test_english_days_and_24h_hours(self):
+        self.assertEqual(
+            parse_timeslots("16:30 - 18:00", "Sat, Tuesday"),
+            [(5, time(16, 30), time(18)), (1, time(16, 30), time(18))],
+        )
+
+    def test_days_in_schedule_with_arabic_digits(self):
+        self.assertEqual(parse_timeslots("الأحد ٥-٧ م", ""), [(6, time(17), time(19))])
+
+    def test_words_with_a_day_prefix_are_not_days(self):
+        for word in ("satellite", "monthly", "wedding", "sunny", "Saturdays"):
+            self.assertIsNone(parse_day(word), word)
+        self.assertEqual(parse_timeslots("4-6", "wedding hall"), [])
+
+    def test_numbers_are_not_days(self):
+        self.assertEqual(parse_days("السبت لمدة اربع ساعات"), [5])
+        self.assertEqual(parse_days("حصة واحدة يوم الخميس"), [3])
+        for word in ("واحد", "احد", "اتنين", "تلات", "اربع"):
+            self.assertIsNone(parse_day(word), word)
+        self.assertEqual(parse_days("الأحد والاتنين والتلات والأربعاء"), [6, 0, 1, 2])
+
+    def test_twelve_after_morning_start_is_noon(self):
+        self.assertEqual(parse_hours("10 ص - 12"), (time(10), time(12)))
+        self.assertEqual(parse_hours("9:30 ص - 12:30"), (time(9, 30), time(12, 30)))
+        self.assertEqual(parse_hours("11 - 1 ظهرا"), (time(11), time(13)))
+
+    def test_unmarked_end_after_an_afternoon_start(self):
+        self.assertEqual(parse_hours("6-8"), (time(18), time(20)))
+        self.assertEqual(parse_hours("7:30 - 9"), (time(19, 30), time(21)))
+        self.assertEqual(parse_hours("9-11"), (time(9), time(11)))
+
+    def test_unparseable_schedule_has_no_slots(self):
+        self.assertEqual(parse_timeslots("بعد المغرب", "السبت"), [])
+
+
+class ScheduleConflictTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.saturday = Group.objects.create(
+            name="سبت 4", stage="PREP", capacity=5, schedule="4-6", days="السبت"
+        )
+        cls.overlapping = Group.objects.create(
+            name="سبت 5", stage="PREP", capacity=5, schedule="5-7", days="السبت"
+        )
+        cls.back_to_back = Group.objects.create(
+            name="سبت 6", stage="PREP", capacity=5, schedule="6-8", days="Sat"
+        )
+        cls.user = get_user_model().objects.create_user(
+            username="student", email="student@example.com", password="pass"
+        )
+        cls.student = Student.objects.create(
+            user=cls.user, full_name="طالب", email="s@example.com", phone="01012345678", stage="PREP"
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_authenticate(self.user)
+        reserve_seat(self.student, self.saturday.pk)
+
+    def join(self, group):
+        return self.client.post(reverse("bookings:join-group", args=[group.pk]))
+
+    def test_overlapping_group_is_rejected(self):
+        response = self.join(self.overlapping)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(self.saturday.name, response.data["error"])
+        self.assertFalse(Booking.objects.filter(group=self.overlapping).exists())
+
+    def test_back_to_back_group_is_allowed(self):
+        self.assertEqual(self.join(self.back_to_back).status_code, 201)
+
+    def test_day_and_time_filters(self):
+        response = self.client.get(
+            reverse("groups:group-list"), {"day": "saturday", "at": "17:30", "include_students": "false"}
+        )
+        self.assertEqual(
+            {group["id"] for group in response.data["results"]}, {self.saturday.pk, self.overlapping.pk}
+        )
+
+
+class SeatBroadcasterTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        self.broadcaster = SeatBroadcaster(LocalPubSub())
+
+    async def test_one_change_reaches_every_subscriber(self):
+        subscribers = [self.broadcaster.subscribe() for _ in range(3)]
+        self.broadcaster.publish({1: 4})
+        received = await asyncio.gather(*(subscriber.drain(1) for subscriber in subscribers))
+        self.assertEqual(received, [{1: 4}] * 3)
+
+    async def test_slow_subscriber_gets_only_the_latest_value(self):
+        subscriber = self.broadcaster.subscribe()
+        self.broadcaster.publish({1: 4})
+        self.broadcaster.publish({1: 3, 2: 5})
+        await asyncio.sleep(0)
+        self.assertEqual(await subscriber.drain(1), {1: 3, 2: 5})
+
+    async def test_disconnect_removes_the_subscriber(self):
+        chunks = []
+        with mock.patch("groups.stream.broadcaster", self.broadcaster):
+            response = await seat_stream(AsyncRequestFactory().get("/api/groups/stream/"))
+            self.assertEqual(len(self.broadcaster.subscribers), 1)
+
+            async def consume():
+                async for chunk in response.streaming_content:
+                    chunks.append(chunk)
+
+            # الـ ASGI handler بيلغي مهمة البث لما العميل يقفل الاتصال
+            task = asyncio.create_task(consume())
+            await asyncio.sleep(0.01)
+            self.broadcaster.publish({7: 2})
+            await asyncio.sleep(0.01)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+        self.assertEqual(self.broadcaster.subscribers, set())
+        self.assertIn(b'data: {"group_id": 7, "seats_left": 2}\n\n', chunks)
+
+    async def test_cache_pubsub_forwards_events_between_workers(self):
+        # عمليتين بيشاركوا نفس الـ cache
+        listener = SeatBroadcaster(CachePubSub(poll_interval=0.01))
+        publisher = SeatBroadcaster(CachePubSub(poll_interval=0.01))
+        subscriber = listener.subscribe()
+        await asyncio.sleep(0.02)
+        publisher.publish({5: 1})
+        publisher.publish({6: 0})
+        self.assertEqual(await subscriber.drain(1), {5: 1, 6: 0})
+        listener.unsubscribe(subscriber)
+        await asyncio.wait_for(listener.pubsub.task, 1)
+
+
+class PublishSeatsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.group = Group.objects.create(name="مجموعة", stage="PREP", capacity=3, schedule="4-6")
+        cls.student = Student.objects.create(
+            full_name="طالب", email="s@example.com", phone="01000000001", stage="PREP"
+        )
+
+    def test_booking_publishes_seats_left_after_commit(self):
+        loop = asyncio.new_event_loop()
+        self.addCleanup(loop.close)
+        broadcaster = SeatBroadcaster(LocalPubSub())
+
+        async def subscribe():
+            return broadcaster.subscribe()
+
+        subscriber = loop.run_until_complete(subscribe())
+        with mock.patch("groups.stream.broadcaster", broadcaster):
+            with self.captureOnCommitCallbacks(execute=True):
+                reserve_seat(self.student, self.group.pk)
+            with self.assertNumQueries(1):
+                publish_seats([self.group.pk])
+        self.assertEqual(loop.run_until_complete(subscriber.drain(1)), {self.group.pk: 2})
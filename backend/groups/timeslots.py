@@ -0,0 +1,162 @@
+"""
+تحويل Group.schedule وGroup.days (نص حر) لمواعيد منظمة (GroupTimeslot).
+
+أمثلة بيفهمها المحلل:
+    days="السبت والاثنين والأربعاء"   schedule="من 4:00 إلى 6:00 مساءً"
+    days="Sat, Tue"                   schedule="16:30 - 18:00"
+    days=""                           schedule="الأحد ٥-٧ م"
+الأيام ممكن تكون في أي واحد من الحقلين. الأرقام من غير ص/م ومن 1 لـ 7 بتتحسب
+بعد الظهر (مواعيد الحصص المعتادة)، والنهاية اللي بعدها كمان ("6-8" = 18:00-20:00).
+أي نص مش مفهوم بيرجع قائمة فاضية.
+"""
+import re
+from datetime import time
+
+from django.db.models import Exists, OuterRef
+
+from backend.arabic import normalize_arabic
+
+# نفس ترقيم date.weekday(): الاثنين = 0
+# أسماء ماينفعش تكون كلمة تانية، فبتتقبل لوحدها أو بـ ال/و
+DAY_NAMES = {
+    "ثلاثاء": 1, "تلاتاء": 1,
+    "اربعاء": 2,
+    "خميس": 3,
+    "جمعه": 4,
+    "سبت": 5,
+}
+# أسماء هي نفسها أرقام (اتنين، تلات، أحد/واحد) فلازم تيجي بـ ال: "الاتنين" يوم و"اتنين" رقم
+DEFINITE_DAY_NAMES = {
+    "اثنين": 0, "اتنين": 0,
+    "ثلاثا": 1, "تلات": 1,
+    "احد": 6,
+}
+ENGLISH_DAYS = {"mon": 0, "tue": 1, "wed": 2, "thu": 3, "fri": 4, "sat": 5, "sun": 6}
+# الاسم الكامل أو الاختصار بالظبط؛ البادئة لوحدها بتطابق كلمات زي satellite وsunny
+ENGLISH_DAY_NAMES = {
+    **ENGLISH_DAYS,
+    "monday": 0, "tuesday": 1, "wednesday": 2, "thursday": 3,
+    "friday": 4, "saturday": 5, "sunday": 6,
+}
+
+AM = {"ص", "صباحا", "am", "a.m"}
+PM = {"م", "مساء", "مساءا", "ظهرا", "عصرا", "ليلا", "pm", "p.m"}
+
+TIME_RE = re.compile(
+    r"(?<!\d)(\d{1,2})(?:[:.](\d{2}))?(?!\d)\s*"
+    r"(صباحا|ص|مساءا|مساء|ظهرا|عصرا|ليلا|م|a\.m|p\.m|am|pm)?(?![\w])"
+)
+
+def parse_day(word):
+    """كلمة واحدة -> رقم اليوم أو None"""
+    word = normalize_arabic(word).strip()
+    if word.isdigit():
+        return int(word) if 0 <= int(word) <= 6 else None
+    if word in ENGLISH_DAY_NAMES:
+        return ENGLISH_DAY_NAMES[word]
+    for candidate in (word, word[1:] if word.startswith("و") else None):
+        if not candidate:
+            continue
+        if candidate in DAY_NAMES:
+            return DAY_NAMES[candidate]
+        if candidate.startswith("ال"):
+            name = candidate[2:]
+            if name in DAY_NAMES:
+                return DAY_NAMES[name]
+            if name in DEFINITE_DAY_NAMES:
+                return DEFINITE_DAY_NAMES[name]
+    return None
+
+
+def parse_days(text):
+    days = []
+    for word in re.findall(r"[^\W\d_]+", normalize_arabic(text)):
+        day = parse_day(word)
+        if day is not None and day not in days:
+            days.append(day)
+    return days
+
+
+def _to_24h(hour, period):
+    if period in PM and hour < 12:
+        return hour + 12
+    if period in AM and hour == 12:
+        return 0
+    return hour
+
+
+def parse_hours(text):
+    """(start, end) أو None"""
+    matches = TIME_RE.findall(normalize_arabic(text))
+    if len(matches) < 2:
+        return None
+    (h1, m1, p1), (h2, m2, p2) = matches[:2]
+    h1, h2, m1, m2 = int(h1), int(h2), int(m1 or 0), int(m2 or 0)
+
+    if not p1 and not p2:
+        # من غير ص/م: 1-7 بعد الظهر
+        start_h = h1 + 12 if 1 <= h1 <= 7 else h1
+        end_h = h2 + 12 if 1 <= h2 <= 7 else h2
+        if end_h <= start_h and end_h < 12:
+            # "6-8": النهاية بعد البداية، فهي بعد الضهر برضه
+            end_h += 12
+    else:
+        end_h = _to_24h(h2, p2 or p1)
+        if not p2 and h2 == 12:
+            # "10 ص - 12": الـ 12 هنا الضهر مش نص الليل
+            end_h = 12
+        start_h = _to_24h(h1, p1 or p2)
+        if not p1 and start_h >= end_h:
+            # "11 - 1 ظهرا": الـ م تخص النهاية بس
+            start_h = h1
+
+    if start_h > 23 or end_h > 23 or m1 > 59 or m2 > 59:
+        return None
+    start, end = time(start_h, m1), time(end_h, m2)
+    if start >= end:
+        return None
+    return start, end
+
+
+def parse_timeslots(schedule, days):
+    """[(weekday, start, end), ...]"""
+    hours = parse_hours(schedule)
+    if hours is None:
+        return []
+    weekdays = parse_days(days) or parse_days(schedule)
+    return [(weekday, *hours) for weekday in weekdays]
+
+
+def sync_timeslots(group):
+    """إعادة بناء مواعيد المجموعة من schedule وdays"""
+    from .models import GroupTimeslot
+
+    slots = parse_timeslots(group.schedule, group.days)
+    GroupTimeslot.objects.filter(group=group).delete()
+    GroupTimeslot.objects.bulk_create(
+        GroupTimeslot(group=group, weekday=weekday, start=start, end=end)
+        for weekday, start, end in slots
+    )
+    return slots
+
+
+def find_conflict(student, group):
+    """
+    أول ميعاد من مجموعات الطالب الحالية بيتقاطع مع مواعيد المجموعة دي، أو None.
+    استعلام واحد على فهرس (weekday, start, end).
+    """
+    from .models import GroupTimeslot
+
+    overlapping = GroupTimeslot.objects.filter(
+        group=group,
+        weekday=OuterRef("weekday"),
+        start__lt=OuterRef("end"),
+        end__gt=OuterRef("start"),
+    )
+    return (
+        GroupTimeslot.objects.filter(group__bookings__student=student)
+        .exclude(group=group)
+        .filter(Exists(overlapping))
+        .select_related("group")
+        .first()
+    )
@@ -1,10 +1,12 @@
 from django.urls import path
 from . import views
+from .stream import seat_stream
 
 app_name = "groups"
 
 urlpatterns = [
     path("", views.group_list, name="group-list"),
     path("create/", views.group_create, name="group-create"),
+    path("stream/", seat_stream, name="seat-stream"),
     path("<int:pk>/", views.group_detail, name="group-detail"),
 ]
@@ -1,34 +1,101 @@
+from django.db import transaction
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.pagination import PageNumberPagination
-from .models import Group
+from datetime import time
+from django.db.models import Exists, OuterRef, Prefetch
+from bookings.services import promote_waitlist
+from notifications.outbox import announce_schedule_change
+from students.models import Student
+from .models import Group, GroupNameWord, GroupTimeslot
+from .timeslots import parse_day
 from .serializers import GroupSerializer
+from .cache import catalogue_key, get_cached, set_cached
+from backend.arabic import normalize_arabic
+from backend.pagination import KeysetPagination, cursor_requested, keyset_ordering
+
+# الحقول اللي ينفع الـ cursor يرتب بيها (كلها unique أو عليها فهرس)
+CURSOR_ORDERING_FIELDS = ("id", "created_at", "name")
+
+
+def group_queryset(include_students=True):
+    """
+    المجموعات مع قائمة الطلاب في استعلام prefetch واحد للصفحة كلها،
+    وبالأعمدة اللي StudentMiniSerializer محتاجها بس.
+    seats_left وis_full بيتقروا من booked_count فمش محتاجين أي استعلام.
+    """
+    qs = Group.objects.all()
+    if include_students:
+        qs = qs.prefetch_related(
+            Prefetch("students", queryset=Student.objects.only("id", "full_name", "phone"))
+        )
+    return qs
+
+
+def wants_students(request):
+    return request.query_params.get("include_students", "true").lower() not in ("0", "false", "no")
+
 
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def group_list(request):
-    qs = Group.objects.all()
+    cache_key = catalogue_key("list", request)
+    data = get_cached(cache_key)
+    if data is not None:
+        return Response(data)
 
-    # search بالاسم
-    search = request.query_params.get("search")
+    include_students = wants_students(request)
+    qs = group_queryset(include_students)
+
+    # search بالاسم بعد normalize_arabic: بداية الاسم أو بداية أي كلمة فيه، من فهرس GroupNameWord
+    search = normalize_arabic(request.query_params.get("search"))
     if search:
-        qs = qs.filter(name__icontains=search)
+        qs = qs.filter(
+            pk__in=GroupNameWord.objects.filter(key__startswith=search).values("group_id")
+        )
 
     # filter بالمرحلة
     stage = request.query_params.get("stage")
     if stage:
         qs = qs.filter(stage=stage)
 
+    # filter بالميعاد: ?day=السبت (أو 0-6 أو sat) و/أو ?at=16:30
+    day = request.query_params.get("day")
+    at = request.query_params.get("at")
+    if day or at:
+        slots = GroupTimeslot.objects.filter(group=OuterRef("pk"))
+        if day:
+            weekday = parse_day(day)
+            if weekday is None:
+                return Response({"error": "اليوم غير معروف"}, status=status.HTTP_400_BAD_REQUEST)
+            slots = slots.filter(weekday=weekday)
+        if at:
+            try:
+                moment = time.fromisoformat(at)
+            except ValueError:
+                return Response(
+                    {"error": "الوقت لازم يكون بصيغة HH:MM"}, status=status.HTTP_400_BAD_REQUEST
+                )
+            slots = slots.filter(start__lte=moment, end__gt=moment)
+        qs = qs.filter(Exists(slots))
+
     # ordering بالبارام أو الافتراضي
     ordering = request.query_params.get("ordering")
-    qs = qs.order_by(ordering or "-created_at")
 
     # Pagination
-    paginator = PageNumberPagination()
+    if cursor_requested(request):
+        paginator = KeysetPagination(
+            ordering=keyset_ordering(ordering, CURSOR_ORDERING_FIELDS, ("-created_at", "-id"))
+        )
+    else:
+        qs = qs.order_by(ordering or "-created_at")
+        paginator = PageNumberPagination()
     result_page = paginator.paginate_queryset(qs, request)
-    serializer = GroupSerializer(result_page, many=True)
-    return paginator.get_paginated_response(serializer.data)    
+    serializer = GroupSerializer(result_page, many=True, include_students=include_students)
+    response = paginator.get_paginated_response(serializer.data)
+    set_cached(cache_key, response.data)
+    return response
 
 @api_view(["POST"])
 @permission_classes([permissions.IsAdminUser])
@@ -42,29 +109,54 @@ def group_create(request):
 @api_view(["GET", "PUT", "DELETE"])
 @permission_classes([permissions.AllowAny])
 def group_detail(request, pk):
+    if request.method == "GET":
+        cache_key = catalogue_key("detail", request, pk)
+        data = get_cached(cache_key)
+        if data is not None:
+            return Response(data)
+
+    include_students = request.method != "DELETE" and wants_students(request)
     try:
-        group = Group.objects.get(pk=pk)
+        group = group_queryset(include_students).get(pk=pk)
     except Group.DoesNotExist:
         return Response({"error": "Group not found"}, status=status.HTTP_404_NOT_FOUND)
 
     if request.method == "GET":
-        serializer = GroupSerializer(group)
+        serializer = GroupSerializer(group, include_students=include_students)
+        set_cached(cache_key, serializer.data)
         return Response(serializer.data)
 
     elif request.method == "PUT":
         if not request.user.is_staff:
             return Response({"error": "Permission denied"}, status=status.HTTP_403_FORBIDDEN)
 
-        serializer = GroupSerializer(group, data=request.data, partial=True)
+        serializer = GroupSerializer(
+            group, data=request.data, partial=True, include_students=include_students
+        )
         if serializer.is_valid():
             # لو عايز يعدل السعة لازم تتحقق من العدد الحالي
             new_capacity = serializer.validated_data.get("capacity", group.capacity)
-            if new_capacity < group.students.count():
-                return Response(
-                    {"error": "Capacity cannot be less than current number of students"},
-                    status=status.HTTP_400_BAD_REQUEST,
+            with transaction.atomic():
+                # نقفل الصف عشان مفيش حجز يدخل بين التحقق والحفظ
+                group.booked_count = (
+                    Group.objects.select_for_update()
+                    .values_list("booked_count", flat=True)
+                    .get(pk=group.pk)
                 )
-            serializer.save()
+                if new_capacity < group.booked_count:
+                    return Response(
+                        {"error": "Capacity cannot be less than current number of students"},
+                        status=status.HTTP_400_BAD_REQUEST,
+                    )
+                old_capacity = group.capacity
+                old_timing = (group.schedule, group.days)
+                serializer.save()
+                # الطلاب بيعرفوا بالموعد الجديد من غير ما حد يبعتلهم بإيده
+                if (group.schedule, group.days) != old_timing:
+                    announce_schedule_change(group, request.user)
+                # زيادة السعة بتفضي مقاعد لأول المنتظرين
+                if new_capacity > old_capacity:
+                    group.booked_count += len(promote_waitlist(group.pk))
             return Response(serializer.data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
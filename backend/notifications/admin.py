@@ -0,0 +1,34 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Announcement, OutboundEmail
+
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('to', 'subject', 'announcement', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_select_related = ('announcement',)
+    list_filter = ('status',)
+    search_fields = ('to', 'subject')
+    readonly_fields = ('attempts', 'claimed_by', 'locked_until', 'last_error', 'created_at', 'sent_at')
+    actions = ('retry_now',)
+
+    @admin.action(description="إعادة المحاولة الآن")
+    def retry_now(self, request, queryset):
+        updated = queryset.exclude(status=OutboundEmail.SENT).update(
+            status=OutboundEmail.PENDING, attempts=0, next_attempt_at=timezone.now(),
+            locked_until=None, claimed_by="",
+        )
+        self.message_user(request, f"{updated} إيميل رجع للانتظار")
+
+
+@admin.register(Announcement)
+class AnnouncementAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'group', 'stage', 'status', 'recipients', 'created_at')
+    list_filter = ('status', 'stage')
+    readonly_fields = ('status', 'recipients', 'created_by', 'created_at', 'queued_at')
+    raw_id_fields = ('group',)
+
+    def save_model(self, request, obj, form, change):
+        if not change:
+            obj.created_by = request.user
+        super().save_model(request, obj, form, change)
@@ -0,0 +1,35 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from notifications.outbox import BATCH_SIZE, LEASE_SECONDS, fan_out_pending, run_once
+
+
+class Command(BaseCommand):
+    help = (
+        "Fan out pending announcements and send queued OutboundEmail rows in batches over "
+        "one SMTP connection per batch. Runs until stopped; several workers can run side by side."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--lease", type=int, default=LEASE_SECONDS, help="Seconds a claimed batch stays reserved")
+        parser.add_argument("--poll", type=float, default=2.0, help="Seconds to sleep when the outbox is empty")
+        parser.add_argument("--once", action="store_true", help="Drain what is due now and exit")
+
+    def handle(self, *args, **options):
+        try:
+            while True:
+                announcements = fan_out_pending()
+                if announcements:
+                    self.stdout.write(f"{announcements} announcement(s) queued")
+                claimed, sent, failed = run_once(options["batch_size"], options["lease"])
+                if claimed:
+                    self.stdout.write(f"{sent} sent, {failed} failed")
+                if claimed or announcements:
+                    continue
+                if options["once"]:
+                    return
+                time.sleep(options["poll"])
+        except KeyboardInterrupt:
+            self.stdout.write("Stopped")
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.db import models
+from django.utils import timezone
+
+
+class Announcement(models.Model):
+    """
+    رسالة لكل طلاب مجموعة أو لكل مجموعات مرحلة. الطلب بيسجل الصف ده بس؛
+    run_outbox بيحول المستلمين لصفوف OutboundEmail (notifications/outbox.py)
+    """
+    PENDING = "pending"
+    QUEUED = "queued"
+    STATUS_CHOICES = (
+        (PENDING, "في الانتظار"),
+        (QUEUED, "تم التوزيع"),
+    )
+
+    group = models.ForeignKey("groups.Group", on_delete=models.SET_NULL, null=True, blank=True, related_name="announcements")
+    stage = models.CharField(max_length=10, blank=True, default="")
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    recipients = models.PositiveIntegerField(default=0)
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    queued_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["status", "id"], name="idx_announcement_status"),
+        ]
+
+    def __str__(self):
+        return self.subject
+
+
+class OutboundEmail(models.Model):
+    """
+    إيميل مستني الإرسال (outbox). الطلب بيعمل INSERT بس، والإرسال نفسه في
+    python manage.py run_outbox (notifications/outbox.py).
+    """
+    PENDING = "pending"
+    SENT = "sent"
+    FAILED = "failed"
+    STATUS_CHOICES = (
+        (PENDING, "في الانتظار"),
+        (SENT, "تم الإرسال"),
+        (FAILED, "فشل"),
+    )
+
+    to = models.EmailField(max_length=254)
+    # رسائل الإعلانات مش بتتكرر في كل صف: العنوان والنص من Announcement
+    announcement = models.ForeignKey(
+        Announcement, on_delete=models.CASCADE, null=True, blank=True, related_name="emails"
+    )
+    subject = models.CharField(max_length=255, blank=True, default="")
+    body = models.TextField(blank=True, default="")
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # المحاولة الجاية (backoff بعد كل فشل)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    # الـ worker اللي حاجز الصف ولحد إمتى؛ لو وقع الحجز بينتهي ويتاخد تاني
+    claimed_by = models.CharField(max_length=32, blank=True, default="")
+    locked_until = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True, default="")
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            # استعلام الحجز: status='pending' AND next_attempt_at <= now بالترتيب
+            models.Index(fields=["status", "next_attempt_at", "id"], name="idx_outbox_due"),
+        ]
+
+    def __str__(self):
+        return f"{self.to}: {self.subject} ({self.status})"
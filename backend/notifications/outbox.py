@@ -0,0 +1,213 @@
+"""
+Outbox للإيميلات: الطلب بيسجل صف في OutboundEmail (INSERT واحد جوه نفس
+المعاملة)، وworker منفصل (python manage.py run_outbox) هو اللي بيكلم SMTP.
+فسيرفر بريد بطيء أو واقع مبيعطلش gunicorn worker ولا بيرجع 500 للمستخدم.
+
+الـ worker بياخد دفعة بحجز (lease): بيختار الصفوف المستحقة، وبيكتب عليها
+claimed_by وlocked_until في UPDATE شرطي، والصفوف اللي كسبها هي اللي عليها
+اسمه. على PostgreSQL الاختيار بـ SELECT ... FOR UPDATE SKIP LOCKED فأكتر من
+worker مبيستنوش بعض؛ على SQLite الـ UPDATE الشرطي لوحده كفاية لأن الكتابة
+كلها متسلسلة. القفل بيتفك قبل الإرسال، والـ lease بيحمي الصفوف لحد ما
+الإرسال يخلص (ولو الـ worker وقع بتتاخد تاني بعد ما الـ lease يخلص). كل
+رسالة بتجدد الـ lease قبل ما تتبعت، وأي صف worker تاني أخده بعد ما الـ lease
+خلص مبيتبعتش ولا بيتكتب عليه من الـ worker القديم.
+
+الإرسال على اتصال SMTP واحد للدفعة كلها. الفشل بيتعاد بـ backoff أُسّي
+لحد MAX_ATTEMPTS وبعدها الصف بيبقى failed.
+
+الإعلانات (Announcement) بتتوزع في الـ worker برضه: استعلام واحد بيجيب
+إيميلات كل طلاب المجموعة (أو المرحلة) وbulk_create لصف OutboundEmail لكل
+مستلم من غير العنوان والنص، فحالة كل مستلم صف صغير في نفس الـ outbox.
+"""
+import random
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from students.models import Student
+from .models import Announcement, OutboundEmail
+
+BATCH_SIZE = 100
+LEASE_SECONDS = 300
+FAN_OUT_BATCH_SIZE = 1000
+MAX_ATTEMPTS = 6
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 60 * 60
+
+
+def enqueue_email(to, subject, body):
+    return OutboundEmail.objects.create(to=to, subject=subject, body=body)
+
+
+def announce(subject, body, group=None, stage="", created_by=None):
+    """INSERT واحد؛ المستلمين بيتحسبوا في run_outbox"""
+    return Announcement.objects.create(
+        subject=subject, body=body, group=group, stage=stage, created_by=created_by
+    )
+
+
+def announce_schedule_change(group, created_by=None):
+    lines = [f"تم تعديل موعد مجموعة {group.name}.", f"الموعد الجديد: {group.schedule}"]
+    if group.days:
+        lines.append(f"الأيام: {group.days}")
+    return announce(f"تغيير موعد مجموعة {group.name}", "\n".join(lines), group=group, created_by=created_by)
+
+
+def recipients(announcement):
+    """إيميلات الطلاب المحجوزين في المجموعة أو في أي مجموعة من المرحلة، في استعلام واحد"""
+    students = Student.objects.all()
+    if announcement.group_id:
+        students = students.filter(bookings__group_id=announcement.group_id)
+    else:
+        students = students.filter(bookings__group__stage=announcement.stage)
+    # order_by صريح عشان ordering الافتراضي (created_at) ميدخلش في DISTINCT
+    return students.order_by("email").values_list("email", flat=True).distinct()
+
+
+def fan_out(announcement):
+    """
+    يحول الإعلان لصفوف OutboundEmail في معاملة واحدة. الـ UPDATE الشرطي بيضمن
+    إن worker واحد بس يوزعه؛ لو وقع في النص المعاملة بترجع والإعلان يفضل pending.
+    """
+    with transaction.atomic():
+        now = timezone.now()
+        claimed = Announcement.objects.filter(pk=announcement.pk, status=Announcement.PENDING).update(
+            status=Announcement.QUEUED, queued_at=now
+        )
+        if not claimed:
+            return 0
+        emails = [
+            OutboundEmail(to=email, announcement_id=announcement.pk, next_attempt_at=now)
+            for email in recipients(announcement).iterator(chunk_size=FAN_OUT_BATCH_SIZE)
+        ]
+        OutboundEmail.objects.bulk_create(emails, batch_size=FAN_OUT_BATCH_SIZE)
+        Announcement.objects.filter(pk=announcement.pk).update(recipients=len(emails))
+    return len(emails)
+
+
+def fan_out_pending(limit=10):
+    """Returns عدد الإعلانات اللي اتوزعت"""
+    pending = list(Announcement.objects.filter(status=Announcement.PENDING).order_by("id")[:limit])
+    for announcement in pending:
+        fan_out(announcement)
+    return len(pending)
+
+
+def backoff(attempts):
+    """30s، 60s، 120s ... لحد ساعة، مع jitter عشان الفشل الجماعي ميرجعش في نفس اللحظة"""
+    delay = min(BACKOFF_BASE_SECONDS * 2 ** (attempts - 1), BACKOFF_MAX_SECONDS)
+    return timedelta(seconds=delay * random.uniform(1, 1.2))
+
+
+def _due(now):
+    return OutboundEmail.objects.filter(
+        Q(locked_until__isnull=True) | Q(locked_until__lt=now),
+        status=OutboundEmail.PENDING,
+        next_attempt_at__lte=now,
+    )
+
+
+def claim_batch(batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+    """يحجز لحد batch_size إيميل مستحق للـ worker ده ويرجعهم"""
+    now = timezone.now()
+    worker = uuid.uuid4().hex
+    with transaction.atomic():
+        due = _due(now).order_by("next_attempt_at", "id")
+        if connection.features.has_select_for_update_skip_locked:
+            due = due.select_for_update(skip_locked=True)
+        ids = list(due.values_list("id", flat=True)[:batch_size])
+        if not ids:
+            return []
+        # الشرط متكرر عشان worker تاني (على SQLite) ممكن يكون حجز نفس الصفوف قبلنا
+        _due(now).filter(id__in=ids).update(
+            claimed_by=worker, locked_until=now + timedelta(seconds=lease_seconds)
+        )
+    return list(
+        OutboundEmail.objects.filter(claimed_by=worker, id__in=ids).select_related("announcement").order_by("id")
+    )
+
+
+def _renew_lease(email, lease_seconds):
+    """
+    يمد الـ lease قبل إرسال الرسالة. لو الـ lease خلص وworker تاني أخد الصف
+    (claimed_by اتغير) الـ UPDATE مبيلمسش حاجة والرسالة متتبعتش من هنا.
+    """
+    return OutboundEmail.objects.filter(
+        pk=email.pk, claimed_by=email.claimed_by, status=OutboundEmail.PENDING
+    ).update(locked_until=timezone.now() + timedelta(seconds=lease_seconds))
+
+
+def deliver(emails, mail_connection=None, lease_seconds=LEASE_SECONDS):
+    """
+    يبعت الدفعة على اتصال واحد ويسجل النتيجة. كل رسالة بتجدد الـ lease قبل
+    ما تتبعت، والنتيجة بتتكتب بس على الصفوف اللي لسه باسم الـ worker ده.
+    Returns (sent, failed)
+    """
+    sent = []
+    failed = []
+    mail_connection = mail_connection or get_connection(fail_silently=False)
+    try:
+        mail_connection.open()
+    except Exception as e:
+        # السيرفر مش متاح: الدفعة كلها بتتأجل بالـ backoff
+        error = f"{type(e).__name__}: {e}"
+        failed = [(email, error) for email in emails]
+        emails = []
+    try:
+        for email in emails:
+            if not _renew_lease(email, lease_seconds):
+                continue
+            source = email.announcement or email
+            message = EmailMessage(
+                source.subject, source.body, settings.DEFAULT_FROM_EMAIL, [email.to],
+                connection=mail_connection,
+            )
+            try:
+                message.send()
+                sent.append(email)
+            except Exception as e:
+                failed.append((email, f"{type(e).__name__}: {e}"))
+                # الاتصال ممكن يكون اتقفل من السيرفر؛ نفتحه تاني للي بعده
+                mail_connection.close()
+                try:
+                    mail_connection.open()
+                except Exception:
+                    pass
+    finally:
+        mail_connection.close()
+
+    now = timezone.now()
+    sent_count = 0
+    if sent:
+        # الدفعة كلها من claim_batch واحد فليها نفس claimed_by
+        sent_count = OutboundEmail.objects.filter(
+            pk__in=[email.pk for email in sent], claimed_by=sent[0].claimed_by
+        ).update(
+            status=OutboundEmail.SENT, sent_at=now, attempts=F("attempts") + 1,
+            locked_until=None, claimed_by="", last_error="",
+        )
+    failed_count = 0
+    for email, error in failed:
+        attempts = email.attempts + 1
+        fields = {"attempts": attempts, "last_error": error[:2000], "locked_until": None, "claimed_by": ""}
+        if attempts >= MAX_ATTEMPTS:
+            fields["status"] = OutboundEmail.FAILED
+        else:
+            fields["next_attempt_at"] = now + backoff(attempts)
+        # UPDATE لكل صف فاشل (الفشل قليل) عشان شرط claimed_by يتطبق على كل واحد
+        failed_count += OutboundEmail.objects.filter(pk=email.pk, claimed_by=email.claimed_by).update(**fields)
+    return sent_count, failed_count
+
+
+def run_once(batch_size=BATCH_SIZE, lease_seconds=LEASE_SECONDS):
+    """دفعة واحدة. Returns (claimed, sent, failed)"""
+    emails = claim_batch(batch_size, lease_seconds)
+    if not emails:
+        return 0, 0, 0
+    sent, failed = deliver(emails, lease_seconds=lease_seconds)
+    return len(emails), sent, failed
@@ -0,0 +1,19 @@
+from rest_framework import serializers
+from groups.models import Group
+from students.models import STAGE_CHOICES
+from .models import Announcement
+
+
+class AnnouncementSerializer(serializers.ModelSerializer):
+    group = serializers.PrimaryKeyRelatedField(queryset=Group.objects.all(), required=False, allow_null=True)
+    stage = serializers.ChoiceField(choices=STAGE_CHOICES, required=False, allow_blank=True)
+
+    class Meta:
+        model = Announcement
+        fields = ["id", "group", "stage", "subject", "body", "status", "recipients", "created_at", "queued_at"]
+        read_only_fields = ["status", "recipients", "created_at", "queued_at"]
+
+    def validate(self, attrs):
+        if bool(attrs.get("group")) == bool(attrs.get("stage")):
+            raise serializers.ValidationError("حدد مجموعة أو مرحلة (واحدة بس)")
+        return attrs
@@ -0,0 +1,165 @@
+from datetime import timedelta
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from bookings.models import Booking
+from groups.models import Group
+from students.models import Student
+from . import outbox
+from .models import Announcement, OutboundEmail
+
+
+class BrokenConnection:
+    """اتصال SMTP بيفشل في كل رسالة"""
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        raise ConnectionError("smtp down")
+
+
+class TakeoverConnection:
+    """اتصال بيبعت عادي، بس أول رسالة بتاخد وقت أطول من الـ lease فworker تاني بياخد الدفعة"""
+
+    def __init__(self):
+        self.sent = []
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send_messages(self, messages):
+        if not self.sent:
+            OutboundEmail.objects.update(locked_until=timezone.now() - timedelta(seconds=1))
+            outbox.claim_batch()
+        self.sent += [message.to[0] for message in messages]
+        return len(messages)
+
+
+class BackoffTests(SimpleTestCase):
+    def test_grows_exponentially_up_to_the_cap(self):
+        first = outbox.backoff(1).total_seconds()
+        self.assertTrue(outbox.BACKOFF_BASE_SECONDS <= first <= outbox.BACKOFF_BASE_SECONDS * 1.2)
+        third = outbox.backoff(3).total_seconds()
+        self.assertTrue(outbox.BACKOFF_BASE_SECONDS * 4 <= third <= outbox.BACKOFF_BASE_SECONDS * 4.8)
+        self.assertLessEqual(outbox.backoff(50).total_seconds(), outbox.BACKOFF_MAX_SECONDS * 1.2)
+
+
+class OutboxTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            outbox.enqueue_email(f"user{i}@example.com", "عنوان", "نص")
+
+    def test_claims_do_not_overlap(self):
+        first = outbox.claim_batch(batch_size=3)
+        second = outbox.claim_batch(batch_size=3)
+        self.assertEqual((len(first), len(second)), (3, 2))
+        self.assertFalse({e.pk for e in first} & {e.pk for e in second})
+        self.assertEqual(outbox.claim_batch(), [])
+
+    def test_expired_lease_is_claimed_again(self):
+        claimed = outbox.claim_batch(batch_size=2)
+        OutboundEmail.objects.filter(pk__in=[e.pk for e in claimed]).update(
+            locked_until=timezone.now() - timedelta(seconds=1)
+        )
+        self.assertEqual(
+            {e.pk for e in outbox.claim_batch()}, set(OutboundEmail.objects.values_list("pk", flat=True))
+        )
+
+    def test_run_once_sends_and_marks_rows(self):
+        self.assertEqual(outbox.run_once(), (5, 5, 0))
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(OutboundEmail.objects.filter(status=OutboundEmail.SENT, claimed_by="").count(), 5)
+
+    def test_expired_lease_mid_batch_leaves_rows_to_the_new_worker(self):
+        emails = outbox.claim_batch(batch_size=2)
+        connection = TakeoverConnection()
+        self.assertEqual(outbox.deliver(emails, connection), (0, 0))
+        # الأولى اتبعتت قبل ما الـ lease يتاخد، التانية متبعتتش من الـ worker القديم
+        self.assertEqual(connection.sent, [emails[0].to])
+        taken = OutboundEmail.objects.filter(pk__in=[e.pk for e in emails])
+        self.assertFalse(taken.filter(claimed_by=emails[0].claimed_by).exists())
+        self.assertEqual(taken.filter(status=OutboundEmail.PENDING, attempts=0).count(), 2)
+
+    def test_failure_is_retried_with_backoff_then_marked_failed(self):
+        emails = outbox.claim_batch(batch_size=1)
+        started = timezone.now()
+        self.assertEqual(outbox.deliver(emails, BrokenConnection()), (0, 1))
+        email = OutboundEmail.objects.get(pk=emails[0].pk)
+        self.assertEqual((email.status, email.attempts, email.locked_until), (OutboundEmail.PENDING, 1, None))
+        self.assertGreaterEqual(email.next_attempt_at, started + timedelta(seconds=outbox.BACKOFF_BASE_SECONDS))
+        self.assertIn("smtp down", email.last_error)
+
+        OutboundEmail.objects.filter(pk=email.pk).update(attempts=outbox.MAX_ATTEMPTS - 1)
+        outbox.deliver([OutboundEmail.objects.get(pk=email.pk)], BrokenConnection())
+        self.assertEqual(OutboundEmail.objects.get(pk=email.pk).status, OutboundEmail.FAILED)
+
+
+class AnnouncementFanOutTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.prep_a = Group.objects.create(
+            name="إعدادي أ", stage="PREP", capacity=5, schedule="4-6", days="السبت"
+        )
+        cls.prep_b = Group.objects.create(name="إعدادي ب", stage="PREP", capacity=5, schedule="6-8")
+        cls.grade6 = Group.objects.create(name="سادس", stage="GRADE6", capacity=5, schedule="4-6")
+        students = Student.objects.bulk_create(
+            Student(full_name=f"طالب {i}", email=f"s{i}@example.com", phone=f"0101000000{i}", stage="PREP")
+            for i in range(4)
+        )
+        # s0 في مجموعتين من نفس المرحلة، s3 مش محجوز
+        Booking.objects.bulk_create([
+            Booking(student=students[0], group=cls.prep_a),
+            Booking(student=students[0], group=cls.prep_b),
+            Booking(student=students[1], group=cls.prep_b),
+            Booking(student=students[2], group=cls.grade6),
+        ])
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def emails_of(self, announcement):
+        return sorted(OutboundEmail.objects.filter(announcement=announcement).values_list("to", flat=True))
+
+    def test_group_announcement_reaches_its_students(self):
+        announcement = outbox.announce("تنبيه", "نص", group=self.prep_b)
+        self.assertEqual(outbox.fan_out(announcement), 2)
+        self.assertEqual(self.emails_of(announcement), ["s0@example.com", "s1@example.com"])
+
+    def test_stage_announcement_reaches_each_student_once(self):
+        announcement = outbox.announce("تنبيه", "نص", stage="PREP")
+        outbox.fan_out(announcement)
+        self.assertEqual(self.emails_of(announcement), ["s0@example.com", "s1@example.com"])
+        announcement.refresh_from_db()
+        self.assertEqual((announcement.status, announcement.recipients), (Announcement.QUEUED, 2))
+
+    def test_fan_out_runs_once(self):
+        announcement = outbox.announce("تنبيه", "نص", group=self.prep_a)
+        outbox.fan_out(announcement)
+        self.assertEqual(outbox.fan_out(announcement), 0)
+        self.assertEqual(OutboundEmail.objects.filter(announcement=announcement).count(), 1)
+
+    def test_sent_email_uses_the_announcement_text(self):
+        outbox.fan_out(outbox.announce("تنبيه مهم", "الحصة اتأجلت", group=self.prep_a))
+        outbox.run_once()
+        self.assertEqual((mail.outbox[0].subject, mail.outbox[0].body), ("تنبيه مهم", "الحصة اتأجلت"))
+
+    def test_schedule_change_announces_to_the_group(self):
+        self.client.force_authenticate(self.admin)
+        response = self.client.put(
+            reverse("groups:group-detail", args=[self.prep_a.pk]), {"schedule": "5-7"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        announcement = Announcement.objects.get(group=self.prep_a)
+        self.assertIn("5-7", announcement.body)
+        outbox.fan_out_pending()
+        self.assertEqual(self.emails_of(announcement), ["s0@example.com"])
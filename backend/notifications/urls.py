@@ -0,0 +1,9 @@
+from django.urls import path
+from . import views
+
+app_name = "notifications"
+
+urlpatterns = [
+    path("announcements/", views.announcement_create, name="announcement-create"),
+    path("announcements/<int:pk>/", views.announcement_detail, name="announcement-detail"),
+]
@@ -0,0 +1,36 @@
+from django.db.models import Count
+from django.shortcuts import get_object_or_404
+from rest_framework import permissions, status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.response import Response
+from .models import Announcement, OutboundEmail
+from .serializers import AnnouncementSerializer
+
+
+# إعلان لطلاب مجموعة أو مرحلة (Admin فقط)
+@api_view(["POST"])
+@permission_classes([permissions.IsAdminUser])
+def announcement_create(request):
+    """
+    {"group": id} أو {"stage": "PREP"} + subject وbody.
+    الطلب بيسجل الإعلان بس (202)؛ run_outbox بيوزعه ويبعته على دفعات
+    """
+    serializer = AnnouncementSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    serializer.save(created_by=request.user)
+    return Response(serializer.data, status=status.HTTP_202_ACCEPTED)
+
+
+# حالة الإعلان وعدد المستلمين في كل حالة (Admin فقط)
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def announcement_detail(request, pk):
+    announcement = get_object_or_404(Announcement, pk=pk)
+    counts = {code: 0 for code, _ in OutboundEmail.STATUS_CHOICES}
+    counts.update(
+        announcement.emails.order_by().values_list("status").annotate(n=Count("id"))
+    )
+    data = AnnouncementSerializer(announcement).data
+    data["delivery"] = counts
+    return Response(data)
@@ -1,8 +1,29 @@
-from django.contrib import admin
-from .models import Student
+from django.contrib import admin, messages
+from .duplicates import MergeError, merge_students
+from .models import DuplicateCandidate, Student
 
 @admin.register(Student)
 class StudentAdmin(admin.ModelAdmin):
     list_display = ('full_name', 'stage', 'email', 'phone')
     list_filter = ('stage',)
     search_fields = ('full_name', 'email', 'phone')
+
+
+@admin.register(DuplicateCandidate)
+class DuplicateCandidateAdmin(admin.ModelAdmin):
+    list_display = ('student', 'other', 'score', 'reasons', 'created_at')
+    list_select_related = ('student', 'other')
+    raw_id_fields = ('student', 'other')
+    actions = ('merge_into_older',)
+
+    @admin.action(description="دمج المكرر في الطالب الأقدم")
+    def merge_into_older(self, request, queryset):
+        merged = 0
+        for candidate in queryset:
+            try:
+                # ممكن يكون اتحذف بدمج زوج تاني في نفس العملية
+                merge_students(candidate.student_id, candidate.other_id)
+                merged += 1
+            except MergeError as e:
+                self.message_user(request, f"{candidate}: {e.message}", messages.WARNING)
+        self.message_user(request, f"تم دمج {merged} طالب")
@@ -3,4 +3,8 @@ from django.apps import AppConfig
 
 class StudentsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
-    name = 'students'
\ No newline at end of file
+    name = 'students'
+
+    def ready(self):
+        """Import signals to ensure they are registered."""
+        import students.signals
@@ -0,0 +1,244 @@
+"""
+اكتشاف الطلاب المكررين ودمجهم.
+
+ولي الأمر ممكن يسجل نفس الطالب مرتين باسم مكتوب مختلف أو إيميل تاني، والقيود
+unique على email وphone مش بتمسك ده. بدل مقارنة كل زوج (n²) كل طالب بياخد
+مفاتيح تجميع (blocking keys)، والمقارنة بتحصل بس جوه كل مجموعة مفتاح:
+  - name:  هيكل الاسم بعد normalize_arabic من غير حروف المد (محمود = محمد)
+  - name2: هيكل أول اسمين + المرحلة (لو اسم الجد ناقص في تسجيل منهم)
+  - phone: آخر 8 أرقام (نفس الرقم بكود شبكة تاني)
+  - email: الجزء قبل @ من غير النقط و+tag (نفس الحساب على دومين تاني)
+المجموعة الأكبر من MAX_BLOCK_SIZE بتتساب لأنها مش بتميز حاجة (اسم منتشر جدًا).
+كل زوج مرشح بياخد score من تشابه الاسم والإشارات التانية، واللي فوق
+DEFAULT_THRESHOLD بيتسجل في DuplicateCandidate للمراجعة من الأدمن.
+
+merge_students بينقل حجوزات وقوائم انتظار الطالب المكرر للطالب الأساسي
+باستعلامات update جماعية وبعدين بيحذفه.
+"""
+from difflib import SequenceMatcher
+from itertools import combinations
+
+from django.db import transaction
+
+from bookings.models import Booking, WaitlistEntry
+from bookings.services import promote_waitlist
+from .models import DuplicateCandidate, Student
+
+DEFAULT_THRESHOLD = 0.75
+MAX_BLOCK_SIZE = 200
+BATCH_SIZE = 5000
+PHONE_SUFFIX = 8
+MIN_EMAIL_LOCAL = 4
+# حروف المد والهاء اللي بتتكتب بأكتر من شكل
+VOWELS = set("اويهaeiouy")
+
+NAME_WEIGHT = 0.6
+PHONE_WEIGHT = 0.2
+EMAIL_WEIGHT = 0.2
+BIRTH_DATE_WEIGHT = 0.1
+# الاسم الأول لازم يكون متشابه بالقدر ده؛ الإخوات بيشتركوا في باقي الاسم
+MIN_FIRST_NAME_SIMILARITY = 0.75
+
+
+class MergeError(Exception):
+    def __init__(self, message):
+        self.message = message
+        super().__init__(message)
+
+
+def skeleton(word):
+    """أول حرف + الحروف الساكنة: احمد -> احمد، محمود -> محمد"""
+    return word[:1] + "".join(ch for ch in word[1:] if ch not in VOWELS)
+
+
+def name_words(key):
+    # "عبد الله" و"عبدالله" نفس الاسم
+    return key.replace("عبد ", "عبد").split()
+
+
+def email_local(email):
+    local = email.split("@", 1)[0].split("+", 1)[0].replace(".", "")
+    return local if len(local) >= MIN_EMAIL_LOCAL else ""
+
+
+def blocking_keys(key, email, phone, stage):
+    words = name_words(key)
+    keys = []
+    if words:
+        keys.append("name:" + " ".join(skeleton(w) for w in words))
+        if len(words) > 2:
+            keys.append(f"name2:{stage}:" + " ".join(skeleton(w) for w in words[:2]))
+    if len(phone) >= PHONE_SUFFIX:
+        keys.append("phone:" + phone[-PHONE_SUFFIX:])
+    local = email_local(email)
+    if local:
+        keys.append("email:" + local)
+    return keys
+
+
+def score_pair(a, b):
+    """a وb: (search_key, email_local, phone_suffix, birth_date). Returns (score, reasons)"""
+    words_a, words_b = name_words(a[0]), name_words(b[0])
+    if not words_a or not words_b:
+        return 0, []
+    if words_a[0] != words_b[0] and (
+        SequenceMatcher(None, words_a[0], words_b[0]).ratio() < MIN_FIRST_NAME_SIMILARITY
+    ):
+        return 0, []
+    name = SequenceMatcher(None, " ".join(words_a), " ".join(words_b)).ratio()
+    score = NAME_WEIGHT * name
+    reasons = ["name"] if name >= 0.8 else []
+    if a[2] and a[2] == b[2]:
+        score += PHONE_WEIGHT
+        reasons.append("phone")
+    if a[1] and a[1] == b[1]:
+        score += EMAIL_WEIGHT
+        reasons.append("email")
+    if a[3] and a[3] == b[3]:
+        score += BIRTH_DATE_WEIGHT
+        reasons.append("birth_date")
+    return min(score, 1.0), reasons
+
+
+def find_duplicates(threshold=DEFAULT_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """
+    يحسب الأزواج المشتبه فيها لكل الطلاب ويرجعها من غير ما يكتب حاجة:
+    ([(student_id, other_id, score, reasons)], stats)
+    """
+    records = {}
+    # المفتاح نفسه مش محتاجينه بعد التجميع، فبنخزن hash بس عشان الذاكرة؛ لو
+    # حصل تصادم نادر أقصى حاجة زوج زيادة بيتحسب وبيترفض من الـ score.
+    # أغلب المفاتيح لطالب واحد، فالقيمة بتفضل int لحد ما يجي طالب تاني
+    blocks = {}
+    rows = (
+        Student.objects.order_by("pk")
+        .values_list("pk", "search_key", "email", "phone", "stage", "birth_date")
+        .iterator(chunk_size=BATCH_SIZE)
+    )
+    for pk, key, email, phone, stage, birth_date in rows:
+        records[pk] = (key, email_local(email), phone[-PHONE_SUFFIX:], birth_date)
+        for block in blocking_keys(key, email, phone, stage):
+            block = hash(block)
+            ids = blocks.get(block)
+            if ids is None:
+                blocks[block] = pk
+            elif isinstance(ids, list):
+                ids.append(pk)
+            else:
+                blocks[block] = [ids, pk]
+
+    seen = set()
+    pairs = []
+    compared = skipped = 0
+    for ids in blocks.values():
+        if not isinstance(ids, list):
+            continue
+        if len(ids) > max_block_size:
+            skipped += 1
+            continue
+        for a, b in combinations(ids, 2):
+            # ids جوه كل block مترتبة تصاعديًا لأن القراءة بترتيب pk
+            if (a, b) in seen:
+                continue
+            seen.add((a, b))
+            compared += 1
+            score, reasons = score_pair(records[a], records[b])
+            if score >= threshold:
+                pairs.append((a, b, round(score, 3), ",".join(reasons)))
+
+    stats = {
+        "students": len(records),
+        "blocks": len(blocks),
+        "skipped_blocks": skipped,
+        "compared": compared,
+        "candidates": len(pairs),
+    }
+    return pairs, stats
+
+
+def refresh_candidates(threshold=DEFAULT_THRESHOLD, max_block_size=MAX_BLOCK_SIZE):
+    """يستبدل تقرير DuplicateCandidate بنتيجة تشغيل جديد"""
+    pairs, stats = find_duplicates(threshold, max_block_size)
+    with transaction.atomic():
+        DuplicateCandidate.objects.all().delete()
+        DuplicateCandidate.objects.bulk_create(
+            [
+                DuplicateCandidate(student_id=a, other_id=b, score=score, reasons=reasons)
+                for a, b, score, reasons in pairs
+            ],
+            batch_size=BATCH_SIZE,
+        )
+    return stats
+
+
+def merge_students(keep_id, remove_id):
+    """
+    دمج remove في keep: الحجوزات وقوائم الانتظار بتتنقل باستعلامات update
+    جماعية، والحجز المكرر (الاتنين في نفس المجموعة) بيتحذف ومقعده بيروح لأول
+    المنتظرين. البيانات الناقصة في keep بتتكمل من remove وبعدين remove بيتحذف.
+    """
+    if keep_id == remove_id:
+        raise MergeError("لا يمكن دمج الطالب مع نفسه")
+
+    with transaction.atomic():
+        students = {
+            s.pk: s
+            for s in Student.objects.select_for_update().filter(pk__in=[keep_id, remove_id]).order_by("pk")
+        }
+        if len(students) < 2:
+            raise MergeError("الطالب غير موجود")
+        keep, remove = students[keep_id], students[remove_id]
+
+        keep_groups = set(Booking.objects.filter(student=keep).values_list("group_id", flat=True))
+        moved_bookings = (
+            Booking.objects.filter(student=remove).exclude(group_id__in=keep_groups).update(student=keep)
+        )
+        # اللي فاضل حجوزات في مجموعات keep محجوز فيها أصلًا
+        freed = list(Booking.objects.filter(student=remove).values_list("group_id", flat=True))
+        Booking.objects.filter(student=remove).delete()  # post_delete بينقص booked_count
+        booked = keep_groups.union(
+            Booking.objects.filter(student=keep).values_list("group_id", flat=True)
+        )
+
+        # مكان keep في الانتظار مالوش لازمة لو بقى محجوز، ولو الاتنين منتظرين نسيب الأقدم
+        WaitlistEntry.objects.filter(student=keep, group_id__in=booked).delete()
+        keep_waiting = {
+            entry.group_id: entry for entry in WaitlistEntry.objects.filter(student=keep)
+        }
+        moved_waitlist = 0
+        for entry in WaitlistEntry.objects.filter(student=remove):
+            other = keep_waiting.get(entry.group_id)
+            if entry.group_id in booked or (other and other.position < entry.position):
+                entry.delete()
+                continue
+            if other:
+                other.delete()
+            entry.student = keep
+            entry.save(update_fields=["student"])
+            moved_waitlist += 1
+
+        for group_id in freed:
+            promote_waitlist(group_id)
+
+        fields = []
+        if not keep.birth_date and remove.birth_date:
+            keep.birth_date = remove.birth_date
+            fields.append("birth_date")
+        if remove.notes and remove.notes not in keep.notes:
+            keep.notes = "\n".join(filter(None, [keep.notes, remove.notes]))
+            fields.append("notes")
+        user = remove.user
+        remove.delete()
+        if keep.user_id is None and user is not None:
+            keep.user = user
+            fields.append("user")
+        if fields:
+            keep.save(update_fields=[*fields, "updated_at"])
+
+    return {
+        "student": keep.pk,
+        "removed": remove_id,
+        "moved_bookings": moved_bookings,
+        "dropped_bookings": len(freed),
+        "moved_waitlist": moved_waitlist,
+    }
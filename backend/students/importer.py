@@ -0,0 +1,248 @@
+"""
+استيراد عدد كبير من الطلاب من ملف CSV أو XLSX.
+
+الملف بيتقرا صف بصف (مش كله في الذاكرة)، وكل صف بيتحقق منه من غير قاعدة
+بيانات. الصفوف السليمة بتتجمع في دفعات: كل دفعة استعلامين IN للإيميلات
+والأرقام الموجودة، وبعدين bulk_create في معاملة قصيرة. الرد تقرير بالصفوف
+اللي فيها أخطاء ورقم كل صف في الملف.
+"""
+import csv
+import io
+from datetime import date, datetime
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from backend.autocomplete import autocomplete
+from .models import Student, STAGE_CHOICES
+from .search import build_search_document, build_search_key
+from .serializers import validate_egypt_phone
+
+BATCH_SIZE = 1000
+# التقرير بيرجع أول كذا خطأ بس؛ الباقي بيتعد
+MAX_REPORTED_ERRORS = 1000
+
+# اسم العمود في الملف -> الحقل
+COLUMNS = {
+    "full_name": "full_name", "name": "full_name", "الاسم": "full_name", "اسم الطالب": "full_name",
+    "email": "email", "البريد": "email", "البريد الإلكتروني": "email", "الايميل": "email",
+    "phone": "phone", "mobile": "phone", "الهاتف": "phone", "الموبايل": "phone", "رقم الهاتف": "phone",
+    "stage": "stage", "المرحلة": "stage",
+    "birth_date": "birth_date", "تاريخ الميلاد": "birth_date",
+    "notes": "notes", "ملاحظات": "notes",
+}
+REQUIRED = ("full_name", "email", "phone", "stage")
+# المرحلة بالكود أو بالاسم المعروض
+STAGES = {**{code: code for code, _ in STAGE_CHOICES}, **{label: code for code, label in STAGE_CHOICES}}
+
+
+class ImportFileError(Exception):
+    def __init__(self, message):
+        self.message = message
+        # لو الخطأ حصل في نص الملف: تقرير اللي اتحفظ قبله (الدفعات اللي قبله اتعملها commit)
+        self.report = None
+        super().__init__(message)
+
+
+def _csv_rows(fileobj):
+    text = io.TextIOWrapper(fileobj, encoding="utf-8-sig", newline="")
+    try:
+        yield from csv.reader(text)
+    except UnicodeDecodeError:
+        raise ImportFileError("الملف لازم يكون CSV بترميز UTF-8")
+    finally:
+        text.detach()
+
+
+def _xlsx_rows(fileobj):
+    try:
+        from openpyxl import load_workbook
+    except ImportError:
+        raise ImportFileError("استيراد XLSX محتاج مكتبة openpyxl")
+    try:
+        # read_only بيقرا الشيت صف بصف بدل ما يحمله كله
+        workbook = load_workbook(fileobj, read_only=True, data_only=True)
+    except Exception:
+        raise ImportFileError("ملف XLSX غير صالح")
+    try:
+        for row in workbook.active.iter_rows(values_only=True):
+            yield ["" if value is None else value for value in row]
+    finally:
+        workbook.close()
+
+
+def read_rows(fileobj, filename):
+    """يرجع (رقم الصف في الملف، dict بالحقول) لكل صف بعد العناوين"""
+    rows = _xlsx_rows(fileobj) if filename.lower().endswith(".xlsx") else _csv_rows(fileobj)
+    header = next(rows, None)
+    if header is None:
+        raise ImportFileError("الملف فاضي")
+    fields = [COLUMNS.get(str(name).strip().lower()) for name in header]
+    missing = [name for name in REQUIRED if name not in fields]
+    if missing:
+        raise ImportFileError(f"أعمدة ناقصة: {', '.join(missing)}")
+    for number, values in enumerate(rows, start=2):
+        if not any(str(value).strip() for value in values):
+            continue
+        yield number, {
+            field: value for field, value in zip(fields, values) if field is not None
+        }
+
+
+def _parse_birth_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    if not value:
+        return None
+    return date.fromisoformat(value)
+
+
+def clean_row(raw):
+    """تحقق صف واحد من غير قاعدة بيانات. Returns (Student, errors)"""
+    errors = {}
+    values = {field: raw.get(field, "") for field in COLUMNS.values()}
+
+    full_name = " ".join(str(values["full_name"]).split())
+    if not full_name:
+        errors["full_name"] = "الاسم مطلوب"
+
+    email = str(values["email"]).strip().lower()
+    try:
+        validate_email(email)
+    except DjangoValidationError:
+        errors["email"] = "البريد الإلكتروني غير صالح"
+
+    phone = str(values["phone"]).strip()
+    # Excel بيشيل الصفر اللي على الشمال من الأرقام
+    if phone.isdigit() and len(phone) == 10 and phone.startswith("1"):
+        phone = "0" + phone
+    try:
+        phone = validate_egypt_phone(phone)
+    except serializers.ValidationError as e:
+        errors["phone"] = str(e.detail[0])
+
+    stage = STAGES.get(str(values["stage"]).strip().upper()) or STAGES.get(str(values["stage"]).strip())
+    if stage is None:
+        errors["stage"] = "قيمة المرحلة غير صحيحة."
+
+    birth_date = None
+    try:
+        birth_date = _parse_birth_date(values["birth_date"])
+    except ValueError:
+        errors["birth_date"] = "تاريخ الميلاد لازم يكون بصيغة YYYY-MM-DD"
+    if birth_date and birth_date >= date.today():
+        errors["birth_date"] = "تاريخ الميلاد يجب أن يكون في الماضي."
+
+    student = Student(
+        full_name=full_name, email=email, phone=phone, stage=stage,
+        birth_date=birth_date, notes=str(values["notes"] or "").strip(),
+    )
+    return student, errors
+
+
+class StudentImport:
+    def __init__(self, batch_size=BATCH_SIZE, dry_run=False):
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.total = 0
+        self.created = 0
+        self.error_count = 0
+        self.errors = []
+        # تكرار داخل الملف نفسه
+        self.seen_emails = set()
+        self.seen_phones = set()
+
+    def error(self, number, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": number, "errors": errors})
+
+    def run(self, rows):
+        try:
+            return self._run(rows)
+        except ImportFileError as e:
+            e.report = self.report()
+            raise
+        finally:
+            if self.created and not self.dry_run:
+                autocomplete.invalidate()
+
+    def _run(self, rows):
+        batch = []
+        for number, raw in rows:
+            self.total += 1
+            student, errors = clean_row(raw)
+            if not errors:
+                if student.email in self.seen_emails:
+                    errors["email"] = "البريد مكرر في الملف"
+                if student.phone in self.seen_phones:
+                    errors["phone"] = "الرقم مكرر في الملف"
+            if errors:
+                self.error(number, errors)
+                continue
+            self.seen_emails.add(student.email)
+            self.seen_phones.add(student.phone)
+            batch.append((number, student))
+            if len(batch) >= self.batch_size:
+                self.flush(batch)
+                batch = []
+        if batch:
+            self.flush(batch)
+        return self.report()
+
+    def flush(self, batch):
+        emails = set(
+            Student.objects.filter(email__in=[s.email for _, s in batch]).values_list("email", flat=True)
+        )
+        phones = set(
+            Student.objects.filter(phone__in=[s.phone for _, s in batch]).values_list("phone", flat=True)
+        )
+        fresh = []
+        for number, student in batch:
+            errors = {}
+            if student.email in emails:
+                errors["email"] = "هذا البريد مستخدم من قبل."
+            if student.phone in phones:
+                errors["phone"] = "هذا الرقم مستخدم من قبل."
+            if errors:
+                self.error(number, errors)
+            else:
+                # bulk_create مش بيستدعي save()
+                student.search_document = build_search_document(student)
+                student.search_key = build_search_key(student)
+                fresh.append((number, student))
+        if self.dry_run or not fresh:
+            self.created += len(fresh)
+            return
+        try:
+            with transaction.atomic():
+                Student.objects.bulk_create([student for _, student in fresh])
+            self.created += len(fresh)
+        except IntegrityError:
+            # حد سجّل نفس الإيميل أو الرقم بين التحقق والكتابة: صف صف للدفعة دي بس
+            for number, student in fresh:
+                try:
+                    with transaction.atomic():
+                        Student.objects.bulk_create([student])
+                    self.created += 1
+                except IntegrityError:
+                    self.error(number, {"non_field_errors": "البريد أو الرقم مستخدم من قبل."})
+
+    def report(self):
+        return {
+            "total": self.total,
+            "created": self.created,
+            "failed": self.error_count,
+            "dry_run": self.dry_run,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+def import_students(fileobj, filename, batch_size=BATCH_SIZE, dry_run=False):
+    return StudentImport(batch_size=batch_size, dry_run=dry_run).run(read_rows(fileobj, filename))
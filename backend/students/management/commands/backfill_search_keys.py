@@ -0,0 +1,95 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from backend.arabic import normalize_arabic
+from backend.autocomplete import autocomplete
+from groups.cache import bump_catalogue_version
+from groups.models import Group, GroupNameWord, name_suffixes
+from students.models import Student
+from students.search import build_search_document, build_search_key
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute Student.search_key / search_document, Group.name_key and the group "
+        "name-word index in batches "
+        "(run after migrating, or after changing the normalization rules)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        started = time.perf_counter()
+
+        updated = self.backfill(
+            Student.objects.only("id", "full_name", "email", "phone", "notes", "search_key", "search_document"),
+            batch_size,
+            lambda student: {
+                "search_key": build_search_key(student),
+                "search_document": build_search_document(student),
+            },
+        )
+        self.stdout.write(f"Students: {updated} updated")
+
+        updated = self.backfill(
+            Group.objects.only("id", "name", "name_key"),
+            batch_size,
+            lambda group: {"name_key": normalize_arabic(group.name)[:100]},
+        )
+        self.stdout.write(f"Groups: {updated} updated")
+
+        words = self.rebuild_name_words(batch_size)
+        self.stdout.write(f"Group name words: {words} rebuilt")
+        # bulk_update مبيبعتش إشارات: فهرس الـ autocomplete والكتالوج المتخزن يتبنوا من جديد
+        transaction.on_commit(autocomplete.invalidate)
+        transaction.on_commit(bump_catalogue_version)
+        self.stdout.write(self.style.SUCCESS(f"Done in {time.perf_counter() - started:.1f}s"))
+
+    def backfill(self, queryset, batch_size, compute):
+        """keyset على pk: كل دفعة استعلام على الفهرس ومعاملة قصيرة لوحدها"""
+        updated = 0
+        last_pk = 0
+        while True:
+            batch = list(queryset.filter(pk__gt=last_pk).order_by("pk")[:batch_size])
+            if not batch:
+                return updated
+            last_pk = batch[-1].pk
+            changed = []
+            fields = set()
+            for obj in batch:
+                values = compute(obj)
+                if any(getattr(obj, name) != value for name, value in values.items()):
+                    for name, value in values.items():
+                        setattr(obj, name, value)
+                    fields.update(values)
+                    changed.append(obj)
+            if changed:
+                # bulk_update مش بيستدعي save() فمفيش إشارات ولا تعديل لـ updated_at
+                with transaction.atomic():
+                    queryset.model.objects.bulk_update(changed, sorted(fields))
+                updated += len(changed)
+
+    def rebuild_name_words(self, batch_size):
+        """bulk_update فوق مبيبعتش post_save، فالفهرس بيتبني هنا من name_key"""
+        rebuilt = 0
+        last_pk = 0
+        while True:
+            batch = list(
+                Group.objects.filter(pk__gt=last_pk).order_by("pk").values_list("pk", "name_key")[:batch_size]
+            )
+            if not batch:
+                return rebuilt
+            last_pk = batch[-1][0]
+            words = [
+                GroupNameWord(group_id=pk, key=key)
+                for pk, name_key in batch
+                for key in name_suffixes(name_key)
+            ]
+            with transaction.atomic():
+                GroupNameWord.objects.filter(group_id__in=[pk for pk, _ in batch]).delete()
+                GroupNameWord.objects.bulk_create(words, batch_size=batch_size)
+            rebuilt += len(words)
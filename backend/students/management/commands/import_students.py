@@ -0,0 +1,50 @@
+import csv
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from students.importer import BATCH_SIZE, ImportFileError, import_students
+
+
+class Command(BaseCommand):
+    help = "Import students from a CSV or XLSX file in batches and print a row-level error report."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Validate only, do not create")
+        parser.add_argument("--errors-csv", help="Write the rejected rows (row, field, message) here")
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        try:
+            with open(options["path"], "rb") as f:
+                report = import_students(
+                    f, options["path"], batch_size=options["batch_size"], dry_run=options["dry_run"]
+                )
+        except OSError as e:
+            raise CommandError(str(e))
+        except ImportFileError as e:
+            if e.report and e.report["created"]:
+                raise CommandError(
+                    f"{e.message} (stopped after {e.report['total']} row(s); "
+                    f"{e.report['created']} already created)"
+                )
+            raise CommandError(e.message)
+
+        self.stdout.write(
+            f"{report['total']} row(s): {report['created']} created, {report['failed']} rejected "
+            f"in {time.perf_counter() - started:.1f}s" + (" (dry run)" if report["dry_run"] else "")
+        )
+        if options["errors_csv"] and report["errors"]:
+            with open(options["errors_csv"], "w", encoding="utf-8-sig", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["row", "field", "message"])
+                for item in report["errors"]:
+                    for field, message in item["errors"].items():
+                        writer.writerow([item["row"], field, message])
+        else:
+            for item in report["errors"][:20]:
+                self.stdout.write(f"  row {item['row']}: {item['errors']}")
+        if report["errors_truncated"]:
+            self.stdout.write(self.style.WARNING("Error report truncated"))
@@ -0,0 +1,106 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:52
+
+from django.db import migrations, models
+
+# نسخة ثابتة من students.search وقت الـ migration دي؛ الكود الحي ممكن يتغير
+FTS_TABLE = 'students_student_fts'
+BATCH_SIZE = 2000
+
+
+def build_search_document(student):
+    parts = (student.full_name, student.email, student.phone, student.notes)
+    return ' '.join(part for part in parts if part).lower()
+
+
+POSTGRES_FORWARD = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    "CREATE INDEX IF NOT EXISTS idx_student_search_tsv ON students_student "
+    "USING GIN (to_tsvector('simple'::regconfig, COALESCE(search_document, '')))",
+    "CREATE INDEX IF NOT EXISTS idx_student_search_trgm ON students_student "
+    "USING GIN (search_document gin_trgm_ops)",
+]
+POSTGRES_REVERSE = [
+    "DROP INDEX IF EXISTS idx_student_search_trgm",
+    "DROP INDEX IF EXISTS idx_student_search_tsv",
+]
+
+# جدول FTS5 بمحتوى خارجي: النص نفسه في students_student والـ triggers بتحدث الفهرس
+SQLITE_FORWARD = [
+    f"CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5("
+    "search_document, content='students_student', content_rowid='id', "
+    "tokenize='unicode61 remove_diacritics 2')",
+    f"CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON students_student BEGIN "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END",
+    f"CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON students_student BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); END",
+    f"CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF search_document ON students_student BEGIN "
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, search_document) "
+    "VALUES ('delete', old.id, old.search_document); "
+    f"INSERT INTO {FTS_TABLE}(rowid, search_document) VALUES (new.id, new.search_document); END",
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+SQLITE_REVERSE = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def backfill_search_document(apps, schema_editor):
+    Student = apps.get_model('students', 'Student')
+    batch = []
+    for student in Student.objects.only(
+        'id', 'full_name', 'email', 'phone', 'notes'
+    ).order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        student.search_document = build_search_document(student)
+        batch.append(student)
+        if len(batch) >= BATCH_SIZE:
+            Student.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    if batch:
+        Student.objects.bulk_update(batch, ['search_document'])
+
+
+def _run(schema_editor, statements):
+    for sql in statements:
+        schema_editor.execute(sql)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_FORWARD)
+    elif vendor == 'sqlite':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT sqlite_compileoption_used('ENABLE_FTS5')")
+            if not cursor.fetchone()[0]:
+                # من غير FTS5 البحث بيرجع لـ LIKE على search_document
+                return
+        _run(schema_editor, SQLITE_FORWARD)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        _run(schema_editor, POSTGRES_REVERSE)
+    elif vendor == 'sqlite':
+        _run(schema_editor, SQLITE_REVERSE)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0003_student_idx_student_created_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(backfill_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
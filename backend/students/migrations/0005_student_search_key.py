@@ -0,0 +1,60 @@
+# Generated by Django 5.2.5 on 2026-10-17 21:48
+
+import re
+
+from django.conf import settings
+from django.db import migrations, models
+
+# نسخة ثابتة من backend.arabic وstudents.search وقت الـ migration دي
+BATCH_SIZE = 2000
+
+ARABIC_DIGITS = str.maketrans('٠١٢٣٤٥٦٧٨٩', '0123456789')
+LETTERS = str.maketrans({
+    'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا',
+    'ى': 'ي', 'ة': 'ه', 'ؤ': 'و', 'ئ': 'ي',
+})
+DIACRITICS_RE = re.compile('[\u064b-\u0652\u0670\u0640]')
+
+
+def normalize_arabic(text):
+    text = DIACRITICS_RE.sub('', (text or '').translate(ARABIC_DIGITS).translate(LETTERS))
+    return ' '.join(text.lower().split())
+
+
+def backfill_search_key(apps, schema_editor):
+    """search_key جديد، وsearch_document بيتحسب تاني لأنه بقى بعد normalize_arabic"""
+    Student = apps.get_model('students', 'Student')
+    batch = []
+    for student in Student.objects.only(
+        'id', 'full_name', 'email', 'phone', 'notes'
+    ).order_by('pk').iterator(chunk_size=BATCH_SIZE):
+        student.search_key = normalize_arabic(student.full_name)[:120]
+        parts = (student.full_name, student.email, student.phone, student.notes)
+        student.search_document = normalize_arabic(' '.join(part for part in parts if part))
+        batch.append(student)
+        if len(batch) >= BATCH_SIZE:
+            Student.objects.bulk_update(batch, ['search_key', 'search_document'])
+            batch = []
+    if batch:
+        Student.objects.bulk_update(batch, ['search_key', 'search_document'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0004_student_search_document'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='student',
+            name='search_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=120),
+        ),
+        migrations.AddIndex(
+            model_name='student',
+            index=models.Index(fields=['search_key'], name='idx_student_search_key', opclasses=['varchar_pattern_ops']),
+        ),
+        migrations.RunPython(backfill_search_key, migrations.RunPython.noop),
+    ]
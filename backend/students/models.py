@@ -2,6 +2,7 @@ from django.db import models
 from django.conf import settings
 from django.utils import timezone
 from django.db.models.functions import Lower
+from .search import build_search_document, build_search_key
 
 STAGE_CHOICES = (
     ("GRADE6", "سادس ابتدائي"),
@@ -22,6 +23,10 @@ class Student(models.Model):
     birth_date = models.DateField(null=True, blank=True)
     stage = models.CharField(max_length=10, choices=STAGE_CHOICES)
     notes = models.TextField(blank=True, default="")
+    # نص البحث المفهرس (students.search)؛ بيتحسب في save()
+    search_document = models.TextField(blank=True, default="", editable=False)
+    # الاسم بعد normalize_arabic، للبحث بالمساواة والبداية
+    search_key = models.CharField(max_length=120, blank=True, default="", editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -29,6 +34,12 @@ class Student(models.Model):
         indexes = [
             models.Index(Lower("email"), name="idx_student_email_ci"),
             models.Index(models.F("phone"), name="idx_student_phone"),
+            # ترتيب الـ cursor الافتراضي (-created_at, -id)
+            models.Index(fields=["created_at", "id"], name="idx_student_created_id"),
+            # varchar_pattern_ops عشان LIKE 'key%' يستخدم الفهرس على PostgreSQL
+            models.Index(
+                fields=["search_key"], name="idx_student_search_key", opclasses=["varchar_pattern_ops"]
+            ),
         ]
         constraints = [
             models.UniqueConstraint(Lower("email"), name="unique_student_email_ci"),
@@ -40,6 +51,11 @@ class Student(models.Model):
             self.email = self.email.lower().strip()
         if self.full_name:
             self.full_name = " ".join(self.full_name.split())
+        self.search_document = build_search_document(self)
+        self.search_key = build_search_key(self)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "search_document", "search_key"}
         super().save(*args, **kwargs)
 
     @property
@@ -54,3 +70,26 @@ class Student(models.Model):
 
     def __str__(self):
         return f"{self.full_name} ({self.get_stage_display()})"
+
+
+class DuplicateCandidate(models.Model):
+    """زوج طلاب غالبًا نفس الشخص؛ بيتملى من find_duplicates (students.duplicates)"""
+    student = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="+")
+    # دايمًا id أكبر من student
+    other = models.ForeignKey(Student, on_delete=models.CASCADE, related_name="+")
+    score = models.FloatField()
+    # الإشارات اللي اتطابقت: name / phone / email / birth_date
+    reasons = models.CharField(max_length=60)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["-score", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["student", "other"], name="unique_duplicate_pair"),
+        ]
+        indexes = [
+            models.Index(fields=["-score", "id"], name="idx_duplicate_score"),
+        ]
+
+    def __str__(self):
+        return f"{self.student_id} ~ {self.other_id} ({self.score:.2f})"
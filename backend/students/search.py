@@ -0,0 +1,106 @@
+"""
+البحث في الطلاب عن طريق فهرس بدل icontains على أربع أعمدة.
+
+Student.search_document فيه الاسم والإيميل والموبايل والملاحظات، وStudent.search_key
+فيه الاسم بس؛ الاتنين بعد normalize_arabic (احمد = أحمد، هدي = هدى) وبيتحسبوا في
+Student.save(). search_key عليه فهرس للمساواة والبداية، والاسم اللي بيبدأ بالبحث
+بيطلع الأول. فهرس search_document حسب قاعدة البيانات:
+  - PostgreSQL: GIN على to_tsvector('simple', search_document) للبحث ببداية
+    الكلمات مع ترتيب ts_rank، وGIN trigram للبحث بجزء من الكلمة (زي وسط رقم الموبايل).
+  - SQLite: جدول FTS5 (students_student_fts) بيتحدث بـ triggers، وترتيب bm25.
+  - غير كده: LIKE على search_document.
+الفهارس نفسها في migration 0004_student_search_document.
+"""
+import re
+
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+from backend.arabic import normalize_arabic
+
+FTS_TABLE = "students_student_fts"
+# أقل طول للبحث بجزء من الكلمة؛ trigram محتاج 3 حروف على الأقل
+MIN_SUBSTRING_LENGTH = 3
+
+
+def build_search_key(student):
+    return normalize_arabic(student.full_name)[:120]
+
+
+def build_search_document(student):
+    parts = (student.full_name, student.email, student.phone, student.notes)
+    return normalize_arabic(" ".join(part for part in parts if part))
+
+
+def search_terms(query):
+    """الكلمات اللي هنبحث بيها؛ أي رموز تانية بتتشال عشان متكسرش صيغة الاستعلام"""
+    return re.findall(r"\w+", normalize_arabic(query))
+
+
+def _name_match(key):
+    # 0 = الاسم بالظبط، 1 = الاسم بيبدأ بالبحث، 2 = تطابق في أي مكان تاني
+    return Case(
+        When(search_key=key, then=Value(0)),
+        When(search_key__startswith=key, then=Value(1)),
+        default=Value(2),
+        output_field=IntegerField(),
+    )
+
+
+def _fts_available():
+    if not hasattr(_fts_available, "result"):
+        _fts_available.result = FTS_TABLE in connection.introspection.table_names()
+    return _fts_available.result
+
+
+def search_students(queryset, query):
+    """
+    فلترة queryset بالبحث. Returns (queryset, ranked): ranked معناها إن فيه
+    annotations اسمها name_match وsearch_rank ينفع نرتب بيهم (الأصغر الأنسب).
+    """
+    terms = search_terms(query)
+    if not terms:
+        return queryset, False
+    key = " ".join(terms)
+    by_name = Q(search_key__startswith=key)
+
+    if connection.vendor == "postgresql":
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector("search_document", config="simple")
+        prefix = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms), config="simple", search_type="raw"
+        )
+        matches = by_name | Q(search_vector=prefix)
+        if len(key) >= MIN_SUBSTRING_LENGTH:
+            matches |= Q(search_document__contains=key)
+        queryset = queryset.annotate(
+            search_vector=vector,
+            name_match=_name_match(key),
+            search_rank=-SearchRank(F("search_vector"), prefix),
+        ).filter(matches)
+        return queryset, True
+
+    if connection.vendor == "sqlite" and _fts_available():
+        match = " ".join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(
+            by_name
+            | Q(pk__in=RawSQL(f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", (match,)))
+        ).annotate(
+            name_match=_name_match(key),
+            search_rank=RawSQL(
+                f"SELECT bm25({FTS_TABLE}) FROM {FTS_TABLE} "
+                f"WHERE {FTS_TABLE} MATCH %s AND rowid = students_student.id",
+                (match,),
+            ),
+        )
+        return queryset, True
+
+    contains_all = Q()
+    for term in terms:
+        contains_all &= Q(search_document__contains=term)
+    queryset = queryset.filter(by_name | contains_all).annotate(
+        name_match=_name_match(key), search_rank=Value(0, output_field=IntegerField())
+    )
+    return queryset, True
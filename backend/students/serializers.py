@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Student, STAGE_CHOICES
+from .models import DuplicateCandidate, Student, STAGE_CHOICES
 import re
 from datetime import date
 
@@ -18,7 +18,7 @@ class StudentSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Student
-        fields = "__all__"
+        exclude = ["search_document", "search_key"]
         read_only_fields = ["created_at", "updated_at", "age"]
 
     def validate_email(self, value):
@@ -49,3 +49,29 @@ class StudentSerializer(serializers.ModelSerializer):
         if value and value >= date.today():
             raise serializers.ValidationError("تاريخ الميلاد يجب أن يكون في الماضي.")
         return value
+
+
+class DuplicateStudentSerializer(serializers.ModelSerializer):
+    bookings = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Student
+        fields = ["id", "full_name", "email", "phone", "stage", "birth_date", "created_at", "bookings"]
+
+    def get_bookings(self, obj):
+        # العدد بيتحسب للصفحة كلها في استعلام واحد (duplicate_list)
+        return self.context.get("booking_counts", {}).get(obj.pk, 0)
+
+
+class DuplicateCandidateSerializer(serializers.ModelSerializer):
+    student = DuplicateStudentSerializer(read_only=True)
+    other = DuplicateStudentSerializer(read_only=True)
+
+    class Meta:
+        model = DuplicateCandidate
+        fields = ["id", "student", "other", "score", "reasons", "created_at"]
+
+
+class MergeStudentsSerializer(serializers.Serializer):
+    keep = serializers.IntegerField()
+    remove = serializers.IntegerField()
@@ -0,0 +1,18 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from backend.autocomplete import autocomplete
+from .models import Student
+
+
+@receiver(post_save, sender=Student)
+def index_student_name(sender, instance, raw=False, **kwargs):
+    if not raw:
+        change = ("student", instance.pk, instance.full_name, instance.search_key)
+        transaction.on_commit(lambda: autocomplete.record(*change))
+
+
+@receiver(post_delete, sender=Student)
+def unindex_student_name(sender, instance, **kwargs):
+    pk = instance.pk
+    transaction.on_commit(lambda: autocomplete.record("student", pk))
@@ -1,3 +1,377 @@
-from django.test import TestCase
+import io
+from unittest import mock
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from backend.arabic import normalize_arabic
+from backend.autocomplete import Autocomplete, autocomplete
+from backend.pagination import keyset_ordering
+from bookings.models import Booking, WaitlistEntry
+from bookings.services import join_waitlist, reserve_seat
+from groups.cache import catalogue_version
+from groups.models import Group, GroupNameWord
+from .duplicates import MergeError, find_duplicates, merge_students
+from .importer import import_students
+from .models import Student
 
-# Create your tests here.
+HEADER = "full_name,email,phone,stage\n"
+
+
+def csv_file(*rows):
+    return io.BytesIO((HEADER + "".join(row + "\n" for row in rows)).encode())
+
+
+class StudentImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Student.objects.create(
+            full_name="موجود", email="taken@example.com", phone="01000000009", stage="PREP"
+        )
+
+    def test_valid_rows_are_created_across_batches(self):
+        rows = [f"طالب {i},s{i}@example.com,0101000000{i},PREP" for i in range(5)]
+        report = import_students(csv_file(*rows), "students.csv", batch_size=2)
+        self.assertEqual((report["total"], report["created"], report["failed"]), (5, 5, 0))
+        self.assertEqual(Student.objects.filter(email__startswith="s").count(), 5)
+        # bulk_create مش بيستدعي save()، فمفاتيح البحث بتتحسب في المستورد
+        self.assertEqual(Student.objects.get(email="s0@example.com").search_key, "طالب 0")
+
+    def test_duplicates_in_file_and_database_are_rejected_by_row(self):
+        report = import_students(
+            csv_file(
+                "أحمد,a@example.com,01010000001,PREP",
+                "أحمد تاني,A@example.com,01010000002,PREP",  # نفس الإيميل في الملف
+                "منى,taken@example.com,01010000003,PREP",     # إيميل موجود
+                "سارة,sara@example.com,01000000009,PREP",     # رقم موجود
+                "بلا مرحلة,x@example.com,01010000004,XXX",
+            ),
+            "students.csv",
+            batch_size=2,
+        )
+        self.assertEqual((report["total"], report["created"], report["failed"]), (5, 1, 4))
+        self.assertEqual(
+            {item["row"]: set(item["errors"]) for item in report["errors"]},
+            {3: {"email"}, 4: {"email"}, 5: {"phone"}, 6: {"stage"}},
+        )
+
+    def test_dry_run_writes_nothing(self):
+        report = import_students(
+            csv_file("أحمد,a@example.com,01010000001,PREP"), "students.csv", dry_run=True
+        )
+        self.assertEqual(report["created"], 1)
+        self.assertFalse(Student.objects.filter(email="a@example.com").exists())
+
+
+class StudentImportEndpointTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def setUp(self):
+        self.client.force_authenticate(self.admin)
+
+    def test_encoding_error_reports_rows_already_saved(self):
+        # أكبر من الـ buffer بتاع TextIOWrapper عشان الدفعات الأولى تتحفظ قبل الخطأ
+        rows = "".join(f"طالب {i},s{i}@example.com,0101{i:07d},PREP\n" for i in range(400))
+        upload = io.BytesIO((HEADER + rows).encode() + b"\xff\xfe,bad,row,PREP\n")
+        upload.name = "students.csv"
+        with mock.patch("students.views.BATCH_SIZE", 100):
+            response = self.client.post(reverse("students:student-import"), {"file": upload})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("error", response.data)
+        self.assertGreater(response.data["created"], 0)
+        self.assertEqual(response.data["created"], Student.objects.count())
+
+
+class MergeStudentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.shared = Group.objects.create(name="مشتركة", stage="PREP", capacity=2, schedule="4-6")
+        cls.only_remove = Group.objects.create(name="تانية", stage="PREP", capacity=5, schedule="6-8")
+        cls.full = Group.objects.create(name="مكتملة", stage="PREP", capacity=1, schedule="8-9")
+
+    def setUp(self):
+        self.keep = Student.objects.create(
+            full_name="محمد أحمد علي", email="mohamed@example.com", phone="01012345678", stage="PREP"
+        )
+        self.remove = Student.objects.create(
+            full_name="محمود احمد علي", email="mohamed@gmail.com", phone="01112345678", stage="PREP",
+            notes="مسجل مرتين",
+        )
+        self.waiter = Student.objects.create(
+            full_name="سارة", email="sara@example.com", phone="01099999999", stage="PREP"
+        )
+        self.filler = Student.objects.create(
+            full_name="منى", email="mona@example.com", phone="01088888888", stage="PREP"
+        )
+        reserve_seat(self.keep, self.shared.pk)
+        reserve_seat(self.remove, self.shared.pk)
+        join_waitlist(self.waiter, self.shared.pk)
+        reserve_seat(self.remove, self.only_remove.pk)
+        reserve_seat(self.filler, self.full.pk)
+        join_waitlist(self.remove, self.full.pk)
+
+    def counts(self):
+        return dict(Group.objects.values_list("name", "booked_count"))
+
+    def test_bookings_move_and_counters_stay_in_step(self):
+        result = merge_students(self.keep.pk, self.remove.pk)
+        self.assertEqual((result["moved_bookings"], result["dropped_bookings"]), (1, 1))
+        self.assertFalse(Student.objects.filter(pk=self.remove.pk).exists())
+        self.assertEqual(
+            set(Booking.objects.filter(student=self.keep).values_list("group_id", flat=True)),
+            {self.shared.pk, self.only_remove.pk},
+        )
+        # المقعد اللي اتفضى في المشتركة راح لأول المنتظرين
+        self.assertTrue(Booking.objects.filter(student=self.waiter, group=self.shared).exists())
+        self.assertEqual(self.counts(), {"مشتركة": 2, "تانية": 1, "مكتملة": 1})
+        for group in Group.objects.all():
+            self.assertEqual(group.booked_count, group.bookings.count())
+
+    def test_waitlist_place_and_missing_fields_move_to_keep(self):
+        merge_students(self.keep.pk, self.remove.pk)
+        self.assertEqual(WaitlistEntry.objects.get(group=self.full).student_id, self.keep.pk)
+        self.keep.refresh_from_db()
+        self.assertIn("مسجل مرتين", self.keep.notes)
+
+    def test_cannot_merge_with_itself(self):
+        with self.assertRaises(MergeError):
+            merge_students(self.keep.pk, self.keep.pk)
+
+    def test_find_duplicates_pairs_the_two_spellings(self):
+        pairs, stats = find_duplicates()
+        self.assertIn((self.keep.pk, self.remove.pk), [(a, b) for a, b, _, _ in pairs])
+        self.assertEqual(stats["students"], 4)
+
+
+class NormalizeArabicTests(SimpleTestCase):
+    def test_spellings_share_one_key(self):
+        for written, stored in (
+            ("احمد", "أحمد"), ("اسلام", "إسلام"), ("امال", "آمال"),  # الهمزات
+            ("فاطمه", "فاطمة"),  # التاء المربوطة
+            ("هدي", "هدى"),  # الألف المقصورة
+            ("مومن", "مؤمن"), ("هاني", "هانئ"),
+            ("محمد", "مُحَمَّد"), ("عبد الله", "عبـد   اللّه"),  # التشكيل والتطويل والمسافات
+        ):
+            self.assertEqual(normalize_arabic(written), normalize_arabic(stored), stored)
+
+    def test_arabic_digits_and_case(self):
+        self.assertEqual(normalize_arabic("٠١٠١٢٣٤٥٦٧٨"), "01012345678")
+        self.assertEqual(normalize_arabic("  Ahmed   ALI "), "ahmed ali")
+        self.assertEqual(normalize_arabic(None), "")
+
+
+class SearchKeyBackfillTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.student = Student.objects.create(
+            full_name="فاطمة الزهراء", email="f@example.com", phone="٠١٠١٢٣٤٥٦٧٨", stage="PREP"
+        )
+        self.group = Group.objects.create(name="مجموعة السبت أ", stage="PREP", capacity=5, schedule="4-6")
+
+    def test_save_computes_keys(self):
+        self.assertEqual(self.student.search_key, "فاطمه الزهراء")
+        self.assertIn("01012345678", self.student.search_document)
+        self.assertEqual(self.group.name_key, "مجموعه السبت ا")
+        self.assertEqual(
+            set(GroupNameWord.objects.filter(group=self.group).values_list("key", flat=True)),
+            {"مجموعه السبت ا", "السبت ا", "ا"},
+        )
+
+    def test_command_rebuilds_keys_and_drops_cached_views(self):
+        # كتابة جماعية من غير save() زي الـ import القديم
+        Student.objects.update(search_key="", search_document="")
+        Group.objects.update(name_key="")
+        GroupNameWord.objects.all().delete()
+        autocomplete.search("student", "فاطم", 10)
+        version = catalogue_version()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command("backfill_search_keys", batch_size=1, stdout=io.StringIO())
+
+        self.student.refresh_from_db()
+        self.group.refresh_from_db()
+        self.assertEqual(self.student.search_key, "فاطمه الزهراء")
+        self.assertEqual(self.group.name_key, "مجموعه السبت ا")
+        self.assertEqual(GroupNameWord.objects.filter(group=self.group).count(), 3)
+        self.assertIsNone(autocomplete.indexes)
+        self.assertNotEqual(catalogue_version(), version)
+
+
+@override_settings(AUTOCOMPLETE_SYNC_INTERVAL=0)
+class AutocompleteTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ahmed = Student.objects.create(
+            full_name="أحمد مصطفى", email="a@example.com", phone="01010000001", stage="PREP"
+        )
+        cls.mohamed = Student.objects.create(
+            full_name="محمد احمد", email="m@example.com", phone="01010000002", stage="PREP"
+        )
+        cls.group = Group.objects.create(name="مجموعة السبت", stage="PREP", capacity=5, schedule="4-6")
+        cls.admin = get_user_model().objects.create_superuser(
+            username="admin", email="admin@example.com", password="pass"
+        )
+
+    def setUp(self):
+        cache.clear()
+        autocomplete.invalidate()
+
+    def ids(self, text, kind="student", worker=autocomplete):
+        return {pk for pk, _ in worker.search(kind, text, 10)}
+
+    def test_matches_the_start_of_any_word(self):
+        self.assertEqual(self.ids("احم"), {self.ahmed.pk, self.mohamed.pk})
+        self.assertEqual(self.ids("مصطفي"), {self.ahmed.pk})
+        self.assertEqual(self.ids("حمد"), set())
+        self.assertEqual(self.ids("السب", "group"), {self.group.pk})
+        self.assertEqual(self.ids("سبت", "group"), set())
+
+    def test_endpoint_reads_from_memory(self):
+        self.client.force_authenticate(self.admin)
+        url = reverse("autocomplete")
+        self.client.get(url, {"q": "احمد"})
+        with self.assertNumQueries(0):
+            response = self.client.get(url, {"q": "مصطفى"})
+        self.assertEqual(response.data["results"], [{"id": self.ahmed.pk, "label": "أحمد مصطفى"}])
+
+    def test_add_rename_and_delete_are_recorded(self):
+        self.ids("")
+        with self.captureOnCommitCallbacks(execute=True):
+            sara = Student.objects.create(
+                full_name="سارة علي", email="s@example.com", phone="01010000003", stage="PREP"
+            )
+        self.assertEqual(self.ids("ساره"), {sara.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            sara.full_name = "سلمى علي"
+            sara.save()
+        self.assertEqual(self.ids("ساره"), set())
+        self.assertEqual(self.ids("سلمي"), {sara.pk})
+        with self.captureOnCommitCallbacks(execute=True):
+            sara.delete()
+        self.assertEqual(self.ids("علي"), set())
+
+    def test_other_worker_catches_up_from_the_cache(self):
+        worker = Autocomplete()
+        self.ids("", worker=worker)
+        autocomplete.record("student", self.ahmed.pk, "أحمد كمال", "احمد كمال")
+        autocomplete.record("group", self.group.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.ids("كمال", worker=worker), {self.ahmed.pk})
+            self.assertEqual(self.ids("مصطفي", worker=worker), set())
+            self.assertEqual(self.ids("مجموعه", "group", worker), set())
+
+    def test_invalidate_makes_every_worker_rebuild(self):
+        worker = Autocomplete()
+        self.ids("", worker=worker)
+        # كتابة جماعية من غير إشارات
+        Student.objects.filter(pk=self.ahmed.pk).update(full_name="أحمد كمال", search_key="احمد كمال")
+        autocomplete.invalidate()
+        with self.assertNumQueries(2):
+            self.assertEqual(self.ids("كمال", worker=worker), {self.ahmed.pk})
+
+    def test_worker_too_far_behind_rebuilds(self):
+        worker = Autocomplete()
+        self.ids("", worker=worker)
+        Student.objects.filter(pk=self.mohamed.pk).update(full_name="محمد كمال", search_key="محمد كمال")
+        with mock.patch("backend.autocomplete.MAX_REPLAY", 1):
+            autocomplete.record("group", self.group.pk)
+            autocomplete.record("group", self.group.pk, "مجموعة الأحد", "مجموعه الاحد")
+            # البناء من قاعدة البيانات هو اللي بيجيب التعديل اللي اتعمل من غير إشارات
+            with self.assertNumQueries(2):
+                self.assertEqual(self.ids("كمال", worker=worker), {self.mohamed.pk})
+
+
+class KeysetOrderingTests(SimpleTestCase):
+    def test_ties_are_broken_by_id_in_the_same_direction(self):
+        allowed = ("id", "created_at", "email")
+        self.assertEqual(keyset_ordering("email", allowed, ("-id",)), ("email", "id"))
+        self.assertEqual(keyset_ordering("-created_at", allowed, ("-id",)), ("-created_at", "-id"))
+        self.assertEqual(keyset_ordering("-id", allowed, ("-id",)), ("-id",))
+        self.assertEqual(keyset_ordering("notes", allowed, ("-created_at", "-id")), ("-created_at", "-id"))
+
+
+class StudentCursorPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        # create() مش bulk_create عشان مفاتيح البحث تتحسب في save()
+        for i in range(11):
+            Student.objects.create(
+                full_name=f"{'طالب' if i % 3 else 'منى'} {i}", email=f"s{i:02d}@example.com",
+                phone=f"0101{i:07d}", stage="PREP",
+            )
+        # نفس created_at للكل: الترتيب والمؤشر لازم يعتمدوا على id
+        Student.objects.update(created_at=timezone.now())
+
+    def walk(self, **params):
+        response = self.client.get(
+            reverse("students:student-list"), {"pagination": "cursor", "page_size": 3, **params}
+        )
+        ids = []
+        while True:
+            self.assertLessEqual(len(response.data["results"]), 3)
+            ids += [student["id"] for student in response.data["results"]]
+            if not response.data["next"]:
+                return ids
+            response = self.client.get(response.data["next"])
+
+    def test_every_row_once_with_equal_created_at(self):
+        students = Student.objects.values_list("id", flat=True)
+        self.assertEqual(self.walk(), list(students.order_by("-created_at", "-id")))
+        self.assertEqual(self.walk(ordering="created_at"), list(students.order_by("id")))
+
+    def test_walk_with_search(self):
+        expected = Student.objects.filter(full_name__startswith="طالب").order_by("-id")
+        self.assertEqual(self.walk(search="طالب"), list(expected.values_list("id", flat=True)))
+
+    def test_walk_by_email(self):
+        expected = Student.objects.order_by("-email").values_list("id", flat=True)
+        self.assertEqual(self.walk(ordering="-email"), list(expected))
+
+
+class StudentSearchTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        def create(name, phone, notes=""):
+            return Student.objects.create(
+                full_name=name, email=f"{phone}@example.com", phone=phone, stage="PREP", notes=notes
+            )
+
+        cls.other_word = create("محمد أحمد", "01010000001")
+        cls.in_notes = create("سارة", "01010000002", notes="أخت أحمد")
+        cls.starts_with = create("أحمد علي", "01010000003")
+        cls.exact = create("احمد", "01010000004")
+        cls.unrelated = create("منى", "01012345678")
+
+    def search(self, text):
+        response = self.client.get(reverse("students:student-list"), {"search": text})
+        return [student["id"] for student in response.data["results"]]
+
+    def assert_ranked(self, ids):
+        # الاسم بالظبط، بعده اللي بيبدأ بالبحث، بعده أي تطابق تاني
+        self.assertEqual(ids[:2], [self.exact.pk, self.starts_with.pk])
+        self.assertEqual(set(ids[2:]), {self.other_word.pk, self.in_notes.pk})
+
+    def test_best_matches_come_first(self):
+        self.assert_ranked(self.search("أحمد"))
+        self.assertEqual(self.search("0101234"), [self.unrelated.pk])
+        self.assertEqual(self.search("احمد عل"), [self.starts_with.pk])
+
+    def test_edited_and_deleted_students_are_reindexed(self):
+        self.in_notes.notes = "أخت منى"
+        self.in_notes.save()
+        self.other_word.delete()
+        self.assertEqual(self.search("أحمد"), [self.exact.pk, self.starts_with.pk])
+        self.assertEqual(self.search("اخت"), [self.in_notes.pk])
+
+    def test_like_fallback_returns_the_same_results(self):
+        with mock.patch("students.search._fts_available", return_value=False):
+            self.assert_ranked(self.search("أحمد"))
+            self.assertEqual(self.search("0101234"), [self.unrelated.pk])
+            self.assertEqual(self.search("احمد عل"), [self.starts_with.pk])
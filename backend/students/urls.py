@@ -6,5 +6,8 @@ app_name = "students"
 urlpatterns = [
     path("", views.student_list, name="student-list"),
     path("create/", views.student_create, name="student-create"),
+    path("import/", views.student_import, name="student-import"),
+    path("duplicates/", views.duplicate_list, name="duplicate-list"),
+    path("merge/", views.student_merge, name="student-merge"),
     path("<int:pk>/", views.student_detail, name="student-detail"),
 ]
@@ -1,29 +1,45 @@
+from django.db.models import Count
 from django.shortcuts import get_object_or_404
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework import status, permissions
 from rest_framework.pagination import PageNumberPagination
-from django.db.models import Q
-from .models import Student
-from .serializers import StudentSerializer
+from .models import DuplicateCandidate, Student
+from .duplicates import MergeError, merge_students
+from .search import search_students
+from .importer import import_students, ImportFileError, BATCH_SIZE
+from .serializers import (
+    DuplicateCandidateSerializer,
+    MergeStudentsSerializer,
+    StudentSerializer,
+)
+from backend.pagination import KeysetPagination, cursor_requested, keyset_ordering
+
+# الحقول اللي ينفع الـ cursor يرتب بيها (كلها unique أو عليها فهرس)
+CURSOR_ORDERING_FIELDS = ("id", "created_at", "email", "phone")
 
 # List Students (with search, ordering, pagination)
 @api_view(["GET"])
 @permission_classes([permissions.IsAuthenticatedOrReadOnly])
 def student_list(request):
     students = Student.objects.all()
+    ranked = False
     search = request.query_params.get("search")
     if search:
-        students = students.filter(
-            Q(full_name__icontains=search) |
-            Q(email__icontains=search) |
-            Q(phone__icontains=search) |
-            Q(notes__icontains=search)
-            )
+        # فهرس بحث (students/search.py) بدل icontains على الاسم والإيميل والموبايل والملاحظات
+        students, ranked = search_students(students, search)
     ordering = request.query_params.get("ordering")
-    if ordering:
-        students = students.order_by(ordering)
-    paginator = PageNumberPagination()
+    if cursor_requested(request):
+        paginator = KeysetPagination(
+            ordering=keyset_ordering(ordering, CURSOR_ORDERING_FIELDS, ("-created_at", "-id"))
+        )
+    else:
+        if ordering:
+            students = students.order_by(ordering)
+        elif ranked:
+            # الأنسب الأول
+            students = students.order_by("name_match", "search_rank", "-id")
+        paginator = PageNumberPagination()
     paginated_students = paginator.paginate_queryset(students, request)
     serializer = StudentSerializer(paginated_students, many=True)
     return paginator.get_paginated_response(serializer.data)
@@ -65,4 +81,63 @@ def student_detail(request, pk):
     elif request.method == "DELETE":
         student.delete()
         return Response({"message": "تم حذف الطالب بنجاح"}, status=status.HTTP_204_NO_CONTENT)
-    
\ No newline at end of file
+
+
+# Bulk import (CSV / XLSX)
+@api_view(["POST"])
+@permission_classes([permissions.IsAdminUser])
+def student_import(request):
+    """
+    استيراد طلاب من ملف (multipart: file=students.csv أو .xlsx)
+    الأعمدة: full_name, email, phone, stage + (birth_date, notes) اختياري، أو أسماءها بالعربي
+    ?dry_run=true للتحقق بس من غير حفظ
+    """
+    upload = request.FILES.get("file")
+    if upload is None:
+        return Response({"error": "ارفع الملف في الحقل file"}, status=status.HTTP_400_BAD_REQUEST)
+    if not upload.name.lower().endswith((".csv", ".xlsx")):
+        return Response({"error": "الملف لازم يكون CSV أو XLSX"}, status=status.HTTP_400_BAD_REQUEST)
+
+    dry_run = request.query_params.get("dry_run", "").lower() in ("1", "true", "yes")
+    try:
+        report = import_students(upload.file, upload.name, batch_size=BATCH_SIZE, dry_run=dry_run)
+    except ImportFileError as e:
+        # الدفعات اللي قبل الخطأ اتحفظت فعلًا، فالرد بيقول اتحفظ كام
+        return Response({"error": e.message, **(e.report or {})}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(report, status=status.HTTP_200_OK)
+
+
+# Duplicate students report + merge
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def duplicate_list(request):
+    """
+    الأزواج المشتبه إنهم نفس الطالب، الأعلى score الأول.
+    التقرير بيتحسب بـ python manage.py find_duplicates
+    """
+    candidates = DuplicateCandidate.objects.select_related("student", "other")
+    paginator = PageNumberPagination()
+    page = paginator.paginate_queryset(candidates, request)
+    ids = {pk for candidate in page for pk in (candidate.student_id, candidate.other_id)}
+    booking_counts = dict(
+        Student.objects.filter(pk__in=ids).annotate(n=Count("bookings")).values_list("pk", "n")
+    )
+    serializer = DuplicateCandidateSerializer(page, many=True, context={"booking_counts": booking_counts})
+    return paginator.get_paginated_response(serializer.data)
+
+
+@api_view(["POST"])
+@permission_classes([permissions.IsAdminUser])
+def student_merge(request):
+    """
+    دمج طالب مكرر في طالب تاني: {"keep": id, "remove": id}
+    حجوزات وقوائم انتظار remove بتتنقل لـ keep وبعدين remove بيتحذف
+    """
+    serializer = MergeStudentsSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        result = merge_students(serializer.validated_data["keep"], serializer.validated_data["remove"])
+    except MergeError as e:
+        return Response({"error": e.message}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(result, status=status.HTTP_200_OK)
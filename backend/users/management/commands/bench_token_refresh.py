@@ -0,0 +1,59 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework_simplejwt.exceptions import TokenError
+
+from backend.authentication import token_for_user
+from users.models import User
+from users.serializers import RotatingTokenRefreshSerializer
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark the refresh pipeline: rotate N active sessions for a few rounds, "
+        "then replay the rotated-out tokens. Writes real RevokedToken rows (they expire "
+        "with REFRESH_TOKEN_LIFETIME); run it against a development database."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sessions", type=int, default=10000)
+        parser.add_argument("--rounds", type=int, default=3)
+        parser.add_argument("--users", type=int, default=100, help="Spread sessions over this many users")
+
+    def handle(self, *args, **options):
+        users = list(User.objects.filter(is_active=True).order_by("pk")[: options["users"]])
+        if not users:
+            raise CommandError("Create at least one active user first")
+
+        sessions = [str(token_for_user(users[i % len(users)])) for i in range(options["sessions"])]
+        replays = []
+        for round_number in range(1, options["rounds"] + 1):
+            random.shuffle(sessions)
+            started = time.perf_counter()
+            rotated = []
+            for token in sessions:
+                serializer = RotatingTokenRefreshSerializer(data={"refresh": token})
+                serializer.is_valid(raise_exception=True)
+                rotated.append(serializer.validated_data["refresh"])
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"round {round_number}: {len(sessions)} refreshes in {elapsed:.2f}s "
+                f"({len(sessions) / elapsed:.0f}/s)"
+            )
+            replays.extend(sessions)
+            sessions = rotated
+
+        sample = random.sample(replays, min(len(replays), len(sessions)))
+        started = time.perf_counter()
+        rejected = 0
+        for token in sample:
+            try:
+                RotatingTokenRefreshSerializer(data={"refresh": token}).is_valid(raise_exception=True)
+            except TokenError:
+                rejected += 1
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"replay: {rejected}/{len(sample)} reused tokens rejected in {elapsed:.2f}s "
+            f"({len(sample) / elapsed:.0f}/s)"
+        )
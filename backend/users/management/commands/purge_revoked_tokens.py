@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from users.models import RevokedToken
+from users.tokens import PURGE_BATCH_SIZE, purge_expired
+
+
+class Command(BaseCommand):
+    help = "Delete expired RevokedToken rows in batches (schedule it every few minutes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=PURGE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(RevokedToken, options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Purged {deleted} expired revoked token(s)"))
@@ -25,3 +25,24 @@ class User(AbstractUser):
 
     def __str__(self):
         return self.username
+
+
+class RevokedToken(models.Model):
+    """refresh tokens اتستخدمت أو اتلغت (users/tokens.py). الصف بيتحذف بعد expires_at"""
+    # الـ unique هو نفسه الفحص: insert بيفشل لو التوكن اتستخدم قبل كده
+    jti = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return self.jti
+
+
+class PasswordResetToken(models.Model):
+    """رابط نسيان كلمة المرور. بنخزن sha256 للرمز بس، والرمز نفسه في الإيميل"""
+    user = models.ForeignKey("users.User", on_delete=models.CASCADE, related_name="password_reset_tokens")
+    token_hash = models.CharField(max_length=64, unique=True)
+    expires_at = models.DateTimeField(db_index=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.user_id} ({self.expires_at:%Y-%m-%d %H:%M})"
@@ -1,6 +1,16 @@
 from rest_framework import serializers
 from django.contrib.auth.hashers import make_password   
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from backend.authentication import STUDENT_CLAIM, cached_user, student_id_of
+from bookings.models import Booking, WaitlistEntry
+from groups.models import Group
+from students.models import Student
 from .models import User
+from .tokens import is_revoked, revoke
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -22,5 +32,74 @@ class UserSerializer(serializers.ModelSerializer):
         if 'password' in validated_data:
             validated_data['password'] = make_password(validated_data['password'])
         return super().update(instance, validated_data)
-    
-    
+
+
+class StudentTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """login: التوكن بيحمل student_id عشان CachedJWTAuthentication والـ frontend"""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token[STUDENT_CLAIM] = Student.objects.filter(user=user).values_list("pk", flat=True).first()
+        return token
+
+
+class RotatingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    refresh مع تدوير: التوكن القديم بيتسجل في RevokedToken (insert واحد هو
+    نفسه الفحص، users/tokens.py) والمستخدم من cache المصادقة بدل استعلام
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+
+        user_id = refresh.payload.get(api_settings.USER_ID_CLAIM, None)
+        if user_id:
+            try:
+                user = cached_user(user_id)
+            except User.DoesNotExist:
+                user = None
+            if not api_settings.USER_AUTHENTICATION_RULE(user):
+                raise AuthenticationFailed(self.error_messages["no_active_account"], "no_active_account")
+
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            if not revoke(refresh):
+                raise TokenError(_("Token is blacklisted"))
+        elif is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+        if user_id:
+            # لو الحساب اتربط بطالب بعد الـ login
+            refresh[STUDENT_CLAIM] = student_id_of(user)
+        data = {"access": str(refresh.access_token)}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            refresh.set_jti()
+            refresh.set_exp()
+            refresh.set_iat()
+            data["refresh"] = str(refresh)
+        return data
+
+
+class DashboardGroupSerializer(serializers.ModelSerializer):
+    seats_left = serializers.IntegerField(read_only=True)
+    is_full = serializers.BooleanField(read_only=True)
+
+    class Meta:
+        model = Group
+        fields = ["id", "name", "stage", "schedule", "days", "opens_at", "capacity", "seats_left", "is_full"]
+
+
+class DashboardBookingSerializer(serializers.ModelSerializer):
+    group = DashboardGroupSerializer(read_only=True)
+
+    class Meta:
+        model = Booking
+        fields = ["id", "group", "created_at"]
+
+
+class DashboardWaitlistSerializer(serializers.ModelSerializer):
+    group = DashboardGroupSerializer(read_only=True)
+
+    class Meta:
+        model = WaitlistEntry
+        fields = ["id", "group", "position", "created_at"]
@@ -0,0 +1,32 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from backend.authentication import invalidate_principal
+from students.models import Student
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user_principal(sender, instance, **kwargs):
+    # قبل وبعد الـ commit: طلب متزامن ممكن يكون خزّن النسخة القديمة في النص
+    invalidate_principal(instance.pk)
+    transaction.on_commit(lambda: invalidate_principal(instance.pk))
+
+
+@receiver(pre_save, sender=Student)
+def remember_student_user(sender, instance, update_fields=None, **kwargs):
+    # لو الطالب اتنقل لحساب تاني لازم نمسح الحساب القديم كمان
+    if instance.pk and (update_fields is None or "user" in update_fields):
+        instance._previous_user_id = (
+            Student.objects.filter(pk=instance.pk).values_list("user_id", flat=True).first()
+        )
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def invalidate_student_principal(sender, instance, **kwargs):
+    user_ids = {instance.user_id, getattr(instance, "_previous_user_id", None)} - {None}
+    for user_id in user_ids:
+        invalidate_principal(user_id)
+    transaction.on_commit(lambda: [invalidate_principal(user_id) for user_id in user_ids])
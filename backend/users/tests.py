@@ -1,3 +1,170 @@
-from django.test import TestCase
+from datetime import timedelta
+from django.core.cache import cache
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from backend.authentication import principal_key, token_for_user
+from bookings.services import join_waitlist, release_seat, reserve_seat
+from groups.models import Group
+from notifications.models import OutboundEmail
+from students.models import Student
+from .models import PasswordResetToken, RevokedToken, User
+from .tokens import RESET_TOKEN_LENGTH, issue_reset_token, revoked_jtis
 
-# Create your tests here.
+
+class CachedPrincipalTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="student", email="student@example.com", password="pass")
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_for_user(self.user).access_token}")
+
+    def test_warm_request_skips_auth_queries(self):
+        self.client.get(reverse("users:me"))
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("users:me"))
+        self.assertEqual(response.data["username"], "student")
+
+    def test_saving_the_user_drops_the_cached_principal(self):
+        self.client.get(reverse("users:me"))
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(cache.get(principal_key(self.user.pk)))
+        self.assertEqual(self.client.get(reverse("users:me")).status_code, 401)
+
+    def test_linking_a_student_drops_the_cached_principal(self):
+        self.client.get(reverse("dashboard"))
+        student = Student.objects.create(
+            user=self.user, full_name="طالب", email="s@example.com", phone="01012345678", stage="PREP"
+        )
+        self.assertIsNone(cache.get(principal_key(self.user.pk)))
+        self.assertEqual(self.client.get(reverse("dashboard")).data["student"]["id"], student.pk)
+
+
+class RefreshRotationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="student", email="student@example.com", password="pass")
+
+    def setUp(self):
+        cache.clear()
+        revoked_jtis.clear()
+        self.refresh = str(token_for_user(self.user))
+
+    def refresh_with(self, token):
+        return self.client.post(reverse("users:token_refresh"), {"refresh": token}, format="json")
+
+    def test_refresh_rotates_and_old_token_is_rejected(self):
+        response = self.refresh_with(self.refresh)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.data["refresh"], self.refresh)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+        self.assertEqual(self.refresh_with(response.data["refresh"]).status_code, 200)
+
+    def test_reuse_is_rejected_without_the_in_memory_cache(self):
+        # worker تاني (LRU فاضي): القيد unique في RevokedToken هو اللي بيرفض
+        self.refresh_with(self.refresh)
+        revoked_jtis.clear()
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+        self.assertEqual(RevokedToken.objects.count(), 1)
+
+    def test_logout_revokes_the_refresh_token(self):
+        response = self.client.post(reverse("users:logout"), {"refresh": self.refresh}, format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.refresh_with(self.refresh).status_code, 401)
+
+
+class PasswordResetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="student", email="student@example.com", password="old-pass")
+
+    def setUp(self):
+        cache.clear()
+
+    def reset(self, token, password="N3w-secure-pass"):
+        return self.client.post(
+            reverse("users:reset-password"), {"token": token, "password": password}, format="json"
+        )
+
+    def test_forgot_password_queues_link_and_stores_only_the_hash(self):
+        response = self.client.post(
+            reverse("users:forgot-password"), {"email": "student@example.com"}, format="json"
+        )
+        self.assertEqual(response.status_code, 200)
+        email = OutboundEmail.objects.get(to="student@example.com")
+        token = email.body.split("/reset-password/", 1)[1][:RESET_TOKEN_LENGTH]
+        self.assertNotEqual(PasswordResetToken.objects.get(user=self.user).token_hash, token)
+        self.assertEqual(self.reset(token).status_code, 200)
+
+    def test_token_works_once(self):
+        token = issue_reset_token(self.user)
+        self.assertEqual(self.reset(token).status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("N3w-secure-pass"))
+        self.assertEqual(self.reset(token, "An0ther-secure-pass").status_code, 400)
+        self.assertFalse(PasswordResetToken.objects.exists())
+
+    def test_expired_token_is_rejected(self):
+        token = issue_reset_token(self.user)
+        PasswordResetToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        self.assertEqual(self.reset(token).status_code, 400)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password("old-pass"))
+
+    def test_new_link_cancels_the_previous_one(self):
+        old = issue_reset_token(self.user)
+        new = issue_reset_token(self.user)
+        self.assertEqual(self.reset(old).status_code, 400)
+        self.assertEqual(self.reset(new).status_code, 200)
+
+    def test_rejected_password_keeps_the_link_valid(self):
+        token = issue_reset_token(self.user)
+        self.assertEqual(self.reset(token, "123").status_code, 400)
+        self.assertEqual(self.reset(token).status_code, 200)
+
+
+class DashboardTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="student", email="student@example.com", password="pass")
+        cls.student = Student.objects.create(
+            user=cls.user, full_name="طالب", email="s@example.com", phone="01012345678", stage="PREP"
+        )
+        cls.groups = Group.objects.bulk_create(
+            Group(name=f"مجموعة {i}", stage="PREP", capacity=5, schedule=f"{i + 1}-{i + 2} م", days="السبت")
+            for i in range(3)
+        )
+        cls.full = Group.objects.create(name="مكتملة", stage="PREP", capacity=0, schedule="8-9 م")
+        cls.bookings = [reserve_seat(cls.student, group.pk) for group in cls.groups]
+        join_waitlist(cls.student, cls.full.pk)
+
+    def setUp(self):
+        cache.clear()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token_for_user(self.user).access_token}")
+        self.url = reverse("dashboard")
+
+    def test_two_queries_whatever_the_number_of_bookings(self):
+        self.client.get(self.url)
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url)
+        self.assertEqual(len(response.data["bookings"]), 3)
+        self.assertEqual(len(response.data["waitlist"]), 1)
+        self.assertEqual(response.data["student"]["id"], self.student.pk)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH='"other"').status_code, 200)
+
+    def test_etag_changes_when_a_booking_changes(self):
+        etag = self.client.get(self.url)["ETag"]
+        release_seat(self.bookings[0])
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["bookings"]), 2)
@@ -0,0 +1,137 @@
+"""
+تدوير refresh tokens مع قائمة سودا سريعة.
+
+ROTATE_REFRESH_TOKENS وBLACKLIST_AFTER_ROTATION مفعلين، بس من غير تطبيق
+token_blacklist التوكن القديم كان بيفضل صالح. الـ refresh بيحصل كل دقيقة لكل
+عميل، فمينفعش يبقى قراءة + كتابة في كل مرة:
+  - التوكن اللي بيتستخدم بيتسجل في RevokedToken بـ INSERT واحد، والقيد
+    unique على jti هو الفحص نفسه: لو الـ insert فشل يبقى التوكن اتستخدم قبل
+    كده (حتى لو طلبين متزامنين بنفس التوكن واحد بس هيعدي).
+  - قدامه LRU في ذاكرة كل worker بآخر REVOKED_TOKEN_LRU_SIZE توكن اتلغى،
+    فإعادة استخدام توكن قديم بتترفض من غير قاعدة بيانات غالبًا.
+  - المستخدم بيتجاب من cache المصادقة (backend/authentication.py).
+الصفوف المنتهية بتتمسح بـ purge_revoked_tokens.
+
+رموز نسيان كلمة المرور (PasswordResetToken) هنا كمان: بنخزن sha256 للرمز
+بس، فلو الجدول اتسرب الروابط مش هتشتغل، والبحث بالـ hash بفهرس unique.
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import PasswordResetToken, RevokedToken
+
+PURGE_BATCH_SIZE = 5000
+RESET_TOKEN_LENGTH = 32
+RESET_TOKEN_LIFETIME = timedelta(hours=1)
+
+
+class RevokedJtiCache:
+    """LRU محدود: jti -> وقت الانتهاء (timestamp)"""
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self.items = OrderedDict()
+        self.lock = threading.Lock()
+
+    def add(self, jti, exp):
+        with self.lock:
+            self.items[jti] = exp
+            self.items.move_to_end(jti)
+            while len(self.items) > self.maxsize:
+                self.items.popitem(last=False)
+
+    def __contains__(self, jti):
+        with self.lock:
+            exp = self.items.get(jti)
+            if exp is None:
+                return False
+            if exp < timezone.now().timestamp():
+                # التوكن انتهى أصلًا فالتوقيع نفسه هيرفضه
+                del self.items[jti]
+                return False
+            self.items.move_to_end(jti)
+            return True
+
+    def clear(self):
+        with self.lock:
+            self.items.clear()
+
+
+revoked_jtis = RevokedJtiCache(settings.REVOKED_TOKEN_LRU_SIZE)
+
+
+def revoke(token):
+    """يسجل التوكن كمستخدم. ترجع False لو كان متسجل قبل كده"""
+    jti, exp = token[api_settings.JTI_CLAIM], token["exp"]
+    if jti in revoked_jtis:
+        return False
+    try:
+        with transaction.atomic():
+            if connection.vendor == "postgresql":
+                # من غير انتظار fsync: لو السيرفر وقع نخسر آخر كام إلغاء بس، والتوكن عمره دقايق
+                with connection.cursor() as cursor:
+                    cursor.execute("SET LOCAL synchronous_commit TO OFF")
+            RevokedToken.objects.create(
+                jti=jti, expires_at=datetime.fromtimestamp(exp, tz=dt_timezone.utc)
+            )
+        return True
+    except IntegrityError:
+        return False
+    finally:
+        revoked_jtis.add(jti, exp)
+
+
+def is_revoked(jti):
+    return jti in revoked_jtis or RevokedToken.objects.filter(jti=jti).exists()
+
+
+def hash_reset_token(raw):
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def issue_reset_token(user):
+    """رمز جديد لنسيان كلمة المرور؛ الروابط القديمة للمستخدم بتتلغي. بيرجع الرمز نفسه"""
+    raw = get_random_string(RESET_TOKEN_LENGTH)
+    with transaction.atomic():
+        PasswordResetToken.objects.filter(user=user).delete()
+        PasswordResetToken.objects.create(
+            user=user, token_hash=hash_reset_token(raw), expires_at=timezone.now() + RESET_TOKEN_LIFETIME
+        )
+    return raw
+
+
+def consume_reset_token(raw):
+    """
+    المستخدم صاحب الرمز أو None. قراءة واحدة بالفهرس على token_hash، وبعدها
+    حذف الصف هو اللي بيحجز الرمز: لو طلبين بنفس الرابط واحد بس هيحذف صف.
+    لازم تتنادي جوه transaction.atomic() عشان الحذف يرجع لو الباقي فشل.
+    """
+    if not raw or len(raw) != RESET_TOKEN_LENGTH:
+        return None
+    token = (
+        PasswordResetToken.objects.select_related("user")
+        .filter(token_hash=hash_reset_token(raw), expires_at__gt=timezone.now())
+        .first()
+    )
+    if token is None or not PasswordResetToken.objects.filter(pk=token.pk).delete()[0]:
+        return None
+    return token.user
+
+
+def purge_expired(model, batch_size=PURGE_BATCH_SIZE):
+    """حذف الصفوف المنتهية (expires_at) على دفعات بالـ pk عشان ميبقاش فيه قفل طويل"""
+    now = timezone.now()
+    deleted = 0
+    while True:
+        ids = list(model.objects.filter(expires_at__lt=now).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += model.objects.filter(pk__in=ids).delete()[0]
@@ -1,13 +1,15 @@
 from django.urls import path
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
-from .views import register_user, list_users, user_detail, me, forgot_password, reset_password
+from backend.throttling import LoginThrottle
+from .views import register_user, list_users, user_detail, me, logout, forgot_password, reset_password
 
 app_name = "users"
 
 urlpatterns = [
     path("register/", register_user, name="register"),
-    path("login/", TokenObtainPairView.as_view(), name="login"),
+    path("login/", TokenObtainPairView.as_view(throttle_classes=[LoginThrottle]), name="login"),
     path("refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path("logout/", logout, name="logout"),
     path("me/", me, name="me"),
     path("forgot-password/", forgot_password, name="forgot-password"),
     path("reset-password/", reset_password, name="reset-password"),
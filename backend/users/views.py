@@ -1,22 +1,31 @@
 from rest_framework import status, permissions
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.response import Response
 from rest_framework.pagination import PageNumberPagination
 from django.shortcuts import get_object_or_404
-from django.core.mail import send_mail
-from django.conf import settings
-from django.utils.crypto import get_random_string
-from django.utils import timezone
-from datetime import timedelta
-from .serializers import UserSerializer
-from .models import User
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from .serializers import UserSerializer, DashboardBookingSerializer, DashboardWaitlistSerializer
+from bookings.models import Booking, WaitlistEntry
+from students.serializers import StudentSerializer
+from .models import PasswordResetToken, User
+from backend.pagination import KeysetPagination, cursor_requested
+from backend.throttling import RegisterThrottle
+from backend.authentication import token_for_user
+from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework_simplejwt.tokens import RefreshToken
+from .tokens import consume_reset_token, issue_reset_token, revoke
+from notifications.outbox import enqueue_email
+import hashlib
 import json
+from django.core.serializers.json import DjangoJSONEncoder
 
 
 # تسجيل مستخدم جديد (Public)
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
+@throttle_classes([RegisterThrottle])
 def register_user(request):
     serializer = UserSerializer(data=request.data)
     if serializer.is_valid():
@@ -27,7 +36,7 @@ def register_user(request):
         data.pop("password", None)
 
         # convenience: نرجع التوكن مع التسجيل
-        refresh = RefreshToken.for_user(user)
+        refresh = token_for_user(user)
         data["access"] = str(refresh.access_token)
         data["refresh"] = str(refresh)
 
@@ -39,8 +48,12 @@ def register_user(request):
 @api_view(['GET'])
 @permission_classes([permissions.IsAdminUser])
 def list_users(request):
-    users = User.objects.all().order_by("id")
-    paginator = PageNumberPagination()
+    users = User.objects.all()
+    if cursor_requested(request):
+        paginator = KeysetPagination(ordering="id")
+    else:
+        users = users.order_by("id")
+        paginator = PageNumberPagination()
     result_page = paginator.paginate_queryset(users, request)
     serializer = UserSerializer(result_page, many=True)
 
@@ -67,6 +80,18 @@ def user_detail(request, pk):
         return Response({"message": "User deleted successfully"}, status=status.HTTP_204_NO_CONTENT)
     
 
+# تسجيل الخروج: إلغاء الـ refresh token (Public)
+@api_view(['POST'])
+@permission_classes([permissions.AllowAny])
+def logout(request):
+    try:
+        refresh = RefreshToken(request.data.get('refresh', ''))
+    except TokenError:
+        return Response({"error": "رمز التحديث غير صالح"}, status=status.HTTP_400_BAD_REQUEST)
+    revoke(refresh)
+    return Response({"message": "تم تسجيل الخروج"}, status=status.HTTP_200_OK)
+
+
 # بروفايل المستخدم الحالي (Authenticated)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
@@ -75,6 +100,42 @@ def me(request):
     return Response(serializer.data)
 
 
+def dashboard_etag(data):
+    raw = json.dumps(data, sort_keys=True, cls=DjangoJSONEncoder)
+    return '"%s"' % hashlib.sha1(raw.encode()).hexdigest()
+
+
+# الشاشة الرئيسية للطالب في طلب واحد (Authenticated)
+@api_view(['GET'])
+@permission_classes([permissions.IsAuthenticated])
+def dashboard(request):
+    """
+    المستخدم + بروفايل الطالب + حجوزاته وقوائم انتظاره ومعاها بيانات المجموعة
+    والمقاعد الفاضية، بدل /users/me/ ثم /bookings/ ثم group_detail لكل مجموعة.
+    استعلامين ثابتين (الحجوزات، الانتظار) مهما كان عدد الحجوزات: الطالب جاي مع
+    المستخدم من CachedJWTAuthentication (select_related).
+    بيرجع ETag، ولو If-None-Match مطابق الرد 304 من غير body.
+    """
+    student = getattr(request.user, 'student', None)
+    bookings = waitlist = []
+    if student is not None:
+        bookings = Booking.objects.filter(student=student).select_related('group').order_by('created_at', 'id')
+        waitlist = WaitlistEntry.objects.filter(student=student).select_related('group').order_by('created_at', 'id')
+
+    data = {
+        "user": UserSerializer(request.user).data,
+        "student": StudentSerializer(student).data if student else None,
+        "bookings": DashboardBookingSerializer(bookings, many=True).data,
+        "waitlist": DashboardWaitlistSerializer(waitlist, many=True).data,
+    }
+    etag = dashboard_etag(data)
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if_none_match = request.headers.get("If-None-Match", "")
+    if etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]:
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(data, headers=headers)
+
+
 # نسيان كلمة المرور (Public)
 @api_view(['POST'])
 @permission_classes([permissions.AllowAny])
@@ -96,25 +157,16 @@ def forgot_password(request):
             status=status.HTTP_200_OK
         )
     
-    # إنشاء رمز إعادة تعيين
-    reset_token = get_random_string(32)
-    reset_expires = timezone.now() + timedelta(hours=1)  # صالح لمدة ساعة
-    
-    # حفظ الرمز في قاعدة البيانات (يمكن استخدام Redis أو جدول منفصل)
-    # لا نعطل كلمة المرور هنا، فقط نرسل الرابط
-    # user.set_unusable_password()  # تعطيل كلمة المرور مؤقتاً
-    # user.save()
-    
-    # في التطبيق الحقيقي، احفظ reset_token في جدول منفصل
-    # هنا سنستخدم session أو cache مؤقت
-    
-    # إرسال البريد الإلكتروني
-    reset_url = f"http://localhost:3000/reset-password/{reset_token}"
-    
-    try:
-        send_mail(
+    # إنشاء رمز إعادة تعيين (بنخزن الـ hash بس، صالح لمدة ساعة)
+    with transaction.atomic():
+        reset_token = issue_reset_token(user)
+        reset_url = f"http://localhost:3000/reset-password/{reset_token}"
+
+        # الإيميل بيتسجل في الـ outbox والإرسال نفسه في run_outbox، فبطء SMTP مش بيأثر على الطلب
+        enqueue_email(
+            to=user.email,
             subject='إعادة تعيين كلمة المرور - منصة الدروس',
-            message=f'''
+            body=f'''
             مرحباً {user.username},
             
             تلقينا طلباً لإعادة تعيين كلمة المرور الخاصة بحسابك.
@@ -128,22 +180,13 @@ def forgot_password(request):
             
             مع تحيات فريق منصة الدروس
             ''',
-            from_email=settings.DEFAULT_FROM_EMAIL,
-            recipient_list=[email],
-            fail_silently=False,
-        )
-        
-        return Response(
-            {"detail": "تم إرسال رابط إعادة تعيين كلمة المرور إلى بريدك الإلكتروني"}, 
-            status=status.HTTP_200_OK
-        )
-        
-    except Exception as e:
-        return Response(
-            {"detail": "حدث خطأ أثناء إرسال البريد الإلكتروني"}, 
-            status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+    return Response(
+        {"detail": "تم إرسال رابط إعادة تعيين كلمة المرور إلى بريدك الإلكتروني"}, 
+        status=status.HTTP_200_OK
+    )
+
 
 # إعادة تعيين كلمة المرور (Public)
 @api_view(['POST'])
@@ -158,36 +201,27 @@ def reset_password(request):
             status=status.HTTP_400_BAD_REQUEST
         )
     
-    # في التطبيق الحقيقي، تحقق من صحة الرمز من قاعدة البيانات
-    # هنا سنقوم بتحقق بسيط
-    
-    if len(token) != 32:
-        return Response(
-            {"detail": "رمز إعادة التعيين غير صالح"}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
-    
-    # البحث عن المستخدم (في التطبيق الحقيقي، ابحث باستخدام الرمز)
-    # هنا سنستخدم email من الطلب أو طريقة أخرى
-    email = request.data.get('email')
-    
-    if email:
-        try:
-            user = User.objects.get(email=email)
-            user.set_password(password)
-            user.save()
-            
-            return Response(
-                {"detail": "تم إعادة تعيين كلمة المرور بنجاح"}, 
-                status=status.HTTP_200_OK
-            )
-        except User.DoesNotExist:
+    with transaction.atomic():
+        # استعلام واحد بالفهرس على hash الرمز، والحذف بيلغي الرابط
+        user = consume_reset_token(token)
+        if user is None:
             return Response(
-                {"detail": "المستخدم غير موجود"}, 
+                {"detail": "رمز إعادة التعيين غير صالح أو منتهي"}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
-    else:
-        return Response(
-            {"detail": "البريد الإلكتروني مطلوب لإعادة تعيين كلمة المرور"}, 
-            status=status.HTTP_400_BAD_REQUEST
-        )
\ No newline at end of file
+        try:
+            validate_password(password, user)
+        except ValidationError as e:
+            # الرابط يفضل صالح لحد ما يكتب كلمة مرور مقبولة
+            transaction.set_rollback(True)
+            return Response({"detail": " ".join(e.messages)}, status=status.HTTP_400_BAD_REQUEST)
+
+        user.set_password(password)
+        user.save(update_fields=["password"])
+        # أي روابط تانية لنفس الحساب
+        PasswordResetToken.objects.filter(user=user).delete()
+
+    return Response(
+        {"detail": "تم إعادة تعيين كلمة المرور بنجاح"}, 
+        status=status.HTTP_200_OK
+    )
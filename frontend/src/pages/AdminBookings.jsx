@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Link } from 'react-router-dom';
-import api from '../services/api';
+import api, { getAllPages } from '../services/api';
 import Toast from '../components/Toast';
 import Modal from '../components/Modal';
 
@@ -25,7 +25,7 @@ function AdminBookings() {
     try {
       setLoading(true);
       const [bookingsRes, groupsRes, studentsRes] = await Promise.all([
-        api.get('bookings/admin/'),
+        getAllPages('bookings/admin/'),
         api.get('groups/'),
         api.get('students/')
       ]);
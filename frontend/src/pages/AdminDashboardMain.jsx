@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../services/api';
+import api, { getAllPages } from '../services/api';
 import Toast from '../components/Toast';
 
 function AdminDashboardMain() {
@@ -25,7 +25,7 @@ function AdminDashboardMain() {
       const [groupsRes, studentsRes, bookingsRes] = await Promise.all([
         api.get('groups/'),
         api.get('students/'),
-        api.get('bookings/admin/')
+        getAllPages('bookings/admin/')
       ]);
 
       const groups = groupsRes.data.results || groupsRes.data;
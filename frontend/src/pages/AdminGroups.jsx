@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import api from '../services/api';
+import api, { getAllPages } from '../services/api';
 import Toast from '../components/Toast';
 import Modal from '../components/Modal';
 
@@ -30,7 +30,7 @@ function AdminGroups() {
       setLoading(true);
       const [groupsRes, bookingsRes] = await Promise.all([
         api.get('groups/'),
-        api.get('bookings/admin/')
+        getAllPages('bookings/admin/')
       ]);
       
       setGroups(groupsRes.data.results || groupsRes.data);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { useNavigate } from 'react-router-dom';
-import api from '../services/api';
+import api, { getAllPages } from '../services/api';
 import Toast from '../components/Toast';
 
 function AdminSettings() {
@@ -35,7 +35,7 @@ function AdminSettings() {
       const [groupsRes, studentsRes, bookingsRes, usersRes] = await Promise.all([
         api.get('groups/'),
         api.get('students/'),
-        api.get('bookings/admin/'),
+        getAllPages('bookings/admin/'),
         api.get('users/me/') // For demo, we'll use current user
       ]);
 
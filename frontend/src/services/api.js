@@ -51,4 +51,21 @@ api.interceptors.response.use(
     }
 );
 
+// بيمشي على next لحد آخر صفحة ويرجع كل النتايج في data زي الـ endpoints اللي من غير صفحات
+export async function getAllPages(url, config = {}) {
+    let response = await api.get(url, {
+        ...config,
+        params: { page_size: 100, ...config.params },
+    });
+    if (!Array.isArray(response.data?.results)) {
+        return response;
+    }
+    const results = [...response.data.results];
+    while (response.data.next) {
+        response = await api.get(response.data.next);
+        results.push(...response.data.results);
+    }
+    return { ...response, data: results };
+}
+
 export default api;